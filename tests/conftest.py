@@ -0,0 +1,49 @@
+import os
+import sys
+import pytest
+
+# the dashboard modules import each other as top-level modules, as under `streamlit run v1/dashboard.py`
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "v1"))
+
+import data_fetcher
+import ecb_stub
+import memo
+
+
+@pytest.fixture
+def at_root(monkeypatch):
+    """
+    Runs the test from the repository root, which the loaders read data/... relative to.
+    """
+    monkeypatch.chdir(ROOT_DIR)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    An empty DATA_DIR for data_fetcher (no exports, no series cache), with the memos cleared.
+    """
+    monkeypatch.setattr(data_fetcher, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(data_fetcher, "_revalidate_failed_at", {})
+    memo.invalidate()
+    yield tmp_path
+    memo.invalidate()
+
+
+@pytest.fixture
+def serve_ecb(monkeypatch):
+    """
+    serve_ecb(fixtures dir) starts ecb_stub and points data_fetcher at it until the test ends.
+    """
+    servers = []
+
+    def start(fixtures=ecb_stub.DATA_DIR):
+        server, url = ecb_stub.start(str(fixtures))
+        servers.append(server)
+        monkeypatch.setattr(data_fetcher, "ECB_API_URL", url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
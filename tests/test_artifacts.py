@@ -0,0 +1,41 @@
+from datetime import datetime
+import pandas as pd
+import artifacts
+from artifacts import is_stale, load_manifest, write_artifacts
+from data_fetcher import store_series
+
+THEME, DATE_RANGE = "light", (datetime(2018, 1, 1), datetime(2025, 12, 31))
+KEY = "M.N.PL.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL"
+
+
+def series(values):
+    return pd.DataFrame({"Date": pd.date_range("2024-01-31", periods=len(values), freq="ME"), "Value": values})
+
+
+def test_new_sources_and_series_make_artifacts_stale(tmp_path, data_dir, monkeypatch):
+    # a repository of one export and one module, the series cache in data_dir
+    repo = tmp_path / "repo"
+    (repo / "data").mkdir(parents=True)
+    (repo / "v1").mkdir()
+    (repo / "data" / "export.csv").write_text("Date,Value\n2024-01-31,1.0\n")
+    (repo / "v1" / "fig.py").write_text("")
+    monkeypatch.setattr(artifacts, "ROOT_DIR", str(repo))
+    store_series("BPS", KEY, series([1.0, 2.0]))
+
+    root = tmp_path / "artifacts"
+    write_artifacts({}, THEME, DATE_RANGE, root=str(root))
+    assert not is_stale(load_manifest(str(root)), THEME, DATE_RANGE)
+
+    # a module added since the build, then removed again
+    (repo / "v1" / "new_fig.py").write_text("")
+    assert is_stale(load_manifest(str(root)), THEME, DATE_RANGE)
+    (repo / "v1" / "new_fig.py").unlink()
+    assert not is_stale(load_manifest(str(root)), THEME, DATE_RANGE)
+
+    # a series cached since the build, and a cached series that changed
+    store_series("BPS", KEY.replace(".PL.", ".DE."), series([3.0]))
+    assert is_stale(load_manifest(str(root)), THEME, DATE_RANGE)
+    write_artifacts({}, THEME, DATE_RANGE, root=str(root))
+    assert not is_stale(load_manifest(str(root)), THEME, DATE_RANGE)
+    store_series("BPS", KEY, series([1.0, 2.5]))
+    assert is_stale(load_manifest(str(root)), THEME, DATE_RANGE)
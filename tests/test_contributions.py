@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from s1.contributions import (HEADLINE, WEIGHT_SCALE, check_hierarchy, coicop_parent, decompose,
+                              icp_key, load_icp_panel, synthetic_panel, weighted_contributions)
+
+COUNTRIES = ["PL", "DE"]
+
+
+@pytest.fixture
+def panel():
+    return synthetic_panel(COUNTRIES, divisions=2, groups=2, classes=2, years=3)
+
+
+def test_divisions_add_up_to_the_headline(panel):
+    contributions, missing = decompose(panel)
+    assert not missing.any()
+    headline = panel["items"].index(HEADLINE)
+    divisions = [i for i, item in enumerate(panel["items"]) if coicop_parent(item) == HEADLINE]
+    # the headline has weight 1000: its contribution is its rate, and its divisions' contributions sum to it
+    np.testing.assert_allclose(contributions[:, headline], panel["rates"][:, headline])
+    np.testing.assert_allclose(contributions[:, divisions].sum(axis=1), panel["rates"][:, headline])
+
+    report = check_hierarchy(panel, contributions)
+    assert HEADLINE in report["parents"]
+    assert report["failures"].empty and report["weight_failures"].empty
+    assert np.nanmax(np.abs(report["residuals"])) < 1e-9
+
+
+def test_headline_off_its_divisions_beyond_tolerance_fails(panel):
+    headline = panel["items"].index(HEADLINE)
+    panel["rates"][1, headline, 10] += 0.5
+    contributions, _ = decompose(panel)
+
+    failures = check_hierarchy(panel, contributions)["failures"]
+    assert len(failures) == 1
+    row = failures.iloc[0]
+    assert (row["country"], row["item"]) == ("DE", HEADLINE)
+    assert row["date"] == pd.Timestamp("2000-11-30")
+    assert row["residual"] == pytest.approx(0.5)
+    # within a looser tolerance the same panel passes
+    assert check_hierarchy(panel, contributions, tol=0.6)["failures"].empty
+
+
+def test_weight_off_its_parent_beyond_tolerance_fails(panel):
+    leaf = panel["items"].index("011100")
+    panel["weights"][0, leaf, 2] += 1.0
+    contributions, _ = decompose(panel)
+
+    weight_failures = check_hierarchy(panel, contributions)["weight_failures"]
+    assert weight_failures[["country", "item", "year"]].values.tolist() == [["PL", "011000", 2002]]
+    assert weight_failures.iloc[0]["residual"] == pytest.approx(-1.0)
+    assert check_hierarchy(panel, contributions, weight_tol=1.5)["weight_failures"].empty
+
+
+def test_months_of_a_year_without_weights():
+    energy, food = "HICP - Energy (ICP.M.PL.N.NRGY00.4.ANR)", "HICP - Food (ICP.M.PL.N.FOOD00.4.ANR)"
+    rates = pd.DataFrame({"DATE": pd.date_range("2021-11-30", periods=4, freq="ME"),
+                          energy: [10.0, 20.0, 30.0, 40.0], food: [1.0, 2.0, 3.0, 4.0]})
+    # weights for 2021 only: January and February 2022 have none
+    weights = pd.DataFrame({"DATE": pd.to_datetime(["2021-12-31"]),
+                            "HICP - Energy (ICP.A.PL.N.NRGY00.4.INW)": [100.0],
+                            "HICP - Food (ICP.A.PL.N.FOOD00.4.INW)": [250.0]})
+
+    out = weighted_contributions(rates, weights, missing="zero")
+    assert out.columns.tolist() == ["DATE", energy, food]
+    assert out[energy].tolist() == [1.0, 2.0, 0.0, 0.0]
+    assert out[food].tolist() == [0.25, 0.5, 0.0, 0.0]
+    with pytest.raises(ValueError, match="2022"):
+        weighted_contributions(rates, weights, missing="raise")
+    # with the year's weights both modes agree
+    pd.testing.assert_frame_equal(weighted_contributions(rates.iloc[:2], weights, missing="raise"), out.iloc[:2])
+
+
+def test_icp_panel_downloaded_from_the_api(panel, tmp_path, data_dir, serve_ecb):
+    # the synthetic panel exported as ICP series, served by the ECB stand-in
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    months = pd.PeriodIndex.from_ordinals(panel["months"], freq="M").to_timestamp(how="end").normalize()
+    years = pd.to_datetime([f"{year}-12-31" for year in panel["years"]])
+    for c, country in enumerate(COUNTRIES):
+        for i, item in enumerate(panel["items"]):
+            for measure, dates, values in (("ANR", months, panel["rates"]), ("INW", years, panel["weights"])):
+                pd.DataFrame({"Date": dates, "Value": values[c, i]}).to_csv(
+                    fixtures / f"{icp_key(country, item, measure)}.csv", index=False)
+    serve_ecb(fixtures)
+
+    loaded = load_icp_panel(COUNTRIES, panel["items"], start="2000")
+    np.testing.assert_array_equal(loaded["months"], panel["months"])
+    np.testing.assert_array_equal(loaded["years"], panel["years"])
+    np.testing.assert_allclose(loaded["rates"], panel["rates"])
+    np.testing.assert_allclose(loaded["weights"], panel["weights"])
+    report = check_hierarchy(loaded, decompose(loaded)[0])
+    assert report["failures"].empty and report["weight_failures"].empty
+    assert np.nansum(loaded["weights"][:, loaded["items"].index(HEADLINE)]) == pytest.approx(
+        WEIGHT_SCALE * len(COUNTRIES) * len(panel["years"]))
@@ -0,0 +1,68 @@
+import math
+import pandas as pd
+import pytest
+from data_fetcher import MAX_OVERFETCH, plan_queries, split_csvdata
+
+PL_GDP = "Q.Y.PL.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N"
+EA_GDP = "Q.Y.I9.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N"
+PL_EXPORTS = "Q.Y.PL.W1.S1.S1.D.P6._Z._Z._Z.EUR.LR.N"
+
+
+def combinations(query_key):
+    return math.prod(len(part.split("+")) for part in query_key.split("."))
+
+
+def test_keys_differing_in_one_dimension_merge():
+    plan = plan_queries([("MNA", PL_GDP, None), ("MNA", EA_GDP, None)])
+    assert plan == [("MNA", "Q.Y.I9+PL.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N", [PL_GDP, EA_GDP], None)]
+
+
+def test_merges_respect_the_overfetch_cap():
+    # the GDP keys merge first; adding PL_EXPORTS would cover 2**4 combinations for 3 series
+    plan = plan_queries([("MNA", key, None) for key in (PL_GDP, EA_GDP, PL_EXPORTS)])
+    assert sorted(len(keys) for _, _, keys, _ in plan) == [1, 2]
+    for _, query_key, keys, _ in plan:
+        assert combinations(query_key) <= MAX_OVERFETCH * len(keys)
+
+    # a cap of 1 only allows merges that fetch nothing extra
+    keys = ["M.A.X", "M.B.X", "M.A.Y"]
+    plan = plan_queries([("F", key, None) for key in keys], max_overfetch=1)
+    for _, query_key, group, _ in plan:
+        assert combinations(query_key) == len(group)
+    assert sorted(key for _, _, group, _ in plan for key in group) == sorted(keys)
+
+
+def test_flows_windows_and_key_length_keep_queries_apart():
+    jobs = [("MNA", PL_GDP, None), ("MNA", EA_GDP, {"startPeriod": "2019"}), ("BPS", EA_GDP, None)]
+    assert len(plan_queries(jobs)) == 3
+    plan = plan_queries([("MNA", PL_GDP, None), ("MNA", EA_GDP, None)], max_key_length=len(PL_GDP))
+    assert [keys for _, _, keys, _ in plan] == [[PL_GDP], [EA_GDP]]
+
+
+def test_coalesced_response_is_split_per_key():
+    # rows of the two series interleaved and out of period order, plus a series nobody asked for
+    text = "\n".join([
+        "KEY,FREQ,TIME_PERIOD,OBS_VALUE,OBS_STATUS",
+        f"MNA.{PL_GDP},Q,2024-Q2,2.0,A",
+        f"MNA.{EA_GDP},Q,2024-Q1,10.0,A",
+        f"MNA.{PL_GDP},Q,2024-Q1,1.0,A",
+        f"MNA.Q.Y.DE.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N,Q,2024-Q1,99.0,A",
+        f"MNA.{EA_GDP},Q,2024-Q2,,A",
+        f"MNA.{PL_GDP},Q,2024-Q3,3.0,A",
+    ]) + "\n"
+    frames = split_csvdata(text, [PL_GDP, EA_GDP])
+    assert sorted(frames) == sorted([PL_GDP, EA_GDP])
+    pl, ea = frames[PL_GDP], frames[EA_GDP]
+    assert pl["Date"].tolist() == list(pd.to_datetime(["2024-03-31", "2024-06-30", "2024-09-30"]))
+    assert pl["Value"].tolist() == [1.0, 2.0, 3.0]
+    assert ea["Date"].tolist() == list(pd.to_datetime(["2024-03-31", "2024-06-30"]))
+    assert ea["Value"].iloc[0] == 10.0 and pd.isna(ea["Value"].iloc[1])
+
+
+def test_split_needs_a_key_column_for_several_keys():
+    text = "TIME_PERIOD,OBS_VALUE\n2024-Q1,1.0\n"
+    assert split_csvdata(text, [PL_GDP])[PL_GDP]["Value"].tolist() == [1.0]
+    with pytest.raises(ValueError, match="KEY column"):
+        split_csvdata(text, [PL_GDP, EA_GDP])
+    # a key missing from the response is left out
+    assert split_csvdata(f"KEY,TIME_PERIOD,OBS_VALUE\nMNA.{PL_GDP},2024-Q1,1.0\n", [PL_GDP, EA_GDP]).keys() == {PL_GDP}
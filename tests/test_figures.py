@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from plotly.io.json import to_json_plotly
+from figure_builder import typed_array, validate
+from figure_registry import FIGURES, get_figure, load_datasets, make_placeholder
+from theme import GRID_W, GRID_H, get_theme
+
+DATE_RANGE = (datetime(2018, 1, 1), datetime(2025, 12, 31))
+
+
+@pytest.fixture
+def offline(at_root, data_dir, serve_ecb):
+    # ECB series downloaded from the stand-in into an empty cache, the s1 exports read from data/
+    serve_ecb()
+
+
+@pytest.mark.parametrize("fig_id", list(FIGURES))
+def test_registry_figure_is_a_valid_dict(offline, fig_id):
+    spec = FIGURES[fig_id]
+    fig = spec["build"](load_datasets(spec["data"]), get_theme("light"), DATE_RANGE, spec["profile"])
+    assert isinstance(fig, dict)
+    assert fig["data"]
+    validate(fig)
+
+
+def test_placeholder_is_a_valid_dict():
+    fig = make_placeholder("Poland Inflation Composition", GRID_W, GRID_H, message="(Data unavailable)")
+    assert isinstance(fig, dict)
+    assert validate(fig)["layout"]["annotations"][1]["text"] == "(Data unavailable)"
+
+
+def test_cached_figure_comes_back_as_its_json(offline):
+    built = get_figure("inflation_comparison", get_theme("light"), DATE_RANGE)
+    hit = get_figure("inflation_comparison", get_theme("light"), DATE_RANGE)
+    assert hit is not built
+    assert hit == json.loads(to_json_plotly(built))
+
+
+def test_typed_arrays_decode_to_their_values():
+    ints = typed_array(pd.Series([1, -300, 70_000], dtype="int64"))
+    assert ints["dtype"] == "i4"
+    assert np.frombuffer(base64.b64decode(ints["bdata"]), "i4").tolist() == [1, -300, 70_000]
+    floats = typed_array(np.array([[0.5, 1e12], [-2.25, 3.0]]))
+    assert (floats["dtype"], floats["shape"]) == ("f8", "2, 2")
+    assert np.frombuffer(base64.b64decode(floats["bdata"]), "f8").tolist() == [0.5, 1e12, -2.25, 3.0]
+    dates = typed_array(pd.Series(pd.date_range("2024-01-01", periods=2, tz="Europe/Warsaw")))
+    assert dates.dtype.kind == "M" and pd.Timestamp(dates[0]) == pd.Timestamp("2024-01-01")
+    assert typed_array(pd.Series([True, False])).dtype == object
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from plotly.io.json import to_json_plotly
+from figure_registry import FIGURES, get_figure
+from payload import DISPLAY_DIGITS, MAX_FLOAT32, optimize
+from theme import get_theme
+
+DATE_RANGE = (datetime(2018, 1, 1), datetime(2025, 12, 31))
+# rounding to DISPLAY_DIGITS significant digits moves a value by at most half a unit of the last one
+RTOL = 0.5 * 10.0 ** (1 - DISPLAY_DIGITS) + np.finfo(np.float32).eps
+
+
+@pytest.fixture
+def offline(at_root, data_dir, serve_ecb):
+    serve_ecb()
+
+
+def numbers(value):
+    """
+    float64 values of a typed array or a numeric list, None for anything else.
+    """
+    if isinstance(value, dict) and "bdata" in value and value["dtype"][0] in "fiu":
+        return np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"]).astype(np.float64)
+    if isinstance(value, list) and value and all(v is None or isinstance(v, (int, float)) for v in value):
+        return np.array([np.nan if v is None else v for v in value], dtype=np.float64)
+    return None
+
+
+def assert_same_arrays(original, optimized):
+    compared = 0
+    for before, after in zip(original["data"], optimized["data"]):
+        for key in ("x", "y", "base", "values"):
+            expected = numbers(before.get(key))
+            if expected is None:
+                continue
+            np.testing.assert_allclose(numbers(after[key]), expected, rtol=RTOL, err_msg=key)
+            compared += 1
+    return compared
+
+
+@pytest.mark.parametrize("fig_id", list(FIGURES))
+def test_optimized_figure_keeps_its_values(offline, fig_id):
+    original = json.loads(to_json_plotly(get_figure(fig_id, get_theme("light"), DATE_RANGE)))
+    # what the browser gets: the optimized JSON, accepted by plotly as a figure
+    sent = json.loads(go.Figure(optimize(original)).to_json())
+    assert assert_same_arrays(original, sent) > 0
+
+
+def test_large_values_stay_float64():
+    gdp = np.linspace(2.5e12, 2.9e12, 20) + 1234.5678
+    small = np.linspace(0.0, 1.0, 20) / 3
+    original = {"data": [{"type": "scatter", "y": gdp.tolist()}, {"type": "scatter", "y": small.tolist()}]}
+    optimized = optimize(original)
+    assert [trace["y"]["dtype"] for trace in optimized["data"]] == ["f8", "f4"]
+    assert assert_same_arrays(original, optimized) == 2
+    assert np.abs(gdp).max() > MAX_FLOAT32
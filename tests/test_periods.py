@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from periods import format_period, parse_periods
+
+
+@pytest.mark.parametrize("period, end", [
+    ("2022", "2022-12-31"),
+    ("2022-S1", "2022-06-30"),
+    ("2022-S2", "2022-12-31"),
+    ("2022-Q1", "2022-03-31"),
+    ("2024Q1", "2024-03-31"),
+    ("2022-03", "2022-03-31"),
+    ("2024-02", "2024-02-29"),
+    ("2022Mar", "2022-03-31"),
+    ("2022-W01", "2022-01-09"),
+    ("2020-W53", "2021-01-03"),
+    ("2026-W53", "2027-01-03"),
+    ("2022-03-15", "2022-03-15"),
+    ("3/15/2022", "2022-03-15"),
+    (" 2022-Q4 ", "2022-12-31"),
+])
+def test_periods_map_to_their_last_day(period, end):
+    assert parse_periods([period])[0] == np.datetime64(end, "ns")
+
+
+@pytest.mark.parametrize("period", [
+    "2021-W53", "2022-W00", "2022-W54", "2022-Q0", "2022-Q5", "2022-S3", "2022-13", "2022-02-30",
+    "2022Foo", "1500", "2300-01", "13/01/2022", "Q1-2022", "", "n/a",
+])
+def test_invalid_periods_are_nat(period):
+    assert np.isnat(parse_periods([period])[0])
+
+
+def test_series_keep_their_index_and_missing_values():
+    values = pd.Series(["2022-Q1", None, "2022-Q1", "2021-W53"], index=[10, 11, 12, 13], name="DATE")
+    parsed = parse_periods(values)
+    assert parsed.index.tolist() == [10, 11, 12, 13] and parsed.name == "DATE"
+    assert parsed.isna().tolist() == [False, True, False, True]
+    assert parsed[10] == parsed[12] == pd.Timestamp("2022-03-31")
+
+
+@pytest.mark.parametrize("freq, period", [("A", "2022"), ("S", "2022-S2"), ("Q", "2022-Q3"), ("M", "2022-08")])
+def test_format_period_round_trips(freq, period):
+    assert format_period(pd.Timestamp(parse_periods([period])[0]), freq) == period
@@ -0,0 +1,122 @@
+import os
+import time
+import pandas as pd
+import pytest
+import requests
+import data_fetcher
+from data_fetcher import download_group, fetch_ecb_many, fetch_stats, load_cache_entry, refresh_cached, request_csvdata, wire_bytes
+from ecb_stub import publish
+
+FLOW = "BPS"
+REVISED = "M.N.PL.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL"
+UNCHANGED = "M.N.I9.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL"
+DATES = pd.date_range("2024-01-31", periods=24, freq="ME")
+# a revision of the last exported month and two new ones
+UPDATES = {REVISED: [("2025-12", "-12.5"), ("2026-01", "40.25"), ("2026-02", "41.0")]}
+
+
+def write_export(directory, key, values, dates=DATES):
+    pd.DataFrame({"Date": dates[:len(values)], "Value": values}).to_csv(directory / f"{key}.csv", index=False)
+
+
+def wire_total():
+    return sum(stats["wire_bytes"] for stats in fetch_stats().values())
+
+
+def fixtures_dir(data_dir):
+    # the stand-in's series, apart from DATA_DIR so they are downloaded rather than migrated
+    path = data_dir / "fixtures"
+    path.mkdir()
+    return path
+
+
+def test_refresh_merges_revised_and_new_periods(data_dir, serve_ecb):
+    fixtures = fixtures_dir(data_dir)
+    write_export(fixtures, REVISED, [float(i) for i in range(24)])
+    write_export(fixtures, UNCHANGED, [100.0 + i for i in range(24)])
+    server = serve_ecb(fixtures)
+    jobs = [(FLOW, REVISED), (FLOW, UNCHANGED)]
+    frames, errors = fetch_ecb_many(jobs)
+    assert not errors and [len(df) for df in frames] == [24, 24]
+
+    publish(server, UPDATES)
+    before = wire_total()
+    transferred, errors = refresh_cached()
+    assert not errors
+    moved = wire_total() - before
+
+    refreshed, _ = fetch_ecb_many(jobs)
+    revised, unchanged = refreshed
+    assert revised["Date"].is_unique and revised["Date"].is_monotonic_increasing
+    assert len(revised) == 26
+    assert revised["Date"].iloc[-3:].dt.strftime("%Y-%m").tolist() == ["2025-12", "2026-01", "2026-02"]
+    assert revised["Value"].iloc[-3:].tolist() == [-12.5, 40.25, 41.0]
+    pd.testing.assert_frame_equal(revised.iloc[:23], frames[0].iloc[:23], check_dtype=False)
+    pd.testing.assert_frame_equal(unchanged, frames[1], check_dtype=False)
+
+    # only the delta moved: the 304 costs nothing, and the revised series' delta is a fraction
+    # of downloading it again
+    assert transferred[UNCHANGED] == 0
+    assert 0 < transferred[REVISED] == moved
+    _, full = request_csvdata(FLOW, REVISED, {})
+    assert transferred[REVISED] < wire_bytes(full)
+
+
+def test_refresh_without_updates_keeps_series(data_dir, serve_ecb):
+    fixtures = fixtures_dir(data_dir)
+    write_export(fixtures, REVISED, [float(i) for i in range(24)])
+    serve_ecb(fixtures)
+    frames, _ = fetch_ecb_many([(FLOW, REVISED)])
+
+    transferred, errors = refresh_cached()
+    assert not errors and transferred == {REVISED: 0}
+    entry = load_cache_entry(REVISED)
+    pd.testing.assert_frame_equal(entry[0], frames[0], check_dtype=False)
+
+
+def test_migrated_export_is_refreshed_from_its_last_period(data_dir, serve_ecb):
+    # the API has two months and a revision the shipped export (up to 2025-12) predates,
+    # published long before the export was checked out (its mtime)
+    fixtures = fixtures_dir(data_dir)
+    write_export(fixtures, REVISED, [float(i) for i in range(23)] + [-12.5, 40.25, 41.0],
+                 pd.date_range("2024-01-31", periods=26, freq="ME"))
+    write_export(data_dir, REVISED, [float(i) for i in range(24)])
+    checkout = time.time()
+    os.utime(data_dir / f"{REVISED}.csv", (checkout, checkout))
+    serve_ecb(fixtures)
+
+    migrated, meta = load_cache_entry(REVISED, FLOW)
+    assert meta["migrated"] and len(migrated) == 24
+    assert data_fetcher.is_fresh(REVISED, meta)
+
+    transferred, errors = refresh_cached()
+    assert not errors and transferred[REVISED] > 0
+    df, meta = load_cache_entry(REVISED)
+    assert df["Date"].dt.strftime("%Y-%m").tolist()[-3:] == ["2025-12", "2026-01", "2026-02"]
+    assert df["Value"].iloc[-3:].tolist() == [-12.5, 40.25, 41.0]
+    assert len(df) == 26 and df["Date"].is_unique
+
+    # once refreshed it has a real fetch time, and the next refresh is a delta query again
+    assert not meta.get("migrated")
+    transferred, _ = refresh_cached()
+    assert transferred == {REVISED: 0}
+
+
+def test_failed_downloads_close_their_response(data_dir, serve_ecb, monkeypatch):
+    serve_ecb(fixtures_dir(data_dir))
+    responses = []
+    get_csvdata = data_fetcher.get_csvdata
+
+    def recording_get_csvdata(*args, **kwargs):
+        responses.append(get_csvdata(*args, **kwargs))
+        return responses[-1]
+
+    monkeypatch.setattr(data_fetcher, "get_csvdata", recording_get_csvdata)
+
+    # the stand-in has no series: both answer 404
+    with pytest.raises(requests.HTTPError):
+        download_group(FLOW, REVISED, [REVISED])
+    with pytest.raises(requests.HTTPError):
+        request_csvdata(FLOW, REVISED, {})
+    assert [response.status_code for response in responses] == [404, 404]
+    assert all(response.raw.closed for response in responses)
@@ -0,0 +1,34 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from series_cache import NpzCache, series_digest
+
+
+def test_concurrent_writers_of_a_key_leave_one_whole_series(tmp_path):
+    cache = NpzCache(str(tmp_path))
+    frames = [pd.DataFrame({"Date": pd.date_range("2020-01-31", periods=50 + i, freq="ME"),
+                            "Value": np.full(50 + i, float(i))}) for i in range(8)]
+
+    errors = []
+
+    def write(df):
+        for _ in range(20):
+            try:
+                cache.save("KEY", df, {"writer": int(df["Value"].iloc[0])})
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(df,)) for df in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    df, meta = cache.load("KEY")
+    # the series, its header and its metadata all come from the same writer
+    written = frames[meta["writer"]]
+    pd.testing.assert_frame_equal(df, written, check_dtype=False)
+    assert cache.digest("KEY") == series_digest(written)
+    assert os.listdir(tmp_path) == ["KEY.npz"]
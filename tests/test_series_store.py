@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from series_store import SeriesStore
+
+# monthly current account from 2021-01 to 2022-08 (the last quarter partial, one month missing a
+# value) and a quarterly goods balance from 2021Q2
+CA = pd.DataFrame({"Date": pd.date_range("2021-01-31", periods=20, freq="ME"),
+                   "Value": np.r_[np.arange(1.0, 5.0), np.nan, np.arange(6.0, 21.0)]})
+GOODS = pd.DataFrame({"Date": pd.date_range("2021-06-30", periods=5, freq="QE"),
+                      "Value": [-10.0, -20.0, -30.0, -40.0, -50.0]})
+
+
+def store():
+    return SeriesStore().add_frames({"CA": CA, "Goods": GOODS}, {"CA": "M", "Goods": "Q"})
+
+
+def assert_same(frame, baseline):
+    pd.testing.assert_frame_equal(frame.reset_index(drop=True), baseline.reset_index(drop=True),
+                                  check_dtype=False, check_index_type=False)
+
+
+def test_monthly_sums_match_resample_and_merge():
+    quarterly = CA.set_index("Date").resample("QE").sum().reset_index().rename(columns={"Value": "CA"})
+    baseline = quarterly.merge(GOODS.rename(columns={"Value": "Goods"}), on="Date", how="inner")
+    assert_same(store().frame(["CA", "Goods"], freq="Q", agg="sum"), baseline)
+    # the default is an inner join, at the first series' frequency
+    assert_same(store().frame(["Goods", "CA"], agg="sum", how="inner"), baseline[["Date", "Goods", "CA"]])
+
+
+def test_quarters_are_placed_on_their_last_month():
+    monthly = CA.rename(columns={"Value": "CA"})
+    goods = GOODS.rename(columns={"Value": "Goods"})
+    left = store().frame(["CA", "Goods"], freq="M", how="left")
+    assert_same(left, monthly.merge(goods, on="Date", how="left"))
+    assert left.loc[left["Goods"].notna(), "Date"].dt.month.tolist() == [6, 9, 12, 3, 6]
+
+    # asof: each month takes the latest quarter ending on or before it
+    asof = store().frame(["CA", "Goods"], freq="M", how="left", asof=True)
+    baseline = pd.merge_asof(monthly, goods, on="Date")
+    # the May row with an empty CA value is an observation, so it stays empty
+    assert_same(asof, baseline)
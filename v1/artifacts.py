@@ -0,0 +1,123 @@
+import glob
+import json
+import os
+from datetime import datetime, timezone
+from plotly.utils import PlotlyJSONEncoder
+from figure_cache import fingerprint
+from figure_builder import validate
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.environ.get("ECB_ARTIFACT_DIR", os.path.join(ROOT_DIR, "artifacts"))
+# bump when the artifact layout changes; artifacts with another version are ignored
+ARTIFACT_VERSION = 2
+
+# files whose modification invalidates the artifacts: local data and the plotting code. The
+# series cache is stamped by content instead (series_stamp), since revalidating an unchanged
+# series rewrites its file with a new fetched_at.
+SOURCE_PATTERNS = ["data/**/*.csv", "v1/**/*.py"]
+
+
+def source_stamp():
+    """
+    {path relative to the repo: mtime_ns} of every file the artifacts are built from,
+    except the series cache.
+    """
+    from data_fetcher import get_cache
+    cache_dir = os.path.join(os.path.abspath(get_cache().root), "")
+    stamp = {}
+    for pattern in SOURCE_PATTERNS:
+        for path in glob.glob(os.path.join(ROOT_DIR, pattern), recursive=True):
+            if "__pycache__" not in path and not os.path.abspath(path).startswith(cache_dir):
+                stamp[os.path.relpath(path, ROOT_DIR)] = os.stat(path).st_mtime_ns
+    return stamp
+
+
+def series_stamp():
+    """
+    {series key: content digest} of every series in the cache.
+    """
+    from data_fetcher import get_cache
+    cache = get_cache()
+    return {key: cache.digest(key) for key in cache.keys()}
+
+
+def write_artifacts(sections, theme, date_range, root=ARTIFACT_DIR):
+    """
+    Writes one JSON file per section ({"figures": {name: figure or None}, "kpis": {...}}),
+    each figure validated against the plotly schema, and a manifest recording the version, the theme/date_range they were built for and the source stamp.
+    The manifest is written last so a half-finished build is never picked up.
+    """
+    os.makedirs(root, exist_ok=True)
+    files = {}
+    for section, content in sections.items():
+        figures = {name: validate(fig) if fig is not None else None
+                   for name, fig in content.get("figures", {}).items()}
+        payload = {"figures": figures, "kpis": content.get("kpis")}
+        files[section] = f"{section}.json"
+        _write_json(os.path.join(root, files[section]), payload)
+
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "inputs": fingerprint((theme, date_range)),
+        "sources": source_stamp(),
+        "series": series_stamp(),
+        "sections": files,
+    }
+    _write_json(os.path.join(root, "manifest.json"), manifest)
+    return manifest
+
+
+def _write_json(path, obj):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(obj, fh, cls=PlotlyJSONEncoder)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(root=ARTIFACT_DIR):
+    path = os.path.join(root, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def is_stale(manifest, theme, date_range):
+    """
+    True if the artifacts were built by another version, for another theme/date_range,
+    or any source file or cached series changed, appeared or disappeared since.
+    """
+    if manifest.get("version") != ARTIFACT_VERSION or manifest.get("inputs") != fingerprint((theme, date_range)):
+        return True
+    # the stamps cover new files and newly cached series too, not only the recorded ones
+    if source_stamp() != manifest.get("sources", {}):
+        return True
+    from data_fetcher import get_cache
+    cache = get_cache()
+    series = manifest.get("series", {})
+    if set(cache.keys()) != set(series):
+        return True
+    return any(cache.digest(key) != digest for key, digest in series.items())
+
+
+def load_section(section, theme, date_range, root=ARTIFACT_DIR):
+    """
+    Returns {"figures": {name: figure dict}, "kpis": ...} of a prebuilt section, or None
+    when it is missing, stale, or lacks any figure (the caller then computes it live).
+    """
+    manifest = load_manifest(root)
+    if manifest is None or section not in manifest.get("sections", {}) or is_stale(manifest, theme, date_range):
+        return None
+    try:
+        with open(os.path.join(root, manifest["sections"][section])) as fh:
+            payload = json.load(fh)
+    except (OSError, ValueError) as e:
+        print(f"Could not read artifact {section}: {e}")
+        return None
+    if any(fig is None for fig in payload["figures"].values()):
+        return None
+    return {
+        "figures": payload["figures"],
+        "kpis": payload.get("kpis"),
+    }
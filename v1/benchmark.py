@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import ecb_stub
+
+# Offline benchmark suite: times each layer of the dashboard separately, against the local ECB
+# stand-in (ecb_stub.py) serving the fixture exports in data/, with the series cache in a
+# temporary directory and no prebuilt artifacts.
+#   fetch.*      fetch_ecb_data over every ECB series of the catalog: cold (empty cache),
+#                warm (disk cache) and memo (in-process hit)
+#   ingest.*     the s1 CSV loaders, with the memos cleared
+#   transform.*  adjust_dataframes of the s1 contribution charts
+#   plot.*       every plot_* function, on loaded data
+#   page.*       dashboard.main under Streamlit's AppTest, the overview and the detailed page
+#                with every section open: in a new session with every memo cleared (cold, the
+#                disk cache stays warm) and on a rerun (warm)
+# Results are written as JSON; --compare flags the timings that regressed against a stored run:
+#
+#   python v1/benchmark.py --out bench.json
+#   python v1/benchmark.py --compare bench.json
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.py")
+DATE_RANGE = (datetime(2018, 1, 1), datetime(2025, 12, 31))
+LAYERS = ("fetch", "ingest", "transform", "plot", "page")
+PAGE_TIMEOUT = 300
+SECTIONS = ("price_stability", "growth", "current_account")
+
+# a timing regressed when its median exceeds the baseline's by this ratio and by at least
+# REGRESSION_MIN_MS, above the run-to-run jitter of the few-ms plot functions
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 5.0
+
+
+def measure(run, setup=None, repeat=5):
+    """
+    Times run() repeat times, each after an untimed setup(), following one untimed run that
+    takes the one-off imports and plotly validator loading out of the timings. Returns the
+    median, min and max in ms.
+    """
+    times = []
+    for i in range(repeat + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        if i:
+            times.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "max_ms": max(times), "runs": repeat}
+
+
+def built(plot, *args, **kwargs):
+    # the plot functions print their errors and return None; a benchmark of that would time the failure
+    def run():
+        if plot(*args, **kwargs) is None:
+            raise RuntimeError(f"{plot.__module__}.{plot.__name__} built no figure")
+    return run
+
+
+def fetch_cases(cache_dir):
+    import data_fetcher
+    import memo
+    from series_catalog import SERIES, ecb_jobs
+
+    jobs = ecb_jobs([series_id for series_id, spec in SERIES.items() if spec["source"] == "ecb"])
+
+    def fetch_all():
+        for flow_ref, key, params in jobs:
+            if data_fetcher.fetch_ecb_data("data", flow_ref, key, params).empty:
+                raise RuntimeError(f"No data for {key}")
+
+    def empty_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        memo.invalidate()
+
+    # in this order: the cold runs leave the cache the warm ones read
+    return {
+        "fetch.cold": (fetch_all, empty_cache),
+        "fetch.warm": (fetch_all, memo.invalidate),
+        "fetch.memo": (fetch_all, None),
+    }
+
+
+def ingest_cases():
+    import memo
+    from figure_registry import ENERGY_FILES
+    from s1 import fig1, fig2, fig2_5, fig3
+
+    return {
+        "ingest.s1.fig1": (lambda: [fig1.get_data(path) for path in ENERGY_FILES], memo.invalidate),
+        "ingest.s1.fig2": (fig2.get_data, memo.invalidate),
+        "ingest.s1.fig2_5": (fig2_5.get_data, memo.invalidate),
+        "ingest.s1.fig3": (fig3.get_data, memo.invalidate),
+    }
+
+
+def transform_cases():
+    from s1 import fig2, fig2_5
+
+    pl_val, pl_weights, ea_val, ea_weights = fig2.get_data()
+    hicp_val, hicp_weights, _ = fig2_5.get_data()
+    return {
+        "transform.s1.fig2.adjust_dataframes": (
+            lambda: (fig2.adjust_dataframes(pl_val, pl_weights), fig2.adjust_dataframes(ea_val, ea_weights)), None),
+        "transform.s1.fig2_5.adjust_dataframes": (lambda: fig2_5.adjust_dataframes(hicp_val, hicp_weights), None),
+    }
+
+
+def plot_cases():
+    import s2_visualization as s2
+    import s3_visualization as s3
+    from s1 import fig1, fig2, fig2_5, fig3
+    from theme import get_theme
+    from data_fetcher import get_growth_data, get_s3_data
+    from figure_registry import ENERGY_FILES, load_energy, plot_energy_overview
+
+    theme = get_theme("light")
+    growth, s3_data = get_growth_data(), get_s3_data()
+    cases = {
+        "plot.s1.plot_price_stability": built(fig1.plot_price_stability, ENERGY_FILES[1], ENERGY_FILES[0], theme),
+        "plot.s1.plot_inflation_comparison": built(fig2.plot_inflation_comparison),
+        "plot.s1.plot_hicp_contribution": built(fig2_5.plot_hicp_contribution),
+        "plot.s1.plot_exchange_rate_inflation": built(fig3.plot_exchange_rate_inflation),
+        "plot.s2.plot_fig1_growth_divergence": built(s2.plot_fig1_growth_divergence, growth, DATE_RANGE, theme),
+        "plot.s2.plot_fig2_decomposition": built(s2.plot_fig2_decomposition, growth, theme),
+        "plot.s2.plot_fig3_animated": built(s2.plot_fig3_animated, growth, DATE_RANGE, theme),
+        "plot.s3.plot_fig1_ca_headline": built(s3.plot_fig1_ca_headline, s3_data, DATE_RANGE, theme),
+        "plot.s3.plot_fig2_goods_balance": built(s3.plot_fig2_goods_balance, s3_data, DATE_RANGE, theme),
+        "plot.s3.plot_fig3_impact_bridge": built(s3.plot_fig3_impact_bridge, s3_data, DATE_RANGE, theme),
+        # rebases the frames it is given, so it gets fresh copies from the loader memo
+        "plot.overview.plot_energy_overview": lambda: plot_energy_overview(*load_energy()),
+    }
+    return {name: (run, None) for name, run in cases.items()}
+
+
+def page_cases():
+    import memo
+    from streamlit.testing.v1 import AppTest
+
+    session = {}
+
+    def checked(app):
+        if app.exception:
+            raise RuntimeError(f"dashboard raised: {app.exception[0].value}")
+        return app
+
+    def new_session(page):
+        def setup():
+            memo.invalidate()
+            app = AppTest.from_file(DASHBOARD, default_timeout=PAGE_TIMEOUT)
+            for section in SECTIONS:
+                app.session_state[f"show_{section}"] = True
+            if page != "OVERVIEW":
+                # the first run always shows the overview
+                checked(app.run())
+                memo.invalidate()
+            session["app"] = app
+        return setup
+
+    def show(page):
+        def run():
+            app = session["app"]
+            # a session that has not run yet has no widgets and opens on the overview
+            if app.radio:
+                app.radio(key="nav").set_value(page)
+            checked(app.run())
+        return run
+
+    return {
+        "page.overview.cold": (show("OVERVIEW"), new_session("OVERVIEW")),
+        "page.detailed.cold": (show("DETAILED ANALYSIS"), new_session("DETAILED ANALYSIS")),
+        "page.overview.warm": (show("OVERVIEW"), None),
+        "page.detailed.warm": (show("DETAILED ANALYSIS"), None),
+    }
+
+
+def run_benchmarks(layers=LAYERS, repeat=5, cache_dir=None):
+    """
+    {benchmark name: timings} of the layers, in order. The fetch layer needs cache_dir, the
+    series cache directory it empties for the cold runs.
+    """
+    cases = {
+        "fetch": lambda: fetch_cases(cache_dir),
+        "ingest": ingest_cases,
+        "transform": transform_cases,
+        "plot": plot_cases,
+        "page": page_cases,
+    }
+    results = {}
+    for layer in layers:
+        for name, (run, setup) in cases[layer]().items():
+            results[name] = measure(run, setup, repeat)
+            print(f"{name:45s} {results[name]['median_ms']:9.1f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO, min_ms=REGRESSION_MIN_MS):
+    """
+    (report lines, names of the regressed benchmarks) of results against baseline, both
+    {benchmark name: timings}, by median.
+    """
+    lines, regressions = [], []
+    for name in list(baseline) + [n for n in results if n not in baseline]:
+        if name not in results or name not in baseline:
+            lines.append(f"{name:45s} only in {'the baseline' if name in baseline else 'this run'}")
+            continue
+        old, new = baseline[name]["median_ms"], results[name]["median_ms"]
+        regressed = new > old * ratio and new - old > min_ms
+        if regressed:
+            regressions.append(name)
+        change = f"{new / old - 1:+7.1%}" if old else ""
+        lines.append(f"{name:45s} {old:9.1f} -> {new:9.1f} ms {change}{'  REGRESSION' if regressed else ''}")
+    return lines, regressions
+
+
+def environment(args):
+    import numpy, pandas, plotly, streamlit
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": {module.__name__: module.__version__ for module in (numpy, pandas, plotly, streamlit)},
+        "repeat": args.repeat,
+        "latency_ms": args.latency,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the dashboard layers.")
+    parser.add_argument("layers", nargs="*", metavar="LAYER",
+                        help=f"layers to run: {', '.join(LAYERS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default 5)")
+    parser.add_argument("--latency", type=float, default=0.0, help="ms the ECB stand-in waits before answering")
+    parser.add_argument("--out", help="JSON file to write the results to")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON of an earlier run; exits with 1 if a timing regressed")
+    parser.add_argument("--ratio", type=float, default=REGRESSION_RATIO,
+                        help=f"median/baseline ratio counted as a regression (default {REGRESSION_RATIO})")
+    args = parser.parse_args(argv)
+    unknown = set(args.layers) - set(LAYERS)
+    if unknown:
+        parser.error(f"unknown layers {sorted(unknown)}, expected {', '.join(LAYERS)}")
+    layers = [layer for layer in LAYERS if layer in args.layers or not args.layers]
+
+    server, url = ecb_stub.start(latency=args.latency / 1000)
+    tmp = tempfile.mkdtemp(prefix="dashboard-benchmark-")
+    # set before data_fetcher and artifacts are imported, which read them once
+    os.environ["ECB_API_URL"] = url
+    os.environ["ECB_ARTIFACT_DIR"] = os.path.join(tmp, "artifacts")
+    # the loaders read data/... relative to the repository root, like `streamlit run v1/dashboard.py`
+    os.chdir(ROOT_DIR)
+    try:
+        import data_fetcher
+        data_fetcher.DATA_DIR = tmp
+        results = run_benchmarks(layers, args.repeat, os.path.join(tmp, "cache"))
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {"environment": environment(args), "results": results}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline["results"], args.ratio)
+        print(f"\nAgainst {args.compare} ({baseline['environment']['created']}):")
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import os
+import time
+from datetime import datetime
+from theme import get_theme
+from artifacts import ROOT_DIR, ARTIFACT_DIR, write_artifacts
+from figure_registry import DETAILED_SECTIONS, build_section
+from overview_charts import build_overview
+
+# must match the theme and date range used by dashboard.main / render_overview, otherwise the artifacts count as stale
+THEME = "light"
+DATE_RANGE = (datetime(2018, 1, 1), datetime(2025, 12, 31))
+
+
+def build_all(theme, date_range):
+    """
+    Runs every DETAILED ANALYSIS section and the overview live. Sections that fail or have
+    no data are left out, so the dashboard computes them at request time.
+    """
+    builders = {section: lambda theme, date_range, section=section: build_section(section, theme, date_range)
+                for section in DETAILED_SECTIONS}
+    builders["overview"] = build_overview
+    sections = {}
+    for name, build in builders.items():
+        start = time.perf_counter()
+        try:
+            content = build(theme, date_range)
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        if content is None:
+            print(f"Skipping {name}: no data")
+            continue
+        sections[name] = content
+        print(f"Built {name} in {time.perf_counter() - start:.2f}s")
+    return sections
+
+
+if __name__ == "__main__":
+    # the loaders read data/... relative to the repository root, like `streamlit run v1/dashboard.py`
+    os.chdir(ROOT_DIR)
+    theme = get_theme(THEME)
+    manifest = write_artifacts(build_all(theme, DATE_RANGE), theme, DATE_RANGE)
+    size = sum(os.path.getsize(os.path.join(ARTIFACT_DIR, f)) for f in manifest["sections"].values())
+    print(f"Wrote {len(manifest['sections'])} sections ({size} bytes) to {ARTIFACT_DIR}")
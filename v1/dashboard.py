@@ -2,16 +2,12 @@ import streamlit as st
 import pandas as pd
 import requests
 import io
-from s2_visualization import plot_fig1_growth_divergence, plot_fig2_decomposition, plot_fig3_animated
-from s3_visualization import plot_fig1_ca_headline, plot_fig2_goods_balance, plot_fig3_impact_bridge
-from s1.fig1 import plot_price_stability
-
-from s1.fig2 import plot_inflation_comparison
-from s1.fig3 import plot_exchange_rate_inflation
+from figure_registry import get_figure, section_figures, prefetch_sections, ENERGY_FILES
+from payload import plotly_chart
 from s1.fig2_5 import plot_hicp_contribution
-from data_fetcher import get_growth_data, get_current_account_data, get_s3_data
 from datetime import datetime
 from theme import get_theme, COLORS
+import perf
 
 st.set_page_config(
     page_title="Macro Monitor: Poland",
@@ -268,17 +264,21 @@ def main():
     st.markdown(css, unsafe_allow_html=True)
 
 
-    if page == "OVERVIEW":
-        from overview_charts import render_overview
-        render_overview()
+    @st.fragment
+    def detailed_section(title, section, render, expanded=False):
+        # a rerun of just this fragment is outside the page's perf.collect, so it collects its own spans
+        with perf.collect(section) as spans, perf.span("dashboard.section", "render", detail=section):
+            st.title(title)
+            # a section is only built once opened; opening or closing it reruns just this fragment
+            if st.toggle("Show figures", value=expanded, key=f"show_{section}"):
+                render()
+        if perf.ENABLED:
+            perf_panel(spans, root="dashboard.section", title=f"PERFORMANCE: {section}")
 
-    elif page == "DETAILED ANALYSIS":
-        st.title("1. PRICE STABILITY")
-        
-        vol_file = "data/s1fig1/Gas_Vol.csv"
-        val_file = "data/s1fig1/Gas_Val.csv"
+    def render_price_stability():
+        val_file, vol_file = ENERGY_FILES
         
-        fig = plot_price_stability(vol_file, val_file, current_theme)
+        fig = section_figures("price_stability", current_theme, date_range)["price_stability"]
         
         if fig:
             col_text, col_chart = st.columns([1, 3])
@@ -302,7 +302,7 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
             with col_chart:
-                st.plotly_chart(fig, config={'displayModeBar': False, 'responsive': True}, theme=None)
+                plotly_chart(fig, "price_stability", config={'displayModeBar': False, 'responsive': True}, theme=None)
         else:
             st.error(f"DATA MISSING: Please ensure '{vol_file}' and '{val_file}' are in the 'data/' directory.")
 
@@ -310,7 +310,7 @@ def main():
         
 
         try:
-            fig3 = plot_inflation_comparison()
+            fig3 = section_figures("inflation", current_theme, date_range)["inflation_comparison"]
             if fig3:
                 col_text, col_chart = st.columns([1, 3])
                 with col_text:
@@ -333,7 +333,7 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 with col_chart:
-                    st.plotly_chart(fig3, config={'displayModeBar': False, 'responsive': True})
+                    plotly_chart(fig3, "inflation_comparison", config={'displayModeBar': False, 'responsive': True})
             else:
                  pass
         except Exception as e:
@@ -342,7 +342,7 @@ def main():
         st.markdown("###")
 
         try:
-            fig4 = plot_exchange_rate_inflation()
+            fig4 = section_figures("exchange_rate", current_theme, date_range)["exchange_rate_inflation"]
             if fig4:
                  col_text, col_chart = st.columns([1, 3])
                  with col_text:
@@ -365,17 +365,14 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                  with col_chart:
-                    st.plotly_chart(fig4, config={'displayModeBar': False, 'responsive': True})
+                    plotly_chart(fig4, "exchange_rate_inflation", config={'displayModeBar': False, 'responsive': True})
         except Exception as e:
              st.warning(f"Could not load Exchange Rate Chart: {e}")
 
-        st.markdown("---")
-
-        st.title("2. ECONOMIC GROWTH")
+    def render_growth():
+        growth_figs = section_figures("growth", current_theme, date_range)
 
-        df = get_growth_data()
-
-        if df.empty:
+        if growth_figs is None:
             st.error("CONNECTION ERROR: UNABLE TO FETCH ECB DATA.")
         else:
             col_text, col_chart = st.columns([1, 3])
@@ -399,7 +396,7 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
             with col_chart:
-                st.plotly_chart(plot_fig1_growth_divergence(df, date_range, current_theme), 
+                plotly_chart(growth_figs["growth_divergence"], "growth_divergence",
                             config={'displayModeBar': False, 'responsive': True})
 
             st.markdown("###")
@@ -424,7 +421,10 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
             with col_chart:
-                st.plotly_chart(plot_fig3_animated(df, date_range, current_theme), 
+                fig_cumulative = growth_figs["cumulative_gdp"]
+                if st.toggle("Animate", value=False, key="animate_cumulative_gdp"):
+                    fig_cumulative = get_figure("cumulative_gdp.animated", current_theme, date_range)
+                plotly_chart(fig_cumulative, "cumulative_gdp",
                             config={'displayModeBar': False, 'responsive': True})
 
             st.markdown("###")
@@ -449,20 +449,15 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
             with col_chart:
-                st.plotly_chart(plot_fig2_decomposition(df, current_theme), config={'displayModeBar': False, 'responsive': True})
-
-        st.markdown("---")
+                plotly_chart(growth_figs["gdp_decomposition"], "gdp_decomposition", config={'displayModeBar': False, 'responsive': True})
 
-        st.title("3. CURRENT ACCOUNT")
+    def render_current_account():
+        ca_figs = section_figures("current_account", current_theme, date_range)
         
-        df_ca = get_current_account_data()
-        
-        if df_ca.empty:
+        if ca_figs is None:
             st.error("CONNECTION ERROR: UNABLE TO FETCH ECB DATA.")
         else:
-            s3_data = get_s3_data()
-            
-            fig_goods = plot_fig2_goods_balance(s3_data, date_range, current_theme)
+            fig_goods = ca_figs["goods_balance"]
             if fig_goods:
                 col_text, col_chart = st.columns([1, 3])
                 with col_text:
@@ -485,13 +480,13 @@ def main():
                     </div>
                     """, unsafe_allow_html=True)
                 with col_chart:
-                    st.plotly_chart(fig_goods, config={'displayModeBar': False, 'responsive': True})
+                    plotly_chart(fig_goods, "goods_balance", config={'displayModeBar': False, 'responsive': True})
             else:
                 st.info("Insufficient data for Goods Balance decomposition.")
 
             st.markdown("###")
             
-            fig_bridge = plot_fig3_impact_bridge(s3_data, date_range, current_theme)
+            fig_bridge = ca_figs["impact_bridge"]
             if fig_bridge:
                 col_text, col_chart = st.columns([1, 3])
                 with col_text:
@@ -514,10 +509,55 @@ def main():
                     </div>
                     """, unsafe_allow_html=True)
                 with col_chart:
-                    st.plotly_chart(fig_bridge, config={'displayModeBar': False, 'responsive': True})
+                    plotly_chart(fig_bridge, "impact_bridge", config={'displayModeBar': False, 'responsive': True})
             else:
                 st.info("Insufficient data for Impact Bridge analysis.")
 
+    def perf_panel(spans, root="dashboard.main", title="PERFORMANCE"):
+        # only shown with ECB_PERF=1: where this run (or a section's fragment rerun) spent its time
+        # (the spans are also in perf.PERF_LOG)
+        by_id = {record["id"]: record for record in spans}
+
+        def depth(record):
+            return 0 if record["parent"] not in by_id else 1 + depth(by_id[record["parent"]])
+
+        with st.expander(title, expanded=False):
+            root_ms = [record["ms"] for record in spans if record["name"] == root]
+            st.caption(f"{len(spans)} spans, {root_ms[0] if root_ms else 0:.0f} ms in {root}; "
+                       f"self time excludes nested spans of the same thread. Log: {perf.PERF_LOG}")
+            st.dataframe(pd.DataFrame(perf.summarize(spans, "layer")), hide_index=True)
+            st.dataframe(pd.DataFrame(perf.summarize(spans, "name")), hide_index=True)
+            timeline = [{"span": "  " * depth(record) + record["name"], "layer": record["layer"],
+                         "ms": record["ms"], "self_ms": record["self_ms"], "detail": record.get("detail", ""),
+                         "thread": record["thread"]}
+                        for record in sorted(spans, key=lambda record: record["start"])]
+            st.dataframe(pd.DataFrame(timeline), hide_index=True)
+
+    with perf.collect(page) as spans, perf.span("dashboard.main", "render", detail=page):
+        if page == "OVERVIEW":
+            from overview_charts import render_overview
+            render_overview()
+
+        elif page == "DETAILED ANALYSIS":
+            # the series of every open section are loaded in one parallel pass before any figure is built
+            toggles = {"price_stability": (True, ["price_stability", "inflation", "exchange_rate"]),
+                       "growth": (False, ["growth"]),
+                       "current_account": (False, ["current_account"])}
+            prefetch_sections([section for toggle, (expanded, sections) in toggles.items()
+                               if st.session_state.get(f"show_{toggle}", expanded) for section in sections])
+
+            detailed_section("1. PRICE STABILITY", "price_stability", render_price_stability, expanded=True)
+
+            st.markdown("---")
+
+            detailed_section("2. ECONOMIC GROWTH", "growth", render_growth)
+
+            st.markdown("---")
+
+            detailed_section("3. CURRENT ACCOUNT", "current_account", render_current_account)
+
+    if perf.ENABLED:
+        perf_panel(spans)
 
 
 
@@ -1,144 +1,804 @@
+import numpy as np
 import pandas as pd
 import requests
 import io
 import os
+import threading
 import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+from series_cache import get_backend
+from periods import parse_periods, format_period
+from memo import Memo, memoize
+from perf import timed
+from series_catalog import SERIES, DATASETS, ecb_jobs
+from series_store import SeriesStore
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+# binary series cache lives in DATA_DIR/cache; the Date,Value CSVs in DATA_DIR are a legacy/export format
+CACHE_BACKEND = os.environ.get("ECB_CACHE_BACKEND", "npz")
+EXPORT_CSV = os.environ.get("ECB_EXPORT_CSV", "0") == "1"
+ECB_API_URL = os.environ.get("ECB_API_URL", "https://data-api.ecb.europa.eu/service")
+
+# cap on concurrent requests to the ECB API (also the size of the connection pool)
+MAX_IN_FLIGHT = 4
+
+# how long a cached series is trusted before it is revalidated, by SDMX frequency (first key dimension)
+CACHE_TTL_HOURS = {
+    'D': 12,
+    'B': 12,
+    'W': 24,
+    'M': 24 * 7,
+    'Q': 24 * 14,
+    'S': 24 * 30,
+    'A': 24 * 30,
+}
+REVALIDATE_TIMEOUT = 10
+# after a failed revalidation (e.g. API unreachable) the cached copy is served for this long before retrying
+REVALIDATE_RETRY_SECONDS = 15 * 60
+_revalidate_failed_at = {}
+
+# request profiles merged under every query's params: "full" is the API default with all
+# attributes, "lean" asks for observations only
+FETCH_PROFILES = {
+    "full": {'format': 'csvdata'},
+    "lean": {'format': 'csvdata', 'detail': 'dataonly'},
+}
+FETCH_PROFILE = os.environ.get("ECB_FETCH_PROFILE", "lean")
+REQUEST_HEADERS = {'Accept-Encoding': 'gzip'}
+
+# bytes on the wire and parse time per profile, see fetch_stats()
+_fetch_stats = {}
+_stats_lock = threading.Lock()
+
+# query coalescing: an OR-ed key may cover at most this many dimension combinations per requested series
+MAX_OVERFETCH = 4
+MAX_QUERY_KEY_LENGTH = 1000
+
+# responses are streamed: bytes pulled from the socket per read, rows handed to the parser per batch
+STREAM_CHUNK_BYTES = 64 * 1024
+STREAM_CHUNK_ROWS = 50_000
+
+# in-process layer over the disk cache: series frames by (key, window) and the frames the
+# getters derive from them. After MEMO_TTL_SECONDS the disk cache (and its freshness check) is consulted again.
+MEMO_TTL_SECONDS = 15 * 60
+_series_memo = Memo("series", maxsize=256, ttl=MEMO_TTL_SECONDS)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Shared requests.Session with a keep-alive connection pool sized for MAX_IN_FLIGHT.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_IN_FLIGHT)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def get_cache():
+    return get_backend(CACHE_BACKEND, os.path.join(DATA_DIR, "cache"))
+
+
+@timed("load", detail="key")
+def load_cache_entry(key, flow_ref=None):
+    """
+    Returns (df, meta) for a cached series, or None on a miss.
+    """
+    cache = get_cache()
+    try:
+        hit = cache.load(key)
+        if hit is not None:
+            return hit
+
+        # series cached by older versions as DATA_DIR/<key>.csv: load once and migrate
+        legacy = get_backend("csv", DATA_DIR)
+        hit = legacy.load(key)
+        if hit is None:
+            return None
+        df = hit[0]
+        # the export is trusted for its frequency's TTL from when it was written (e.g. checked
+        # out with the deploy) rather than revalidated on the first page view. That is not when
+        # its data was fetched, so it is marked migrated: its first refresh asks for everything
+        # from its last period on instead of what was updated after the checkout.
+        written = datetime.fromtimestamp(os.path.getmtime(legacy.path(key)), timezone.utc)
+        meta = {"flow_ref": flow_ref, "fetched_at": written.isoformat(timespec='seconds'),
+                "last_period": last_period_of(df, key), "migrated": True}
+        if cache.ext != legacy.ext:
+            cache.save(key, df, meta)
+        return df, meta
+    except Exception as e:
+        print(f"Error loading cache for {key}: {e}")
+        return None
+
+
+def load_cached(key, flow_ref=None):
+    entry = load_cache_entry(key, flow_ref)
+    return None if entry is None else entry[0]
+
+
+def last_period_of(df, key):
+    dates = df['Date'].dropna() if 'Date' in df.columns else []
+    if len(dates) == 0:
+        return None
+    return format_period(dates.max(), key.split('.')[0])
+
+
+@timed("load", detail="key")
+def fetch_ecb_data(resource, flow_ref, key, params=None, refresh=False):
+    """
+    Returns the series from cache, downloading it on a miss.
+    params are merged over the FETCH_PROFILE query parameters; startPeriod/endPeriod
+    limit the download to the caller's window. A cached series older than its CACHE_TTL_HOURS is revalidated first;
+    with refresh=True it is brought up to date with a delta request.
+    Results are memoized in-process, see MEMO_TTL_SECONDS.
+    """
+    memo_key = (key, window_key(params))
+    if not refresh:
+        found, df = _series_memo.get(memo_key)
+        if found:
+            return df.copy()
+    df = load_series(flow_ref, key, params, refresh)
+    if not df.empty:
+        _series_memo.put(memo_key, df)
+    return df.copy()
+
+
+def load_series(flow_ref, key, params=None, refresh=False):
+    entry = load_cache_entry(key, flow_ref)
+    if entry is not None and not covers_window(entry[1], params):
+        entry = None
+    if entry is not None and not refresh:
+        if is_fresh(key, entry[1]):
+            return entry[0]
+        return revalidate_series(flow_ref, key, entry)
 
-def fetch_ecb_data(resource, flow_ref, key, params=None):
+    try:
+        if entry is None:
+            return download_series(flow_ref, key, params)
+        return refresh_series(flow_ref, key, entry)
+    except Exception as e:
+        print(f"Error fetching {key}: {e}")
+        return entry[0] if entry is not None else pd.DataFrame()
+
+
+def window_key(params):
+    return tuple(sorted((params or {}).items()))
+
+
+def has_data(value):
+    """
+    True unless a getter result is (or contains) an empty frame, i.e. something failed to load.
+    """
+    if isinstance(value, dict):
+        return all(has_data(v) for v in value.values())
+    return not value.empty
+
+
+def invalidate_memo(key=None):
+    """
+    Drops memoized frames of one series (or of all) and every getter result derived from them.
+    Called whenever a series is rewritten in the cache.
+    """
+    _series_memo.invalidate(None if key is None else lambda k: k[0] == key)
+
+
+def is_fresh(key, meta):
+    failed_at = _revalidate_failed_at.get(key)
+    if failed_at is not None and time.time() - failed_at < REVALIDATE_RETRY_SECONDS:
+        return True
+    if not meta.get("fetched_at"):
+        return False
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(meta["fetched_at"])
+    ttl_hours = CACHE_TTL_HOURS.get(key.split('.')[0], 24)
+    return age.total_seconds() < ttl_hours * 3600
+
+
+def covers_window(meta, params):
+    """
+    True if a cached series (meta) holds at least the startPeriod/endPeriod window in params.
+    """
+    params = params or {}
+    start, end = params.get('startPeriod'), params.get('endPeriod')
+    cached_start, cached_end = meta.get('start_period'), meta.get('end_period')
+    if cached_start and (not start or pd.Period(start).start_time < pd.Period(cached_start).start_time):
+        return False
+    if cached_end and (not end or pd.Period(end).end_time > pd.Period(cached_end).end_time):
+        return False
+    return True
+
+
+def widest_window(params_a, params_b):
+    params = {**(params_a or {}), **(params_b or {})}
+    for name, pick in (('startPeriod', min), ('endPeriod', max)):
+        values = [p.get(name) for p in (params_a or {}, params_b or {})]
+        if None in values:
+            params.pop(name, None)
+        else:
+            params[name] = pick(values, key=lambda v: pd.Period(v).start_time)
+    return params
+
+
+def query_params(params, profile=None):
+    return {**FETCH_PROFILES[profile or FETCH_PROFILE], **(params or {})}
+
+
+def get_csvdata(flow_ref, query_key, params, headers=None, timeout=60, profile=None):
+    """
+    GETs one SDMX csvdata query with the fetch profile applied and records its transfer size.
+    """
+    profile = profile or FETCH_PROFILE
+    base_url = f"{ECB_API_URL}/data/{flow_ref}/{query_key}"
+    # the body is not downloaded here; parse_response streams it into the parser
+    response = get_session().get(base_url, params=query_params(params, profile),
+                                 headers={**REQUEST_HEADERS, **(headers or {})}, timeout=timeout, stream=True)
+    record_fetch(profile, requests=1)
+    return response
+
+
+@timed("parse", detail="keys")
+def parse_response(response, keys, profile=None):
+    """
+    Streams the body of a get_csvdata response through split_csvdata and records its size.
+    """
+    start = time.perf_counter()
+    with response:
+        stream = ResponseStream(response)
+        frames = split_csvdata(stream, keys)
+    record_fetch(profile or FETCH_PROFILE, parse_seconds=time.perf_counter() - start,
+                 wire_bytes=wire_bytes(response), decoded_bytes=stream.bytes_read)
+    return frames
+
+
+def wire_bytes(response):
+    # Content-Length is the (possibly gzip-compressed) size on the wire; chunked responses
+    # report what urllib3 has read from the socket
+    return int(response.headers.get('Content-Length', response.raw.tell()))
+
+
+def record_fetch(profile, **counters):
+    with _stats_lock:
+        stats = _fetch_stats.setdefault(profile, {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0, "parse_seconds": 0.0})
+        for name, value in counters.items():
+            stats[name] += value
+
+
+def fetch_stats():
+    with _stats_lock:
+        return {profile: dict(stats) for profile, stats in _fetch_stats.items()}
+
+
+def request_csvdata(flow_ref, key, params, delta=False, headers=None, timeout=60):
+    """
+    Runs one SDMX csvdata query. Returns (df, response) with df=None when the server
+    reports nothing new (304, or 404 "no results" for a delta query).
+    """
+    # the with block closes the streamed response on every path, raise_for_status included
+    with get_csvdata(flow_ref, key, params, headers=headers, timeout=timeout) as response:
+        # the API answers 304 (or 404 "no results") when nothing was updated in the requested window
+        if response.status_code == 304 or (delta and response.status_code == 404):
+            return None, response
+        response.raise_for_status()
+        return parse_response(response, [key])[key], response
+
+
+def parse_csvdata(text, key):
+    return split_csvdata(text, [key])[key]
+
+
+class ResponseStream(io.RawIOBase):
+    """
+    Read-only file object over response.iter_content, so pd.read_csv can consume a
+    streamed (stream=True) response chunk by chunk without the body ever being held in memory.
+    """
+    def __init__(self, response, chunk_size=STREAM_CHUNK_BYTES):
+        self._chunks = response.iter_content(chunk_size)
+        # the current chunk and how much of it has been read: slicing off the read part would
+        # copy the rest on every call
+        self._pending = memoryview(b"")
+        self._offset = 0
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._offset == len(self._pending):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending, self._offset = memoryview(chunk), 0
+        n = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:n] = self._pending[self._offset:self._offset + n]
+        self._offset += n
+        self.bytes_read += n
+        return n
+
+
+def split_csvdata(source, keys):
+    """
+    Parses a csvdata response (text or a binary file object such as ResponseStream) into
+    {key: Date/Value frame}. Rows are read STREAM_CHUNK_ROWS at a time and only their typed
+    Date/Value arrays are kept. Responses to a coalesced query are split on the KEY column
+    (FLOW.<series key>); keys without data are left out.
+    """
+    # only the observation columns are read; attributes (titles, units, ...) are skipped
+    wanted = {'TIME_PERIOD', 'PERIOD', 'OBS_VALUE', 'VALUE'}
+    if len(keys) > 1:
+        wanted.add('KEY')
+    dtypes = {'TIME_PERIOD': str, 'PERIOD': str, 'OBS_VALUE': 'float64', 'VALUE': 'float64', 'KEY': str}
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    reader = pd.read_csv(source, usecols=lambda c: c.upper() in wanted, dtype=dtypes,
+                         chunksize=STREAM_CHUNK_ROWS)
+    col_map = {'TIME_PERIOD': 'Date', 'PERIOD': 'Date', 'OBS_VALUE': 'Value', 'VALUE': 'Value'}
+    single = keys[0] if len(keys) == 1 else None
+    wanted_keys = set(keys)
+    parts = {}
+
+    for chunk in reader:
+        chunk.columns = [c.upper() for c in chunk.columns]
+        chunk = chunk.rename(columns=col_map)
+        if 'Date' not in chunk.columns or 'Value' not in chunk.columns:
+            raise ValueError(f"Missing columns for {', '.join(keys)}")
+
+        dates = parse_periods(chunk['Date'].to_numpy(dtype=object))
+        values = chunk['Value'].to_numpy(dtype='float64')
+        if single is not None:
+            parts.setdefault(single, []).append((dates, values))
+            continue
+
+        if 'KEY' not in chunk.columns:
+            raise ValueError(f"Cannot split response without a KEY column for {', '.join(keys)}")
+        # few distinct KEYs per response: strip the flow prefix once per KEY, not per row
+        codes, full_keys = pd.factorize(chunk['KEY'])
+        for code, full_key in enumerate(full_keys):
+            key = full_key.split('.', 1)[-1]
+            if key in wanted_keys:
+                idx = np.flatnonzero(codes == code)
+                parts.setdefault(key, []).append((dates[idx], values[idx]))
+
+    frames = {}
+    for key, chunks in parts.items():
+        dates = np.concatenate([d for d, _ in chunks])
+        values = np.concatenate([v for _, v in chunks])
+        order = np.argsort(dates, kind='stable')
+        frames[key] = pd.DataFrame({'Date': dates[order], 'Value': values[order]})
+    if single is not None and single not in frames:
+        # a response with a header but no rows still yields an (empty) frame for a single key
+        frames[single] = pd.DataFrame({'Date': np.array([], dtype='datetime64[ns]'), 'Value': np.array([], dtype='float64')})
+    return frames
+
+
+def plan_queries(jobs, max_overfetch=MAX_OVERFETCH, max_key_length=MAX_QUERY_KEY_LENGTH):
+    """
+    Coalesces (flow_ref, key, params) jobs into as few SDMX queries as possible.
+    Keys of one flow are merged greedily into OR-ed keys (e.g. Q.Y.PL+I9.W2...)
+    as long as the merged key covers at most max_overfetch times as many
+    dimension combinations as series requested.
+    Returns a list of (flow_ref, query_key, keys, params).
+    """
+    buckets = {}
+    for flow_ref, key, params in jobs:
+        bucket_id = (flow_ref, tuple(sorted((params or {}).items())))
+        buckets.setdefault(bucket_id, (flow_ref, params, []))
+        if key not in buckets[bucket_id][2]:
+            buckets[bucket_id][2].append(key)
+
+    def combinations(dims):
+        n = 1
+        for values in dims:
+            n *= len(values)
+        return n
+
+    def query_key(dims):
+        return '.'.join('+'.join(sorted(values)) for values in dims)
+
+    plan = []
+    for flow_ref, params, keys in buckets.values():
+        groups = [([{d} for d in key.split('.')], [key]) for key in keys]
+
+        while True:
+            best = None
+            for i in range(len(groups)):
+                for j in range(i + 1, len(groups)):
+                    (dims_a, keys_a), (dims_b, keys_b) = groups[i], groups[j]
+                    if len(dims_a) != len(dims_b):
+                        continue
+                    dims = [a | b for a, b in zip(dims_a, dims_b)]
+                    n_keys = len(keys_a) + len(keys_b)
+                    n_combos = combinations(dims)
+                    if n_combos > max_overfetch * n_keys or len(query_key(dims)) > max_key_length:
+                        continue
+                    score = (n_combos / n_keys, n_combos)
+                    if best is None or score < best[0]:
+                        best = (score, i, j, dims)
+            if best is None:
+                break
+            _, i, j, dims = best
+            groups[i] = (dims, groups[i][1] + groups[j][1])
+            groups.pop(j)
+
+        for dims, group_keys in groups:
+            plan.append((flow_ref, query_key(dims), group_keys, params))
+
+    return plan
+
+
+@timed("load", detail="key")
+def store_series(flow_ref, key, df, response=None, validators=True, params=None):
+    """
+    Writes a series and its freshness metadata to the cache. The ETag/Last-Modified
+    validators are only kept when response holds the full series (validators=True);
+    params records the startPeriod/endPeriod window the series was downloaded for.
+    """
+    headers = response.headers if response is not None else {}
+    params = params or {}
+    meta = {
+        "flow_ref": flow_ref,
+        "start_period": params.get('startPeriod'),
+        "end_period": params.get('endPeriod'),
+        "fetched_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "last_period": last_period_of(df, key),
+        "bytes": wire_bytes(response) if response is not None else 0,
+        "etag": headers.get("ETag") if validators else None,
+        "last_modified": headers.get("Last-Modified") if validators else None,
+    }
+    get_cache().save(key, df, meta)
+    invalidate_memo(key)
+    if EXPORT_CSV:
+        get_backend("csv", DATA_DIR).save(key, df)
+    return meta
+
+
+@timed("fetch", detail="key")
+def download_series(flow_ref, key, params=None):
+    """
+    Downloads one series from the ECB API and writes it to the cache. Raises on failure.
+    """
+    frames = download_group(flow_ref, key, [key], params)
+    return frames[key]
+
+
+@timed("fetch", detail="query_key")
+def download_group(flow_ref, query_key, keys, params=None):
+    """
+    Downloads the series in keys with one (possibly coalesced) query and caches each of them.
+    Returns {key: df}; keys missing from the response are left out. Raises on failure.
+    """
+    print(f"Fetching {query_key} from API...")
+    with get_csvdata(flow_ref, query_key, params) as response:
+        response.raise_for_status()
+        frames = parse_response(response, keys)
+    for key, df in frames.items():
+        # validators of a coalesced response do not describe a single series
+        store_series(flow_ref, key, df, response, validators=len(keys) == 1, params=params)
+    return frames
+
+
+@timed("fetch", detail="key")
+def revalidate_series(flow_ref, key, entry):
+    """
+    Checks a stale cached series against the API as cheaply as possible:
+    a conditional request when validators are known, otherwise a lastNObservations=1 probe.
+    Unchanged series only get their fetched_at bumped. Never raises; on failure the
+    cached copy is returned and the check is retried after REVALIDATE_RETRY_SECONDS.
+    """
+    cached, meta = entry
+    flow_ref = flow_ref or meta.get("flow_ref")
+    try:
+        if meta.get("etag") or meta.get("last_modified"):
+            headers = {}
+            if meta.get("etag"): headers['If-None-Match'] = meta["etag"]
+            if meta.get("last_modified"): headers['If-Modified-Since'] = meta["last_modified"]
+
+            # the validators belong to the query the series was downloaded with
+            window = window_params(meta)
+            df, response = request_csvdata(flow_ref, key, window, headers=headers, timeout=REVALIDATE_TIMEOUT)
+            if df is None:
+                touch_series(key, entry)
+                return cached
+            store_series(flow_ref, key, df, response, params=window)
+            return df
 
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+        probe_params = {'detail': 'dataonly', 'lastNObservations': 1}
+        probe, _ = request_csvdata(flow_ref, key, probe_params, timeout=REVALIDATE_TIMEOUT)
+        if probe is not None and not cached.empty and not probe.empty:
+            last_cached, last_probe = cached.iloc[-1], probe.iloc[-1]
+            if last_cached['Date'] == last_probe['Date'] and last_cached['Value'] == last_probe['Value']:
+                touch_series(key, entry)
+                return cached
 
-    file_path = os.path.join(DATA_DIR, f"{key}.csv")
+        return refresh_series(flow_ref, key, entry)
+    except Exception as e:
+        print(f"Could not revalidate {key}, serving cached copy: {e}")
+        _revalidate_failed_at[key] = time.time()
+        return cached
+
+
+def window_params(meta):
+    """
+    startPeriod/endPeriod query parameters of the window a cached series was downloaded for.
+    """
+    fields = (('startPeriod', 'start_period'), ('endPeriod', 'end_period'))
+    return {param: meta[field] for param, field in fields if meta.get(field)}
+
+
+def touch_series(key, entry):
+    df, meta = entry
+    meta = {**meta, "fetched_at": datetime.now(timezone.utc).isoformat(timespec='seconds'), "bytes": 0}
+    get_cache().save(key, df, meta)
+
+
+def merge_delta(cached, delta):
+    """
+    Appends delta observations to a cached series; revised periods take the delta value.
+    """
+    merged = pd.concat([cached, delta], ignore_index=True)
+    merged = merged.drop_duplicates(subset='Date', keep='last')
+    return merged.sort_values('Date').reset_index(drop=True)
+
+
+@timed("fetch", detail="key")
+def refresh_series(flow_ref, key, entry):
+    """
+    Brings a cached series up to date. Asks only for observations updated since the
+    last fetch (updatedAfter); series migrated from CSV, whose fetch time is not known,
+    are re-read from their last cached period (startPeriod). Raises on failure.
+    """
+    cached, meta = entry
+    window = window_params(meta)
+    params = dict(window)
+    if meta.get("fetched_at") and not meta.get("migrated"):
+        params['updatedAfter'] = meta["fetched_at"]
+    elif meta.get("last_period"):
+        params['startPeriod'] = meta["last_period"]
+    else:
+        return download_series(flow_ref, key, window)
+
+    print(f"Refreshing {key} from API...")
+    delta, response = request_csvdata(flow_ref, key, params, delta=True)
+    df = cached if delta is None or delta.empty else merge_delta(cached, delta)
+    # validators of a delta response do not describe the full series
+    store_series(flow_ref, key, df, response, validators=False, params=window)
+    return df
+
+
+@timed("load")
+def fetch_ecb_many(jobs, max_workers=MAX_IN_FLIGHT, refresh=False):
+    """
+    Fetches several series concurrently over the shared session.
+    jobs: list of (flow_ref, key) or (flow_ref, key, params) tuples.
+    With refresh=True cached series are delta-refreshed instead of returned as is.
+    Returns (frames, errors): frames in input order (empty DataFrame on failure),
+    errors maps each failed key to its error message.
+    """
+    frames = [None] * len(jobs)
+    errors = {}
+    misses = {}
+    tasks = []
+
+    for i, job in enumerate(jobs):
+        flow_ref, key = job[0], job[1]
+        params = job[2] if len(job) > 2 else None
+        if not refresh:
+            found, df = _series_memo.get((key, window_key(params)))
+            if found:
+                frames[i] = df
+                continue
+        entry = load_cache_entry(key, flow_ref)
+        if entry is None or not covers_window(entry[1], params):
+            # the same series requested with different windows is downloaded once, for the widest one
+            previous = misses.get(key)
+            misses[key] = (flow_ref, key, params if previous is None else widest_window(previous[2], params))
+        elif refresh:
+            tasks.append((refresh_series, (flow_ref, key, entry), [key]))
+        elif not is_fresh(key, entry[1]):
+            tasks.append((revalidate_series, (flow_ref, key, entry), [key]))
+        else:
+            frames[i] = entry[0]
 
+    for flow_ref, query_key, keys, params in plan_queries(list(misses.values())):
+        tasks.append((download_group, (flow_ref, query_key, keys, params), keys))
 
-    if os.path.exists(file_path):
+    results = {}
+    if tasks:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            futures = [(pool.submit(fn, *args), fn, keys) for fn, args, keys in tasks]
+            for future, fn, keys in futures:
+                try:
+                    out = future.result()
+                    results.update(out if fn is download_group else {keys[0]: out})
+                    for key in keys:
+                        if key not in results:
+                            errors[key] = "No data in response"
+                except Exception as e:
+                    print(f"Error fetching {', '.join(keys)}: {e}")
+                    for key in keys:
+                        errors[key] = str(e)
+
+    for i, job in enumerate(jobs):
+        if frames[i] is not None:
+            continue
+        key = job[1]
+        if key in results:
+            frames[i] = results[key]
+        else:
+            # a failed refresh keeps serving the cached copy
+            cached = load_cached(key) if key in errors else None
+            frames[i] = cached if cached is not None else pd.DataFrame()
+
+    for job, df in zip(jobs, frames):
+        if job[1] not in errors and not df.empty:
+            _series_memo.put((job[1], window_key(job[2] if len(job) > 2 else None)), df)
+    return [df.copy() for df in frames], errors
+
+
+@timed("load")
+def fetch_ecb_groups(flow_ref, groups, params=None, max_workers=MAX_IN_FLIGHT):
+    """
+    Fetches series already grouped into OR-ed queries, groups: [(query_key, [series keys])], for
+    key sets too large for plan_queries to merge (e.g. s1.contributions.icp_queries). Groups whose
+    series are all cached are read as they are (refresh_cached brings them up to date); the others
+    are downloaded with one query each, concurrently.
+    Returns (frames {key: df} of the series found, errors {query_key: message}).
+    """
+    cache = get_cache()
+    missing = [(query_key, keys) for query_key, keys in groups if not all(cache.exists(key) for key in keys)]
+    errors = {}
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            futures = [pool.submit(download_group, flow_ref, query_key, keys, params) for query_key, keys in missing]
+            for future, (query_key, _) in zip(futures, missing):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error fetching {query_key}: {e}")
+                    errors[query_key] = str(e)
+
+    frames = {}
+    for _, keys in groups:
+        for key in keys:
+            df = load_cached(key, flow_ref)
+            if df is not None and not df.empty:
+                frames[key] = df
+    return frames, errors
+
+
+def compare_profiles(jobs, profiles=None):
+    """
+    Downloads jobs once with every fetch profile, bypassing the cache.
+    Returns {profile: {requests, wire_bytes, decoded_bytes, parse_seconds}}.
+    """
+    report = {}
+    for profile in profiles or FETCH_PROFILES:
+        before = fetch_stats().get(profile, {})
+        for flow_ref, query_key, keys, params in plan_queries(jobs):
+            with get_csvdata(flow_ref, query_key, params, profile=profile) as response:
+                response.raise_for_status()
+                parse_response(response, keys, profile)
+        after = fetch_stats()[profile]
+        report[profile] = {name: value - before.get(name, 0) for name, value in after.items()}
+    return report
+
+
+def cached_jobs():
+    """
+    (flow_ref, key, window params) of every series in the cache that knows its flow.
+    """
+    cache = get_cache()
+    jobs = []
+    for key in cache.keys():
+        hit = cache.load(key)
+        if hit is not None and hit[1].get("flow_ref"):
+            jobs.append((hit[1]["flow_ref"], key, window_params(hit[1])))
+    return jobs
+
+
+def refresh_cached(max_workers=MAX_IN_FLIGHT):
+    """
+    Delta-refreshes every series in the cache (e.g. from a nightly job).
+    Returns (bytes transferred per key, errors).
+    """
+    jobs = cached_jobs()
+    _, errors = fetch_ecb_many(jobs, max_workers=max_workers, refresh=True)
+    cache = get_cache()
+    transferred = {key: cache.load(key)[1].get("bytes", 0) for _, key, _ in jobs if key not in errors}
+    return transferred, errors
+
+
+def load_store(dataset, names):
+    """
+    SeriesStore of a catalog dataset with its series stored under names; failed downloads are left out.
+    """
+    series_ids = DATASETS[dataset]
+    frames, _ = fetch_ecb_many(ecb_jobs(series_ids))
+    store = SeriesStore()
+    for name, series_id, df in zip(names, series_ids, frames):
+        if not df.empty:
+            store.add(name, df, SERIES[series_id]["freq"])
+    return store
 
-        try:
-            df = pd.read_csv(file_path)
 
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'])
-            return df
-        except Exception as e:
-            print(f"Error loading cache for {key}: {e}")
-
-    base_url = f"https://data-api.ecb.europa.eu/service/data/{flow_ref}/{key}"
-    if params is None: params = {'format': 'csvdata'}
-    
-    try:
-        print(f"Fetching {key} from API...")
-        time.sleep(0.2)
-        response = requests.get(base_url, params=params, timeout=60)
-        response.raise_for_status()
-        
-        df = pd.read_csv(io.StringIO(response.text))
-        df.columns = [c.upper() for c in df.columns]
-        col_map = {'TIME_PERIOD': 'Date', 'PERIOD': 'Date', 'OBS_VALUE': 'Value', 'VALUE': 'Value'}
-        df = df.rename(columns=col_map)
-        
-        if 'Date' not in df.columns or 'Value' not in df.columns: 
-            print(f"Missing columns for {key}")
-            return pd.DataFrame()
-
-        def parse_date(date_str):
-            date_str = str(date_str).strip()
-
-            if 'Q1' in date_str: return pd.Timestamp(f"{date_str[:4]}-03-31")
-            if 'Q2' in date_str: return pd.Timestamp(f"{date_str[:4]}-06-30")
-            if 'Q3' in date_str: return pd.Timestamp(f"{date_str[:4]}-09-30")
-            if 'Q4' in date_str: return pd.Timestamp(f"{date_str[:4]}-12-31")
-            
-            try:
-                return pd.to_datetime(date_str) + pd.offsets.MonthEnd(0)
-            except:
-                pass
-            
-            return pd.NaT
-
-        df['Date'] = df['Date'].apply(parse_date)
-        df = df.sort_values('Date')
-        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-        
-
-        final_df = df[['Date', 'Value']]
-        final_df.to_csv(file_path, index=False)
-        
-        return final_df
-    except Exception as e:
-        print(f"Error fetching {key}: {e}")
-        return pd.DataFrame()
+GROWTH_COLUMNS = ["EA_GDP", "PL_GDP", "Consumption", "Investment", "Gov_Spending", "Exports", "Imports"]
 
 
+@timed("load")
+@memoize("get_growth_data", maxsize=1, ttl=MEMO_TTL_SECONDS, depends_on=(_series_memo,), cache_if=has_data)
 def get_growth_data():
 
-    
-    df_ea = fetch_ecb_data("data", "MNA", "Q.Y.I9.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N")
-    df_pl = fetch_ecb_data("data", "MNA", "Q.Y.PL.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N")
-    df_cons = fetch_ecb_data("data", "MNA", "Q.Y.PL.W0.S1M.S1.D.P31._Z._Z._T.EUR.LR.N")
-    df_inv = fetch_ecb_data("data", "MNA", "Q.Y.PL.W0.S1.S1.D.P51G.N11G._T._Z.EUR.LR.N")
-    df_gov = fetch_ecb_data("data", "MNA", "Q.Y.PL.W0.S13.S1.D.P3._Z._Z._T.EUR.LR.N")
-    df_exp = fetch_ecb_data("data", "MNA", "Q.Y.PL.W1.S1.S1.D.P6._Z._Z._Z.EUR.LR.N")
-    df_imp = fetch_ecb_data("data", "MNA", "Q.Y.PL.W1.S1.S1.C.P7._Z._Z._Z.EUR.LR.N")
-
-    if df_ea.empty or df_pl.empty: return pd.DataFrame()
-
-    df = df_ea.rename(columns={'Value': 'EA_GDP'})
-
-    def merge_comp(base, comp, name):
-        if comp.empty: return base
-        return pd.merge(base, comp.rename(columns={'Value': name}), on='Date', how='left')
-
-    df = merge_comp(df, df_pl, 'PL_GDP')
-    df = merge_comp(df, df_cons, 'Consumption')
-    df = merge_comp(df, df_inv, 'Investment')
-    df = merge_comp(df, df_gov, 'Gov_Spending')
-    df = merge_comp(df, df_exp, 'Exports')
-    df = merge_comp(df, df_imp, 'Imports')
+    store = load_store("growth", GROWTH_COLUMNS)
+
+    if "EA_GDP" not in store or "PL_GDP" not in store: return pd.DataFrame()
+
+    # rows of the euro area series; a component that failed to load is left out
+    df = store.frame([name for name in GROWTH_COLUMNS if name in store], how="left")
     return df[df['Date'] >= '1996-01-01'].reset_index(drop=True)
 
 
+@timed("load")
+@memoize("get_current_account_data", maxsize=1, ttl=MEMO_TTL_SECONDS, depends_on=(_series_memo,), cache_if=has_data)
 def get_current_account_data():
-    key_pl = "Q.Y.PL.W1.S1.S1.B.B11._Z._Z._Z.EUR.V.N"
-    key_ea = "Q.Y.I9.W1.S1.S1.B.B11._Z._Z._Z.EUR.V.N"
+    store = load_store("current_account", ["PL_CA", "EA_CA"])
 
-    df_pl = fetch_ecb_data("data", "MNA", key_pl)
-    df_ea = fetch_ecb_data("data", "MNA", key_ea)
-
-    if df_pl.empty or df_ea.empty:
+    if "PL_CA" not in store or "EA_CA" not in store:
         return pd.DataFrame()
 
-    df = pd.merge(df_pl.rename(columns={'Value': 'PL_CA'}), 
-                  df_ea.rename(columns={'Value': 'EA_CA'}), 
-                  on='Date', how='inner')
-    
-    return df[df['Date'] >= '2015-01-01'].sort_values('Date').reset_index(drop=True)
+    df = store.frame(["PL_CA", "EA_CA"], how="inner")
+    return df[df['Date'] >= '2015-01-01'].reset_index(drop=True)
 
 
+@timed("load")
+@memoize("get_terms_of_trade_data", maxsize=1, ttl=MEMO_TTL_SECONDS, depends_on=(_series_memo,), cache_if=has_data)
+def get_terms_of_trade_data():
+    # the volume series are shared with get_growth_data (catalog window from 1996); the inner join keeps 2021 onwards
+    names = ["Exp_V", "Imp_V", "Exp_L", "Imp_L"]
+    store = load_store("terms_of_trade", names)
 
+    if any(name not in store for name in names):
+        return pd.DataFrame()
 
+    df_tot = store.frame(names, how="inner")
+    df_tot['Exp_P'] = df_tot['Exp_V'] / df_tot['Exp_L']
+    df_tot['Imp_P'] = df_tot['Imp_V'] / df_tot['Imp_L']
+    df_tot['ToT'] = (df_tot['Exp_P'] / df_tot['Imp_P']) * 100
+    return df_tot
 
+
+@timed("load")
+@memoize("get_s3_data", maxsize=1, ttl=MEMO_TTL_SECONDS, depends_on=(_series_memo,), cache_if=has_data)
 def get_s3_data():
 
-    datasets = {
-        "PL_CA_Monthly": "M.N.PL.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL",
-        "EA_CA_Monthly": "M.N.I9.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL",
-        "PL_Goods_Total": "Q.N.PL.W1.S1.S1.T.B.G._Z._Z._Z.EUR._T._X.N.ALL",
-        "PL_Goods_Russia": "Q.N.PL.RU.S1.S1.T.B.G._Z._Z._Z.EUR._T._X.N.ALL"
-    }
-    
+    datasets = dict(zip(["PL_CA_Monthly", "EA_CA_Monthly", "PL_Goods_Total", "PL_Goods_Russia"], DATASETS["s3"]))
+    frames, errors = fetch_ecb_many(ecb_jobs(datasets.values()))
+
     results = {}
-    for name, key in datasets.items():
-        df = fetch_ecb_data("data", "BPS", key)
-        if not df.empty:
-            results[name] = df
-        else:
+    for (name, series_id), df in zip(datasets.items(), frames):
+        key = SERIES[series_id]["key"]
+        if key in errors or df.empty:
             print(f"Warning: Failed to fetch {name} ({key})")
-            results[name] = pd.DataFrame()
-    
+        results[name] = df
 
-            
     return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["refresh"]:
+        transferred, errors = refresh_cached()
+        print(f"Refreshed {len(transferred)} series, {sum(transferred.values())} bytes transferred")
+        for key, err in errors.items():
+            print(f"  failed {key}: {err}")
+    elif sys.argv[1:] == ["profiles"]:
+        for profile, stats in compare_profiles(cached_jobs()).items():
+            print(f"{profile:>6}: {stats['requests']} requests, {stats['wire_bytes']} bytes on the wire, "
+                  f"{stats['decoded_bytes']} bytes decoded, {stats['parse_seconds'] * 1000:.1f} ms parsing")
@@ -0,0 +1,144 @@
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+from periods import format_period
+
+# Local stand-in for the ECB Data Portal API, for benchmarks and offline runs of the dashboard.
+# It answers the csvdata queries data_fetcher sends from the Date,Value exports of ECB series in
+# data/ (named <series key>.csv): OR-ed keys ("A+B"), startPeriod/endPeriod, lastNObservations
+# and detail=dataonly, with ETag revalidation and gzip like the real API. Revised and new
+# observations released with publish() are merged into the series; a delta query (updatedAfter)
+# gets those published after its timestamp, or 304 when a series has none.
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+FREQUENCIES = ('A', 'S', 'Q', 'M', 'W', 'B', 'D')
+
+
+def load_fixtures(data_dir=DATA_DIR):
+    """
+    {series key: [(SDMX period, value string), ...]} of the exports in data_dir.
+    """
+    series = {}
+    for name in sorted(os.listdir(data_dir)):
+        key = name[:-4]
+        if not name.endswith('.csv') or key.split('.')[0] not in FREQUENCIES:
+            continue
+        df = pd.read_csv(os.path.join(data_dir, name), dtype={'Value': str}, parse_dates=['Date'])
+        freq = key.split('.')[0]
+        series[key] = [(format_period(date, freq), value) for date, value in zip(df['Date'], df['Value'])]
+    return series
+
+
+class ECBStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # set per server by start(); published: {series key: [(period, value, publication time), ...]}
+    series = {}
+    published = {}
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip('/').split('/')
+        if len(parts) < 3 or parts[-3] != 'data':
+            return self.reply(404)
+        flow_ref, query_key = parts[-2], parts[-1]
+        if self.latency:
+            time.sleep(self.latency)
+        delta = 'updatedAfter' in params
+        source = self.series
+        if delta:
+            since = datetime.fromisoformat(params['updatedAfter'])
+            source = {key: [(period, value) for period, value, at in obs if at > since]
+                      for key, obs in self.published.items()}
+            source = {key: obs for key, obs in source.items() if obs}
+
+        dims = [d.split('+') for d in query_key.split('.')]
+        keys = [k for k in ('.'.join(c) for c in itertools.product(*dims)) if k in source]
+        if not keys:
+            return self.reply(304 if delta else 404)
+
+        dataonly = params.get('detail') == 'dataonly'
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(['KEY', 'FREQ', 'TIME_PERIOD', 'OBS_VALUE'] + ([] if dataonly else ['OBS_STATUS', 'UNIT']))
+        for key in keys:
+            obs = source[key]
+            if 'startPeriod' in params:
+                obs = [o for o in obs if o[0] >= params['startPeriod']]
+            if 'endPeriod' in params:
+                obs = [o for o in obs if o[0] <= params['endPeriod']]
+            if 'lastNObservations' in params:
+                obs = obs[-int(params['lastNObservations']):]
+            for period, value in obs:
+                writer.writerow([f"{flow_ref}.{key}", key[0], period, value] + ([] if dataonly else ['A', 'EUR']))
+
+        body = out.getvalue().encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.reply(304, {'ETag': etag})
+        headers = {'Content-Type': 'text/csv', 'ETag': etag}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        self.reply(200, headers, body)
+
+    def reply(self, status, headers=None, body=b""):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start(data_dir=DATA_DIR, port=0, latency=0.0):
+    """
+    Serves the exports in data_dir on 127.0.0.1:port (0: any free port) from a daemon thread,
+    answering every request after latency seconds. Returns (server, URL to use as ECB_API_URL);
+    server.shutdown() stops it.
+    """
+    handler = type("Handler", (ECBStubHandler,), {"series": load_fixtures(data_dir), "published": {},
+                                                  "latency": latency})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/service"
+
+
+def publish(server, updates, at=None):
+    """
+    Releases updates, {series key: [(SDMX period, value string), ...]} revising or extending the
+    series a server started by start() serves, at time at (an aware datetime, default now).
+    """
+    handler = server.RequestHandlerClass
+    at = at or datetime.now(timezone.utc)
+    for key, obs in updates.items():
+        handler.series[key] = sorted({**dict(handler.series.get(key, [])), **dict(obs)}.items())
+        handler.published[key] = handler.published.get(key, []) + [(period, value, at) for period, value in obs]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python v1/ecb_stub.py [port] [latency ms]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    server, url = start(port=port, latency=latency)
+    print(f"Serving {len(server.RequestHandlerClass.series)} series; run the dashboard with ECB_API_URL={url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
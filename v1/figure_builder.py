@@ -0,0 +1,220 @@
+import base64
+import copy
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+from memo import Memo
+from theme import TEMPLATE
+
+# Figures as plain plotly JSON dicts ({"data", "layout", "frames"}), built without
+# graph_objects: every go.Bar/go.Scatter/update_layout call validates and coerces each
+# property, which costs more than the data work behind most of our figures. The dicts are
+# validated once by validate() (build_artifacts, tests/test_figures.py and this module's
+# __main__ run it over every figure), and go.Figure, pio.to_json, st.plotly_chart and
+# payload.optimize all take them.
+
+# template JSON by name, and subplot grids (layout, axis references) by make_subplots arguments
+_template_memo = Memo("figure_templates", maxsize=8)
+_grid_memo = Memo("subplot_grids", maxsize=32)
+
+# plotly.js typed array codes of the numeric dtypes it decodes
+TYPED_ARRAY_CODES = {"int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+                     "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8"}
+
+
+def template_spec(name):
+    """
+    Plotly JSON of the registered template name, copied so figures never share it.
+    """
+    found, spec = _template_memo.get(name)
+    if not found:
+        spec = pio.templates[name].to_plotly_json()
+        _template_memo.put(name, spec)
+    return copy.deepcopy(spec)
+
+
+def figure(template=TEMPLATE, **layout):
+    """
+    Empty figure dict with the named template and the given layout (nested dicts, as in
+    plotly JSON: title=dict(text=...), not title_text=...).
+    """
+    fig = {"data": [], "layout": {}}
+    if template is not None:
+        fig["layout"]["template"] = template_spec(template)
+    return update_layout(fig, **layout)
+
+
+def subplots(rows=1, cols=1, template=TEMPLATE, **grid):
+    """
+    (figure dict, axes) of a make_subplots grid (grid takes make_subplots' keyword arguments).
+    axes[row, col] is the xaxis/yaxis reference of a trace on that subplot and
+    axes[row, col, True] the one on its secondary y axis. The grid is laid out by
+    make_subplots once per arguments.
+    """
+    key = repr((rows, cols, sorted(grid.items())))
+    found, value = _grid_memo.get(key)
+    if not found:
+        grid_fig = make_subplots(rows=rows, cols=cols, **grid)
+        layout = grid_fig.to_plotly_json()["layout"]
+        layout.pop("template", None)
+        specs = grid.get("specs") or [[{}] * cols for _ in range(rows)]
+        axes = {}
+        for row in range(1, rows + 1):
+            for col in range(1, cols + 1):
+                spec = specs[row - 1][col - 1]
+                if spec is None:
+                    continue
+                axes[row, col] = _axis_refs(grid_fig.get_subplot(row, col))
+                if spec.get("secondary_y"):
+                    axes[row, col, True] = _axis_refs(grid_fig.get_subplot(row, col, secondary_y=True))
+        value = (layout, axes)
+        _grid_memo.put(key, value)
+    layout, axes = value
+    return figure(template, **copy.deepcopy(layout)), dict(axes)
+
+
+def _axis_refs(subplot):
+    return {"xaxis": subplot.xaxis.plotly_name.replace("axis", ""),
+            "yaxis": subplot.yaxis.plotly_name.replace("axis", "")}
+
+
+def trace(kind, **attrs):
+    """
+    Trace dict of type kind. Arrays, Series and Indexes (at any depth) are stored the way
+    graph_objects stores them, see typed_array.
+    """
+    return {"type": kind, **_arrays(attrs)}
+
+
+def typed_array(values):
+    """
+    An array, Series or Index as graph_objects stores it: numbers as a plotly.js typed array
+    {"dtype", "bdata": base64 of the raw bytes} (64-bit integers narrowed to the smallest type
+    holding them), anything else as a numpy array copy, timezone-aware dates as local times.
+    """
+    if isinstance(values, (pd.Series, pd.Index)):
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            values = values.dt.tz_localize(None) if isinstance(values, pd.Series) else values.tz_localize(None)
+        values = values.to_numpy()
+    values = np.array(values)
+    if values.size == 0:
+        return values
+    if values.dtype.kind in "iu" and values.dtype.itemsize == 8:
+        low, high = values.min(), values.max()
+        candidates = ("int8", "int16", "int32") if values.dtype.kind == "i" else ("uint8", "uint16", "uint32")
+        narrow = next((dtype for dtype in candidates if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max), None)
+        if narrow is None:
+            return values
+        values = values.astype(narrow)
+    code = TYPED_ARRAY_CODES.get(str(values.dtype))
+    if code is None:
+        return values if values.dtype.kind in "fiuOM" else values.astype(object)
+    spec = {"dtype": code, "bdata": base64.b64encode(np.ascontiguousarray(values)).decode("ascii")}
+    if values.ndim > 1:
+        spec["shape"] = str(values.shape)[1:-1]
+    return spec
+
+
+def _arrays(attrs):
+    out = {}
+    for key, value in attrs.items():
+        if isinstance(value, dict):
+            out[key] = _arrays(value)
+        elif hasattr(value, "dtype") and hasattr(value, "__len__"):
+            out[key] = typed_array(value)
+        else:
+            out[key] = value
+    return out
+
+
+def add_trace(fig, kind, axes=None, **attrs):
+    """
+    Appends a trace(kind, **attrs), on the subplot whose axes (see subplots) are given.
+    """
+    fig["data"].append(trace(kind, **attrs, **(axes or {})))
+    return fig
+
+
+def _merge(node, changes):
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(node.get(key), dict):
+            _merge(node[key], value)
+        else:
+            node[key] = value
+
+
+def update_layout(fig, **changes):
+    """
+    Merges changes into the layout: nested dicts are updated key by key, anything else replaced.
+    """
+    _merge(fig["layout"], changes)
+    return fig
+
+
+def update_axes(fig, letter, refs=None, **attrs):
+    """
+    Merges attrs into the letter ("x"/"y") axes referenced by refs ("y", "y2", ...), by default
+    every such axis of the layout (or the first one when the layout has none yet).
+    """
+    if refs is None:
+        names = [key for key in fig["layout"] if key.startswith(f"{letter}axis")] or [f"{letter}axis"]
+    else:
+        names = [f"{letter}axis{ref[1:]}" for ref in refs]
+    for name in names:
+        _merge(fig["layout"].setdefault(name, {}), copy.deepcopy(attrs))
+    return fig
+
+
+def add_annotation(fig, **attrs):
+    fig["layout"].setdefault("annotations", []).append(attrs)
+    return fig
+
+
+def add_vline(fig, x, axes=None, **line):
+    """
+    Vertical line at x across the whole plot area of the subplot (default the first), as
+    go.Figure.add_vline draws it.
+    """
+    axes = axes or {"xaxis": "x", "yaxis": "y"}
+    fig["layout"].setdefault("shapes", []).append({
+        "type": "line", "x0": x, "x1": x, "xref": axes["xaxis"],
+        "y0": 0, "y1": 1, "yref": f"{axes['yaxis']} domain", "line": line,
+    })
+    return fig
+
+
+def validate(fig):
+    """
+    Plotly JSON of fig checked against the plotly schema: raises ValueError naming the first
+    invalid property, like building it with graph_objects would.
+    """
+    if not isinstance(fig, dict):
+        return fig.to_plotly_json()
+    return go.Figure(fig).to_plotly_json()
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from datetime import datetime
+    from theme import get_theme
+    from artifacts import ROOT_DIR
+    from figure_registry import FIGURES, load_datasets
+
+    # every registry figure validated once, and what graph_objects would add to its build
+    os.chdir(ROOT_DIR)
+    theme, date_range = get_theme("light"), (datetime(2018, 1, 1), datetime(2025, 12, 31))
+    for fig_id, spec in FIGURES.items():
+        data = load_datasets(spec["data"])
+        start = time.perf_counter()
+        fig = spec["build"](data, theme, date_range, spec["profile"])
+        build_s = time.perf_counter() - start
+        if fig is None:
+            continue
+        start = time.perf_counter()
+        validate(fig)
+        validate_s = time.perf_counter() - start
+        kind = "dict" if isinstance(fig, dict) else "go.Figure"
+        print(f"{fig_id:26s} {kind:9s} build {build_s * 1000:6.1f} ms, validation {validate_s * 1000:6.1f} ms")
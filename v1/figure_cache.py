@@ -0,0 +1,56 @@
+import hashlib
+import json
+from plotly.io.json import to_json_plotly
+import pandas as pd
+from memo import Memo
+
+# plotly JSON of built figures by registry key; process-wide like the loader memos
+_figure_memo = Memo("figures", maxsize=64)
+
+
+def fingerprint(value):
+    """
+    Content hash of plot inputs: frames (values, index and columns), and dicts, lists
+    and tuples of them; anything else (theme dicts' values, dates, flags) by repr.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _update(h, value)
+    return h.hexdigest()
+
+
+def _update(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        h.update(f"dict{len(value)}".encode())
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            _update(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"seq{len(value)}".encode())
+        for v in value:
+            _update(h, v)
+    else:
+        h.update(repr(value).encode())
+
+
+def cached_build(key, build):
+    """
+    Returns the figure stored under key, or build() (stored unless None). A hit is the
+    stored plotly JSON as a figure dict (see figure_builder), whatever build() returned:
+    st.plotly_chart and payload take dicts, and rebuilding a go.Figure would validate it again.
+    """
+    found, fig_json = _figure_memo.get(key)
+    if found:
+        return json.loads(fig_json)
+    fig = build()
+    if fig is not None:
+        _figure_memo.put(key, to_json_plotly(fig if isinstance(fig, dict) else fig.to_plotly_json()))
+    return fig
+
+
+def invalidate():
+    _figure_memo.invalidate()
@@ -0,0 +1,293 @@
+import pandas as pd
+from theme import PROFILES, GRID_W, GRID_H, TEXT_COLOR, FONT_FAMILY, BG_COLOR, profile_layout
+from figure_builder import figure, add_trace, update_layout, update_axes, add_vline, add_annotation
+from figure_cache import fingerprint, cached_build
+from artifacts import load_section
+from series_catalog import local_path, prefetch
+from perf import timed
+
+# Every dashboard figure by ID: the datasets it is built from, its render profile (see
+# theme.PROFILES) and a factory build(data, theme, date_range, profile) called only when the
+# figure is requested and not yet built for this data version (fingerprint of its datasets),
+# theme, date range and profile.
+
+ENERGY_FILES = (local_path("oil_imports_value"), local_path("oil_imports_volume"))
+
+
+def load_energy():
+    from s1.fig1 import get_data
+    try:
+        return tuple(get_data(path) for path in ENERGY_FILES)
+    except FileNotFoundError:
+        return None
+
+
+def load_inflation():
+    from s1.fig2 import get_data
+    return get_data()
+
+
+def load_hicp():
+    from s1.fig2_5 import get_data
+    return get_data()
+
+
+def load_exchange_rate():
+    from s1.fig3 import get_data
+    return get_data()
+
+
+def load_growth():
+    from data_fetcher import get_growth_data
+    return get_growth_data()
+
+
+def load_current_account():
+    from data_fetcher import get_current_account_data
+    return get_current_account_data()
+
+
+def load_s3():
+    from data_fetcher import get_s3_data
+    return get_s3_data()
+
+
+def load_terms_of_trade():
+    from data_fetcher import get_terms_of_trade_data
+    return get_terms_of_trade_data()
+
+
+# loaders are memoized (see memo.py), so a dataset shared by several figures is read once;
+# the series behind each are listed in series_catalog.DATASETS
+DATASETS = {
+    "energy": load_energy,
+    "inflation": load_inflation,
+    "hicp": load_hicp,
+    "exchange_rate": load_exchange_rate,
+    "growth": load_growth,
+    "current_account": load_current_account,
+    "s3": load_s3,
+    "terms_of_trade": load_terms_of_trade,
+}
+
+
+def load_datasets(names):
+    return {name: DATASETS[name]() for name in names}
+
+
+def prefetch_figures(fig_ids, extra=()):
+    """
+    Loads the series behind fig_ids (and the extra datasets) up front, each once and in parallel,
+    so building the figures only hits the memoized loaders.
+    """
+    datasets = dict.fromkeys([name for fig_id in fig_ids for name in FIGURES[fig_id]["data"]] + list(extra))
+    return prefetch(list(datasets))
+
+
+def prefetch_sections(sections):
+    return prefetch_figures([fig_id for section in sections for fig_id in DETAILED_SECTIONS[section]["figures"]])
+
+
+def make_placeholder(title: str, width: int, height: int, message: str = "Data unavailable"):
+    fig = figure(
+        "simple_white",
+        autosize=False,
+        width=width,
+        height=height,
+        margin=dict(l=20, r=20, t=20, b=20),
+    )
+    add_annotation(fig, text=title, xref="paper", yref="paper", x=0.5, y=0.6, showarrow=False,
+                   font=dict(size=14, family="Arial", color="#222"))
+    add_annotation(fig, text=message, xref="paper", yref="paper", x=0.5, y=0.4, showarrow=False,
+                   font=dict(size=11, family="Arial", color="#777"))
+    update_axes(fig, "x", visible=False)
+    update_axes(fig, "y", visible=False)
+    return fig
+
+
+@timed("figure")
+def plot_energy_overview(df_Val, df_Vol, profile="overview"):
+    from s1.fig1 import rebase, get_unit_value
+
+    df_Val = rebase(df_Val, "2022-January")
+    df_Vol = rebase(df_Vol, "2022-January")
+    df_unit = get_unit_value(df_Val, df_Vol)
+
+    style = PROFILES[profile]
+    tickfont = dict(family=FONT_FAMILY, color=TEXT_COLOR, weight=600, size=style["tick"])
+    fig = figure(
+        "plotly_white",
+        title=dict(text="<b>Energy Import Price vs Volume</b>", x=0.5, xanchor='center', y=0.95,
+                   font=dict(family=FONT_FAMILY, size=style["title"], color=TEXT_COLOR)),
+        font=dict(family=FONT_FAMILY, color=style.get("font_color", TEXT_COLOR)),
+        plot_bgcolor=BG_COLOR,
+        paper_bgcolor=BG_COLOR,
+        yaxis=dict(
+            title=dict(text="<b>Index (Jan 2022=100)</b>",
+                       font=dict(family=FONT_FAMILY, color=TEXT_COLOR, size=style["axis_title"])),
+            showgrid=False,
+            gridcolor='#E5E7EB',
+            zeroline=True,
+            zerolinecolor='#E5E7EB',
+            tickfont=tickfont,
+            tickprefix="<b>", ticksuffix="</b>"
+        ),
+        xaxis=dict(
+            title=dict(font=dict(family=FONT_FAMILY, size=style["axis_title"])),
+            showgrid=False,
+            tickfont=dict(tickfont),
+            tickprefix="<b>", ticksuffix="</b>"
+        ),
+        legend=dict(
+            font=dict(family=FONT_FAMILY, color=TEXT_COLOR, weight=600, size=style["legend"])
+        ),
+        margin=dict(l=0, r=0, t=50, b=0)
+    )
+
+    for df, name, color in ((df_Val, "Value", "#2E6BFF"), (df_Vol, "Volume", "#4CC9F0"),
+                            (df_unit, "Unit Price", "#FFCC00")):
+        add_trace(fig, "scatter", x=df["Date"], y=df["Value"], mode='lines', name=name,
+                  line=dict(color=color, width=2))
+
+    add_vline(fig, pd.Timestamp("2022-02-24"), width=3, dash="dash", color="#2A3F5F")
+    return update_layout(fig, **profile_layout(profile))
+
+
+# factories: (data, theme, date_range, profile) -> figure or None
+
+def build_price_stability(data, theme, date_range, profile):
+    from s1.fig1 import plot_price_stability
+    if data["energy"] is None:
+        return None
+    return plot_price_stability(ENERGY_FILES[1], ENERGY_FILES[0], theme, profile=profile)
+
+
+def build_inflation_comparison(data, theme, date_range, profile):
+    from s1.fig2 import plot_inflation_comparison
+    return plot_inflation_comparison(profile)
+
+
+def build_exchange_rate_inflation(data, theme, date_range, profile):
+    from s1.fig3 import plot_exchange_rate_inflation
+    return plot_exchange_rate_inflation(profile)
+
+
+def build_growth_divergence(data, theme, date_range, profile):
+    from s2_visualization import plot_fig1_growth_divergence
+    return plot_fig1_growth_divergence(data["growth"], date_range, theme, profile=profile)
+
+
+def build_cumulative_gdp(data, theme, date_range, profile):
+    from s2_visualization import plot_fig3_animated
+    return plot_fig3_animated(data["growth"], date_range, theme, animation=None, profile=profile)
+
+
+def build_cumulative_gdp_animated(data, theme, date_range, profile):
+    from s2_visualization import plot_fig3_animated
+    return plot_fig3_animated(data["growth"], date_range, theme, animation="range", profile=profile)
+
+
+def build_gdp_decomposition(data, theme, date_range, profile):
+    from s2_visualization import plot_fig2_decomposition
+    return plot_fig2_decomposition(data["growth"], theme, profile=profile)
+
+
+def build_goods_balance(data, theme, date_range, profile):
+    from s3_visualization import plot_fig2_goods_balance
+    return plot_fig2_goods_balance(data["s3"], date_range, theme, profile=profile)
+
+
+def build_impact_bridge(data, theme, date_range, profile):
+    from s3_visualization import plot_fig3_impact_bridge
+    return plot_fig3_impact_bridge(data["s3"], date_range, theme, profile=profile)
+
+
+def build_overview_hero(data, theme, date_range, profile):
+    from s2_visualization import plot_fig3_animated
+    return plot_fig3_animated(data["growth"], date_range, theme, animation=None, profile=profile)
+
+
+def build_overview_energy(data, theme, date_range, profile):
+    if data["energy"] is None:
+        return None
+    try:
+        return plot_energy_overview(*data["energy"], profile=profile)
+    except Exception as e:
+        print(f"Energy overview error: {e}")
+        return None
+
+
+def build_overview_inflation(data, theme, date_range, profile):
+    from s1.fig2_5 import plot_hicp_contribution
+    fig = plot_hicp_contribution(profile)
+    if not fig:
+        fig = make_placeholder("Poland Inflation Composition", GRID_W, GRID_H, message="(Data unavailable)")
+    return fig
+
+
+def build_overview_goods(data, theme, date_range, profile):
+    from s3_visualization import plot_fig2_goods_balance
+    return plot_fig2_goods_balance(data["s3"], date_range, theme, profile=profile)
+
+
+FIGURES = {
+    "price_stability": {"data": ["energy"], "profile": "full", "build": build_price_stability},
+    "inflation_comparison": {"data": ["inflation"], "profile": "full", "build": build_inflation_comparison},
+    "exchange_rate_inflation": {"data": ["exchange_rate"], "profile": "full", "build": build_exchange_rate_inflation},
+    "growth_divergence": {"data": ["growth"], "profile": "full", "build": build_growth_divergence},
+    "cumulative_gdp": {"data": ["growth"], "profile": "full", "build": build_cumulative_gdp},
+    # the animated variant is only built once a reader turns the animation on, so sections ship no frames
+    "cumulative_gdp.animated": {"data": ["growth"], "profile": "full", "build": build_cumulative_gdp_animated},
+    "gdp_decomposition": {"data": ["growth"], "profile": "full", "build": build_gdp_decomposition},
+    "goods_balance": {"data": ["s3"], "profile": "full", "build": build_goods_balance},
+    "impact_bridge": {"data": ["s3"], "profile": "full", "build": build_impact_bridge},
+    "overview.hero": {"data": ["growth"], "profile": "overview", "build": build_overview_hero},
+    "overview.energy": {"data": ["energy"], "profile": "overview", "build": build_overview_energy},
+    "overview.inflation": {"data": ["hicp"], "profile": "overview", "build": build_overview_inflation},
+    "overview.goods": {"data": ["s3"], "profile": "overview", "build": build_overview_goods},
+}
+
+# DETAILED ANALYSIS sections: their figures, and the dataset whose absence makes the whole section unavailable
+DETAILED_SECTIONS = {
+    "price_stability": {"figures": ["price_stability"]},
+    "inflation": {"figures": ["inflation_comparison"]},
+    "exchange_rate": {"figures": ["exchange_rate_inflation"]},
+    "growth": {"figures": ["growth_divergence", "cumulative_gdp", "gdp_decomposition"], "requires": "growth"},
+    "current_account": {"figures": ["goods_balance", "impact_bridge"], "requires": "current_account"},
+}
+
+
+@timed("figure", detail="fig_id")
+def get_figure(fig_id, theme, date_range, profile=None):
+    """
+    Returns the figure registered as fig_id in the given render profile (by default its
+    registered one), built at most once per data version, theme, date range and profile.
+    """
+    spec = FIGURES[fig_id]
+    profile = profile or spec["profile"]
+    data = load_datasets(spec["data"])
+    key = ("registry", fig_id, profile, fingerprint(data), fingerprint((theme, date_range)))
+    return cached_build(key, lambda: spec["build"](data, theme, date_range, profile))
+
+
+def build_section(section, theme, date_range):
+    """
+    {"figures": {figure ID: figure or None}} of a DETAILED ANALYSIS section computed live,
+    or None when its required dataset is unavailable.
+    """
+    spec = DETAILED_SECTIONS[section]
+    prefetch_figures(spec["figures"])
+    if "requires" in spec and DATASETS[spec["requires"]]().empty:
+        return None
+    return {"figures": {fig_id: get_figure(fig_id, theme, date_range) for fig_id in spec["figures"]}}
+
+
+def section_figures(section, theme, date_range):
+    """
+    Figures of a DETAILED ANALYSIS section: prebuilt artifacts when they are fresh,
+    otherwise computed live. None if the section's data is unavailable.
+    """
+    content = load_section(section, theme, date_range)
+    if content is None:
+        content = build_section(section, theme, date_range)
+    return content["figures"] if content is not None else None
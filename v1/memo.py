@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+import pandas as pd
+
+# every Memo by name, for stats() and invalidate()
+_memos = {}
+
+
+class Memo:
+    """
+    Thread-safe, size-bounded LRU store shared by the whole process (all Streamlit
+    sessions and reruns). Entries optionally expire after ttl seconds. Memos listed in
+    dependents are cleared whenever an entry of this one is invalidated, so frames
+    derived from a series never outlive it.
+    """
+    def __init__(self, name, maxsize=128, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.dependents = []
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _memos[name] = self
+
+    def get(self, key):
+        """
+        Returns (True, value) on a hit, (False, None) on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, match=None):
+        """
+        Drops every entry, or only those whose key satisfies match(key), and clears the dependents.
+        """
+        with self._lock:
+            if match is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if match(k)]:
+                    del self._entries[key]
+        for memo in self.dependents:
+            memo.invalidate()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+def copy_value(value):
+    """
+    Copies frames (also inside tuples, lists and dicts) so callers can modify what they
+    get back, as the loaders' callers do, without corrupting the memoized copy.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(copy_value(v) for v in value)
+    if isinstance(value, list):
+        return [copy_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: copy_value(v) for k, v in value.items()}
+    return value
+
+
+def memoize(name, maxsize=32, ttl=None, depends_on=(), cache_if=None):
+    """
+    Memoizes a loader on its (hashable) arguments in a Memo called name. Results for
+    which cache_if(result) is false (e.g. a failed download) are returned but not kept.
+    The wrapped function gets .memo and .invalidate(*args) (no args: drop everything).
+    """
+    memo = Memo(name, maxsize, ttl)
+    for parent in depends_on:
+        parent.dependents.append(memo)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            found, value = memo.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                if cache_if is None or cache_if(value):
+                    memo.put(key, value)
+            return copy_value(value)
+
+        def invalidate(*args, **kwargs):
+            if not args and not kwargs:
+                memo.invalidate()
+            else:
+                key = (args, tuple(sorted(kwargs.items())))
+                memo.invalidate(lambda k: k == key)
+
+        wrapper.memo = memo
+        wrapper.invalidate = invalidate
+        return wrapper
+    return decorator
+
+
+def stats():
+    """
+    {memo name: {size, maxsize, hits, misses, evictions}} for every memo in the process.
+    """
+    return {name: memo.stats() for name, memo in _memos.items()}
+
+
+def invalidate(name=None):
+    """
+    Clears one memo by name, or all of them.
+    """
+    for memo_name, memo in list(_memos.items()):
+        if name is None or memo_name == name:
+            memo.invalidate()
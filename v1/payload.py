@@ -0,0 +1,390 @@
+import base64
+import copy
+import hashlib
+import json
+import re
+import numpy as np
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+from memo import Memo
+from perf import span
+from theme import PROFILES, template_layout
+
+# Figures are rewritten into a smaller but equivalent plotly JSON before they are sent to the
+# browser. The optimized JSON is memoized by the figure's own JSON, so a rerun only pays for
+# hashing it.
+_payload_memo = Memo("payload", maxsize=64)
+
+# significant digits kept in data arrays; hover labels show fewer, so the rounding is not visible
+DISPLAY_DIGITS = 6
+# shorter arrays stay JSON lists, base64 would not be smaller
+MIN_TYPED_LENGTH = 8
+# trace attributes (at any depth, e.g. error_y.array) that hold numeric data arrays
+DATA_ARRAYS = {"x", "y", "z", "base", "width", "r", "theta", "values", "lat", "lon",
+               "open", "high", "low", "close", "array", "arrayminus", "size"}
+INT_TYPES = ("i1", "i2", "i4")
+# float32 spaces values this large more than a unit apart (2**24 ~ 1.7e7), so larger arrays
+# (GDP levels) stay float64 to keep their hover values
+MAX_FLOAT32 = 1e7
+
+ISO_DATETIME = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}:\d{2}:\d{2})(\.\d+)?)?$")
+
+# template.layout entries only used by subplots of these trace types
+SUBPLOT_TEMPLATES = {
+    "polar": ("scatterpolar", "scatterpolargl", "barpolar"),
+    "ternary": ("scatterternary",),
+    "scene": ("scatter3d", "surface", "mesh3d", "cone", "streamtube", "volume", "isosurface"),
+    "geo": ("scattergeo", "choropleth"),
+    "mapbox": ("scattermapbox", "choroplethmapbox", "densitymapbox"),
+    "map": ("scattermap", "choroplethmap", "densitymap"),
+}
+# trace types that never need a color scale unless given numeric colors
+PLAIN_TRACES = {"scatter", "scattergl", "bar", "box", "violin", "waterfall", "histogram", "funnel", "pie"}
+CARTESIAN_TRACES = {"scatter", "scattergl", "bar", "box", "violin", "waterfall", "histogram", "funnel",
+                    "heatmap", "contour", "histogram2d", "histogram2dcontour", "candlestick", "ohlc"}
+
+# per-item attributes that are never moved into the template defaults
+AXIS_IDENTITY = {"anchor", "domain", "overlaying", "matches", "scaleanchor", "position", "range",
+                 "autorange", "type", "tickvals", "ticktext", "categoryarray", "rangeslider", "title.text"}
+ITEM_IDENTITY = {"x", "y", "x0", "x1", "y0", "y1", "ax", "ay", "text", "path", "name", "type",
+                 "xref", "yref", "axref", "ayref", "templateitemname", "visible"}
+
+
+def optimize(fig, theme="streamlit", digits=DISPLAY_DIGITS):
+    """
+    Plotly JSON dict of fig that renders the same with smaller payload:
+    - numeric data arrays rounded to digits significant digits and sent as base64 typed
+      arrays (float32, float64 beyond MAX_FLOAT32, or the smallest integer type for whole numbers);
+    - dates without a time of day shortened to YYYY-MM-DD;
+    - the template reduced to the trace types and subplots the figure uses;
+    - tick labels wrapped in <b> via tickprefix/ticksuffix drawn with a bold tick font instead.
+    Streamlit's own theme merges its defaults into the template in the browser, so for
+    theme="streamlit" the styling taken from one of the theme templates is copied onto the
+    layout, where it wins over the merge. For theme=None charts instead, styling repeated on every axis, annotation or shape is moved
+    once into the template defaults, and layout values equal to the template's are dropped.
+    """
+    spec = fig if isinstance(fig, dict) else fig.to_plotly_json()
+    spec = copy.deepcopy(spec)
+    traces = list(spec.get("data", []))
+    for frame in spec.get("frames", []):
+        traces.extend(frame.get("data", []))
+    for trace in traces:
+        _compact_trace(trace, digits)
+    _walk_strings(spec, _short_date)
+
+    layout = spec.get("layout", {})
+    template = layout.get("template")
+    if theme is not None and isinstance(template, dict):
+        _pin_template_style(layout, template.get("layout", {}), spec.get("data", []))
+    _bold_ticks(layout)
+    if isinstance(template, dict):
+        _prune_template(template, traces)
+        if theme is None:
+            _hoist_defaults(layout, template, spec.get("data", []))
+            _drop_template_duplicates(layout, template.get("layout", {}))
+    return spec
+
+
+def payload_size(fig):
+    """
+    Bytes of the JSON Streamlit sends for fig (a figure or a plotly JSON dict).
+    """
+    if isinstance(fig, dict):
+        return len(to_json_plotly(fig).encode())
+    return len(pio.to_json(fig, validate=False).encode())
+
+
+def optimized(fig, theme="streamlit", digits=DISPLAY_DIGITS):
+    """
+    (optimize(fig), bytes before, bytes after), memoized by the figure's JSON.
+    """
+    fig_json = pio.to_json(fig, validate=False)
+    key = (hashlib.blake2b(fig_json.encode(), digest_size=16).hexdigest(), theme, digits)
+    found, value = _payload_memo.get(key)
+    if not found:
+        spec = optimize(json.loads(fig_json), theme, digits)
+        spec_json = to_json_plotly(spec)
+        value = (spec_json, len(fig_json.encode()), len(spec_json.encode()))
+        _payload_memo.put(key, value)
+    spec_json, before, after = value
+    return json.loads(spec_json), before, after
+
+
+def plotly_chart(fig, name, theme="streamlit", **kwargs):
+    """
+    st.plotly_chart of the optimized fig. The bytes before/after are recorded per chart name
+    in st.session_state["payload_bytes"], so a session's savings can be read back with
+    savings_report().
+    """
+    import streamlit as st
+    if fig is None:
+        return st.plotly_chart(fig, theme=theme, **kwargs)
+    with span("payload.optimized", "serialize", detail=name):
+        spec, before, after = optimized(fig, theme)
+    st.session_state.setdefault("payload_bytes", {})[name] = (before, after)
+    with span("st.plotly_chart", "serialize", detail=name):
+        return st.plotly_chart(spec, theme=theme, **kwargs)
+
+
+def savings_report(payload_bytes):
+    """
+    Table of {name: (bytes before, bytes after)} as text, one line per figure plus the total.
+    """
+    lines = [f"{'figure':28s} {'before':>9s} {'after':>9s} {'saved':>6s}"]
+    rows = list(payload_bytes.items())
+    rows.append(("TOTAL", (sum(b for b, _ in payload_bytes.values()), sum(a for _, a in payload_bytes.values()))))
+    for name, (before, after) in rows:
+        saved = 1 - after / before if before else 0.0
+        lines.append(f"{name:28s} {before:9d} {after:9d} {saved:6.1%}")
+    return "\n".join(lines)
+
+
+def _compact_trace(node, digits):
+    for key, value in list(node.items()):
+        if isinstance(value, dict):
+            if key in DATA_ARRAYS and _is_typed(value):
+                node[key] = _encode(_decode(value), digits)
+            else:
+                _compact_trace(value, digits)
+        elif key in DATA_ARRAYS and isinstance(value, list) and _is_numeric(value):
+            node[key] = _encode(np.array([np.nan if v is None else v for v in value], dtype=np.float64), digits)
+
+
+def _is_typed(value):
+    return "bdata" in value and "dtype" in value and "shape" not in value
+
+
+def _is_numeric(values):
+    return bool(values) and all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values)
+
+
+def _decode(value):
+    return np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"]).astype(np.float64)
+
+
+def _encode(values, digits):
+    """
+    values rounded to digits significant digits: a plain list when short, otherwise a typed
+    array of the smallest integer type that holds them, or float32 (float64 when their
+    magnitude exceeds MAX_FLOAT32).
+    """
+    finite = np.isfinite(values)
+    rounded = values.copy()
+    if finite.any():
+        magnitude = np.floor(np.log10(np.abs(np.where(finite & (values != 0), values, 1.0))))
+        scale = 10.0 ** (digits - 1 - magnitude)
+        rounded[finite] = np.round(values[finite] * scale[finite]) / scale[finite]
+    if len(values) < MIN_TYPED_LENGTH:
+        return [None if np.isnan(v) else (int(v) if v.is_integer() else float(v)) for v in rounded]
+    if finite.all() and np.all(rounded == np.round(rounded)):
+        for dtype in INT_TYPES:
+            info = np.iinfo(dtype)
+            if rounded.min() >= info.min and rounded.max() <= info.max:
+                return {"dtype": dtype, "bdata": base64.b64encode(rounded.astype(dtype).tobytes()).decode()}
+    dtype = "f8" if finite.any() and np.abs(rounded[finite]).max() > MAX_FLOAT32 else "f4"
+    return {"dtype": dtype, "bdata": base64.b64encode(rounded.astype(dtype).tobytes()).decode()}
+
+
+def _short_date(value):
+    match = ISO_DATETIME.match(value)
+    if match is None or match.group(2) is None:
+        return value
+    fraction = (match.group(3) or "").rstrip("0").rstrip(".")
+    if match.group(2) == "00:00:00" and not fraction:
+        return match.group(1)
+    return f"{match.group(1)} {match.group(2)}{fraction}"
+
+
+def _walk_strings(node, rewrite):
+    items = node.items() if isinstance(node, dict) else enumerate(node)
+    for key, value in items:
+        if isinstance(value, str):
+            node[key] = rewrite(value)
+        elif isinstance(value, (dict, list)):
+            _walk_strings(value, rewrite)
+
+
+def _axis_names(layout, letter):
+    return [key for key in layout if re.fullmatch(f"{letter}axis\\d*", key)]
+
+
+def _bold_ticks(layout):
+    for key in _axis_names(layout, "x") + _axis_names(layout, "y"):
+        axis = layout[key]
+        if axis.get("tickprefix") == "<b>" and axis.get("ticksuffix") == "</b>":
+            del axis["tickprefix"], axis["ticksuffix"]
+            axis.setdefault("tickfont", {})["weight"] = "bold"
+
+
+def _pin_template_style(layout, defaults, data):
+    """
+    Copies onto the layout the values of the figure's template that one of the theme templates
+    sets (theme.template_layout), where the layout does not set them itself, and drops them from
+    the template. Axis styling goes on every x/y axis of the layout and every axis a cartesian
+    trace uses.
+    """
+    themed = {}
+    for profile in PROFILES:
+        for path, value in _leaves(template_layout(profile)):
+            themed.setdefault(path, set()).add(json.dumps(value, sort_keys=True))
+    cartesian = [trace for trace in data if trace.get("type", "scatter") in CARTESIAN_TRACES]
+    axes = {}
+    for letter in ("x", "y"):
+        referenced = {letter + "axis" + trace.get(f"{letter}axis", letter)[1:] for trace in cartesian}
+        axes[letter] = sorted(set(_axis_names(layout, letter)) | referenced | {letter + "axis"})
+    for path, values in themed.items():
+        value, found = _get(defaults, path)
+        if not found or json.dumps(value, sort_keys=True) not in values:
+            continue
+        head, _, rest = path.partition(".")
+        if re.fullmatch("[xy]axis", head):
+            targets = [(layout.setdefault(name, {}), rest) for name in axes[head[0]]]
+        else:
+            targets = [(layout, path)]
+        for node, node_path in targets:
+            if not _get(node, node_path)[1]:
+                _set(node, node_path, copy.deepcopy(value))
+        # every target now sets it, the template's copy is never read
+        _remove(defaults, path)
+
+
+def _trace_types(traces):
+    return {trace.get("type", "scatter") for trace in traces}
+
+
+def _has_numeric_color(node):
+    for key, value in node.items():
+        if key == "color" and (isinstance(value, dict) or (isinstance(value, list) and _is_numeric(value))):
+            return True
+        if isinstance(value, dict) and _has_numeric_color(value):
+            return True
+    return False
+
+
+def _prune_template(template, traces):
+    types = _trace_types(traces)
+    if "data" in template:
+        template["data"] = {name: value for name, value in template["data"].items() if name in types}
+    layout = template.get("layout", {})
+    for key, users in SUBPLOT_TEMPLATES.items():
+        if key in layout and not types.intersection(users):
+            del layout[key]
+    if types <= PLAIN_TRACES and not any(_has_numeric_color(trace) for trace in traces):
+        layout.pop("colorscale", None)
+        layout.pop("coloraxis", None)
+
+
+def _leaves(node, prefix=""):
+    for key, value in node.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _leaves(value, path + ".")
+        else:
+            yield path, value
+
+
+def _get(node, path):
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None, False
+        node = node[part]
+    return node, True
+
+
+def _set(node, path, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[last] = value
+
+
+def _remove(node, path):
+    *parents, last = path.split(".")
+    chain = [node]
+    for part in parents:
+        chain.append(chain[-1][part])
+    del chain[-1][last]
+    for parent, part in zip(reversed(chain[:-1]), reversed(parents)):
+        if parent[part]:
+            break
+        del parent[part]
+
+
+def _common_leaves(items, identity):
+    """
+    (path, value) set on every item with the same value, skipping identity attributes.
+    """
+    common = None
+    for item in items:
+        leaves = {(path, json.dumps(value, sort_keys=True)) for path, value in _leaves(item)
+                  if path not in identity and path.split(".")[0] not in identity}
+        common = leaves if common is None else common & leaves
+    return sorted(common or ())
+
+
+def _hoist(items, defaults, identity):
+    for path, value in _common_leaves(items, identity):
+        _set(defaults, path, json.loads(value))
+        for item in items:
+            _remove(item, path)
+
+
+def _hoist_defaults(layout, template, data):
+    """
+    Moves styling shared by all axes of a letter, all annotations or all shapes into the
+    template's axis, annotationdefaults and shapedefaults.
+    """
+    template_layout = template.setdefault("layout", {})
+    cartesian = [trace for trace in data if trace.get("type", "scatter") in CARTESIAN_TRACES]
+    for letter in ("x", "y"):
+        names = _axis_names(layout, letter)
+        referenced = {letter + "axis" + trace.get(f"{letter}axis", letter)[1:] for trace in cartesian}
+        # an axis without its own entry would pick up the hoisted defaults too
+        if len(names) < 2 or not referenced <= set(names):
+            continue
+        _hoist([layout[name] for name in names], template_layout.setdefault(f"{letter}axis", {}), AXIS_IDENTITY)
+    for key, defaults in (("annotations", "annotationdefaults"), ("shapes", "shapedefaults")):
+        items = layout.get(key, [])
+        if len(items) >= 2:
+            _hoist(items, template_layout.setdefault(defaults, {}), ITEM_IDENTITY)
+
+
+def _drop_template_duplicates(layout, template_layout):
+    """
+    Removes layout values that equal what the template would supply anyway.
+    """
+    targets = [(layout, template_layout, "")]
+    for letter in ("x", "y"):
+        for name in _axis_names(layout, letter):
+            targets.append((layout[name], template_layout.get(f"{letter}axis", {}), "axis"))
+    for key, defaults in (("annotations", "annotationdefaults"), ("shapes", "shapedefaults")):
+        for item in layout.get(key, []):
+            targets.append((item, template_layout.get(defaults, {}), "item"))
+    for node, defaults, kind in targets:
+        for path, value in list(_leaves(node)):
+            if kind == "" and (path.split(".")[0] == "template" or re.match(r"[xy]axis\d*\.", path)):
+                continue
+            default, found = _get(defaults, path)
+            if found and default == value:
+                _remove(node, path)
+
+
+if __name__ == "__main__":
+    import os
+    from datetime import datetime
+    from theme import get_theme
+    from artifacts import ROOT_DIR
+    from figure_registry import FIGURES, get_figure
+
+    # per-figure payload of the dashboard's charts, with the theme each is rendered with
+    os.chdir(ROOT_DIR)
+    UNTHEMED = {"price_stability", "overview.energy"}
+    theme, date_range = get_theme("light"), (datetime(2018, 1, 1), datetime(2025, 12, 31))
+    payload_bytes = {}
+    for fig_id in FIGURES:
+        fig = get_figure(fig_id, theme, date_range)
+        if fig is None:
+            continue
+        _, before, after = optimized(fig, None if fig_id in UNTHEMED else "streamlit")
+        payload_bytes[fig_id] = (before, after)
+    print(savings_report(payload_bytes))
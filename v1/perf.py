@@ -0,0 +1,225 @@
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from itertools import count
+
+# Span timing of the loaders, transforms and figure functions: timed(layer) on a function,
+# span(name, layer) around a block. Off unless ECB_PERF=1, and then a span costs one flag check.
+# When on, every finished span is appended as a JSON line to PERF_LOG for offline analysis
+# and handed to the collect() blocks open at the time (the dashboard's performance panel).
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENABLED = os.environ.get("ECB_PERF", "0") == "1"
+PERF_LOG = os.environ.get("ECB_PERF_LOG", os.path.join(ROOT_DIR, "perf.jsonl"))
+
+# where a page view spends its time: ECB requests, CSV parsing, loaders and cache reads,
+# frame transforms, figure construction, payload serialization and st.plotly_chart, and
+# the Streamlit page around them
+LAYERS = ("fetch", "parse", "load", "transform", "figure", "serialize", "render")
+
+_ids = count(1)
+_stacks = threading.local()
+# (run ID, label, spans) of the open collect() blocks, innermost last
+_runs = []
+_runs_lock = threading.Lock()
+_log = None
+_log_lock = threading.Lock()
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+class Span:
+    """
+    One timed block. Spans nest per thread: a span's self time excludes the spans it opened
+    in the same thread (work it hands to a thread pool is timed in that thread's own spans).
+    """
+    __slots__ = ("name", "layer", "detail", "id", "parent", "start", "t0", "child_ms")
+
+    def __init__(self, name, layer, detail=None):
+        self.name = name
+        self.layer = layer
+        self.detail = detail
+
+    def __enter__(self):
+        stack = _stack()
+        self.id = next(_ids)
+        self.parent = stack[-1] if stack else None
+        self.child_ms = 0.0
+        stack.append(self)
+        self.start = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.t0) * 1000
+        _stack().pop()
+        if self.parent is not None:
+            self.parent.child_ms += ms
+        record = {
+            "id": self.id, "parent": self.parent.id if self.parent is not None else None,
+            "name": self.name, "layer": self.layer, "start": round(self.start, 6),
+            "ms": round(ms, 3), "self_ms": round(ms - self.child_ms, 3),
+            "thread": threading.current_thread().name,
+        }
+        if self.detail is not None:
+            record["detail"] = str(self.detail)[:200]
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _finish(record)
+        return False
+
+
+def _stack():
+    stack = getattr(_stacks, "spans", None)
+    if stack is None:
+        stack = _stacks.spans = []
+    return stack
+
+
+def _finish(record):
+    with _runs_lock:
+        if _runs:
+            run, label, _ = _runs[-1]
+            record["run"], record["label"] = run, label
+        for _, _, spans in _runs:
+            spans.append(record)
+    write(record)
+
+
+def write(record):
+    """
+    Appends record as a JSON line to PERF_LOG; a log that cannot be written is reported once
+    and then skipped.
+    """
+    global _log
+    with _log_lock:
+        if _log is False:
+            return
+        try:
+            if _log is None:
+                _log = open(PERF_LOG, "a", encoding="utf-8")
+            _log.write(json.dumps(record) + "\n")
+            _log.flush()
+        except OSError as e:
+            print(f"Performance log {PERF_LOG} disabled: {e}")
+            _log = False
+
+
+def span(name, layer, detail=None):
+    """
+    Context manager timing its block as name in layer (one of LAYERS); a no-op when disabled.
+    """
+    if not ENABLED:
+        return nullcontext()
+    return Span(name, layer, detail)
+
+
+def timed(layer, detail=None):
+    """
+    Decorator timing every call as a span named module.function in layer. detail names an
+    argument whose value is recorded with the span (a series key, a file, a figure ID).
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        position = list(inspect.signature(func).parameters).index(detail) if detail else None
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            value = None
+            if detail is not None:
+                value = args[position] if position < len(args) else kwargs.get(detail)
+            with Span(name, layer, value):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect(label=None):
+    """
+    with collect(label) as spans: gathers the span records finished in any thread while
+    the block runs. They and their log lines carry a run ID and label (e.g. the page shown).
+    Nothing is gathered when disabled.
+    """
+    spans = []
+    if not ENABLED:
+        yield spans
+        return
+    entry = (f"{os.getpid()}-{next(_ids)}", label, spans)
+    with _runs_lock:
+        _runs.append(entry)
+    try:
+        yield spans
+    finally:
+        with _runs_lock:
+            _runs.remove(entry)
+
+
+def summarize(spans, by="layer"):
+    """
+    Rows {by, calls, ms, self_ms, max_ms} of the span records grouped by "layer" or "name",
+    most self time first. Self times add up to the time spent in each thread without
+    counting nested spans twice.
+    """
+    groups = {}
+    for record in spans:
+        row = groups.setdefault(record[by], {by: record[by], "calls": 0, "ms": 0.0, "self_ms": 0.0, "max_ms": 0.0})
+        row["calls"] += 1
+        row["ms"] += record["ms"]
+        row["self_ms"] += record["self_ms"]
+        row["max_ms"] = max(row["max_ms"], record["ms"])
+    return sorted(groups.values(), key=lambda row: -row["self_ms"])
+
+
+def read_log(path=PERF_LOG):
+    """
+    The span records of a log written by write(), in order.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python v1/perf.py [log]: time per layer and the slowest functions in a span log
+    if len(sys.argv) > 1 or os.path.exists(PERF_LOG):
+        records = read_log(sys.argv[1] if len(sys.argv) > 1 else PERF_LOG)
+        print(f"{len(records)} spans in {len({r.get('run') for r in records})} runs")
+        for by, limit in (("layer", None), ("name", 15)):
+            print(f"\n{by:45s} {'calls':>6s} {'self ms':>10s} {'max ms':>9s}")
+            for row in summarize(records, by)[:limit]:
+                print(f"{row[by]:45s} {row['calls']:6d} {row['self_ms']:10.1f} {row['max_ms']:9.1f}")
+        print()
+
+    # overhead of a timed() call, disabled and enabled (logging to a temporary file)
+    import tempfile
+
+    @timed("transform")
+    def noop():
+        pass
+
+    def per_call(func, n=100_000):
+        start = time.perf_counter()
+        for _ in range(n):
+            func()
+        return (time.perf_counter() - start) / n * 1e6
+
+    plain = per_call(noop.__wrapped__)
+    enable(False)
+    disabled = per_call(noop)
+    with tempfile.TemporaryDirectory() as tmp:
+        PERF_LOG = os.path.join(tmp, "perf.jsonl")
+        enable(True)
+        enabled = per_call(noop, 10_000)
+        _log.close()
+    print(f"per call: undecorated {plain:.3f} us, disabled {disabled:.3f} us, enabled {enabled:.1f} us")
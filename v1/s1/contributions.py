@@ -0,0 +1,293 @@
+import numpy as np
+import pandas as pd
+from perf import timed
+from data_fetcher import MAX_QUERY_KEY_LENGTH, fetch_ecb_groups
+
+# HICP item weights are published per mille of the basket
+WEIGHT_SCALE = 1000
+
+
+def item_name(column):
+    """
+    HICP item of a column, without its series code: "HICP - Energy (ICP.M.PL.N.NRGY00.4.ANR)" -> "HICP - Energy".
+    """
+    return column.split(" (")[0]
+
+
+@timed("transform")
+def join_on_date(frames, date_col="DATE"):
+    """
+    Left-joins frames on date_col in one aligned concat (the rows of the first frame).
+    """
+    if not frames:
+        return pd.DataFrame()
+    indexed = [df.set_index(date_col) for df in frames]
+    joined = pd.concat(indexed, axis=1).reindex(indexed[0].index)
+    return joined.reset_index()
+
+
+@timed("transform")
+def weighted_contributions(df_val, df_weight, date_col="DATE", missing="zero"):
+    """
+    Contribution of each component (rate column of df_val) to the headline rate: rate * weight / 1000,
+    using the weight of the row's year (the first weight row of that year, as published annually).
+    Components are matched to weight columns by HICP item. A component without weight column
+    or a year without weights gives 0.0 with missing="zero", or raises ValueError with missing="raise".
+    Returns a new frame with date_col and the contribution columns in df_val's order.
+    """
+    components = [c for c in df_val.columns if c != date_col]
+    weight_by_item = {}
+    for column in df_weight.columns:
+        if column != date_col:
+            weight_by_item.setdefault(item_name(column), column)
+
+    unmatched = [c for c in components if item_name(c) not in weight_by_item]
+    if unmatched and missing == "raise":
+        raise ValueError(f"No weights for {unmatched}")
+
+    # one row of weights per year, gathered onto the monthly rows by year
+    weights = df_weight.assign(_year=df_weight[date_col].dt.year).drop_duplicates("_year")
+    rows = pd.Index(weights["_year"]).get_indexer(df_val[date_col].dt.year)
+    if (rows < 0).any() and missing == "raise":
+        years = sorted(set(df_val[date_col].dt.year[rows < 0]))
+        raise ValueError(f"No weights for years {years}")
+
+    matched = [c for c in components if c not in unmatched]
+    values = np.zeros((len(df_val), len(matched)))
+    if len(weights):
+        weight_matrix = weights[[weight_by_item[item_name(c)] for c in matched]].to_numpy(dtype=np.float64)
+        per_row = weight_matrix[np.maximum(rows, 0)] / WEIGHT_SCALE
+        values = per_row * df_val[matched].to_numpy(dtype=np.float64)
+        values[rows < 0] = 0.0
+
+    out = df_val[[date_col]].copy()
+    position = {column: i for i, column in enumerate(matched)}
+    for column in components:
+        out[column] = values[:, position[column]] if column in position else 0.0
+    return out
+
+
+# ---- country x component x month panels over the ICP COICOP hierarchy ----
+
+EU27 = ["AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE", "ES", "FI", "FR", "GR", "HR", "HU",
+        "IE", "IT", "LT", "LU", "LV", "MT", "NL", "PL", "PT", "RO", "SE", "SI", "SK"]
+HEADLINE = "000000"
+
+
+def coicop_parent(code):
+    """
+    Parent of an ICP COICOP code (011100 -> 011000 -> 010000 -> 000000); None for the headline
+    and for special aggregates such as NRGY00 or XEF000, which sit outside the hierarchy.
+    """
+    if not code.isdigit() or code == HEADLINE:
+        return None
+    digits = code.rstrip("0")
+    if len(digits) <= 2:
+        return HEADLINE
+    return digits[:-1].ljust(len(code), "0")
+
+
+def icp_key(country, item, measure):
+    """
+    ICP series key: monthly annual rates of change (ANR) or annual item weights (INW).
+    """
+    freq = "M" if measure == "ANR" else "A"
+    return f"{freq}.{country}.N.{item}.4.{measure}"
+
+
+def icp_queries(countries, items, measure, max_key_length=MAX_QUERY_KEY_LENGTH):
+    """
+    OR-ed ICP query keys covering countries x items exactly (no over-fetch), items split so each
+    key stays under MAX_QUERY_KEY_LENGTH. Returns [(query_key, [series keys])].
+    A full cross product needs no search, unlike data_fetcher.plan_queries' pairwise merging.
+    """
+    freq = "M" if measure == "ANR" else "A"
+    fixed = len(f"{freq}.{'+'.join(countries)}.N..4.{measure}")
+    chunks, chunk = [], []
+    for item in items:
+        if chunk and fixed + len("+".join(chunk + [item])) > max_key_length:
+            chunks.append(chunk)
+            chunk = []
+        chunk.append(item)
+    if chunk:
+        chunks.append(chunk)
+    return [(f"{freq}.{'+'.join(countries)}.N.{'+'.join(chunk)}.4.{measure}",
+             [icp_key(c, i, measure) for c in countries for i in chunk]) for chunk in chunks]
+
+
+def load_icp_panel(countries=EU27, items=(HEADLINE,), start="2000"):
+    """
+    Downloads (or reads from the series cache) ICP rates and weights for countries x items and
+    returns them as a panel, see build_panel. Series already cached are used as they are;
+    `python v1/data_fetcher.py refresh` brings them up to date.
+    """
+    countries, items = list(countries), list(items)
+    groups = [group for measure in ("ANR", "INW") for group in icp_queries(countries, items, measure)]
+    found, _ = fetch_ecb_groups("ICP", groups, {'startPeriod': start})
+
+    def frames(measure):
+        keys = {(country, item): icp_key(country, item, measure) for country in countries for item in items}
+        return {pair: found[key] for pair, key in keys.items() if key in found}
+
+    return build_panel(countries, items, frames("ANR"), frames("INW"))
+
+
+def build_panel(countries, items, rate_frames, weight_frames):
+    """
+    Panel of {(country, item): (Date, Value) frame} rates (monthly) and weights (annual):
+    {"countries", "items", "months" (period ordinals), "years", "rates" [country, item, month],
+    "weights" [country, item, year]}, NaN where a series has no observation.
+    """
+    from series_store import period_ordinals
+
+    def scatter(frames, freq):
+        if not frames:
+            return np.zeros(0, dtype=np.int64), np.full((len(countries), len(items), 0), np.nan)
+        c_pos = {c: i for i, c in enumerate(countries)}
+        k_pos = {k: i for i, k in enumerate(items)}
+        cs, ks, ts, vs = [], [], [], []
+        for (country, item), df in frames.items():
+            ordinals = period_ordinals(df["Date"].to_numpy(), freq)
+            cs.append(np.full(len(ordinals), c_pos[country]))
+            ks.append(np.full(len(ordinals), k_pos[item]))
+            ts.append(ordinals)
+            vs.append(df["Value"].to_numpy(dtype=np.float64))
+        ts = np.concatenate(ts)
+        periods = np.arange(ts.min(), ts.max() + 1)
+        array = np.full((len(countries), len(items), len(periods)), np.nan)
+        array[np.concatenate(cs), np.concatenate(ks), ts - periods[0]] = np.concatenate(vs)
+        return periods, array
+
+    months, rates = scatter(rate_frames, "M")
+    years, weights = scatter(weight_frames, "A")
+    return {"countries": list(countries), "items": list(items), "months": months, "years": years + 1970,
+            "rates": rates, "weights": weights}
+
+
+def decompose(panel):
+    """
+    Contributions [country, item, month] = weight of the month's year / 1000 * annual rate,
+    for the whole panel in one broadcast. Months whose year has no weights are NaN;
+    the second return value marks them ([month] bool).
+    """
+    rate_years = panel["months"] // 12 + 1970
+    year_index = pd.Index(panel["years"]).get_indexer(rate_years)
+    missing = year_index < 0
+    if len(panel["years"]) == 0:
+        return np.full(panel["rates"].shape, np.nan), missing
+    weights = panel["weights"][:, :, np.maximum(year_index, 0)]
+    contributions = weights / WEIGHT_SCALE * panel["rates"]
+    contributions[:, :, missing] = np.nan
+    return contributions, missing
+
+
+def check_hierarchy(panel, contributions, tol=0.1, weight_tol=0.5):
+    """
+    Compares every item that has children in the panel with the sum of its children: contributions
+    (headline: its rate, weight 1000) and weights. Annual rates of chain-linked indices are only
+    approximately additive, hence the tolerance in percentage points (weight_tol: per mille). Only the
+    children present in the panel are summed, so it should hold complete levels of the hierarchy.
+    Returns {"parents", "residuals" [country, parent, month], "weight_residuals" [country, parent, year],
+    "failures": frame of (country, item, date, contribution, children, residual) beyond tol,
+    "weight_failures": frame of (country, item, year, weight, children, residual) beyond weight_tol}.
+    """
+    items = panel["items"]
+    position = {item: i for i, item in enumerate(items)}
+    parent_of = np.array([position.get(coicop_parent(item), -1) for item in items])
+    children = np.flatnonzero(parent_of >= 0)
+    if len(children) == 0:
+        empty = np.zeros((len(panel["countries"]), 0, 0))
+        return {"parents": [], "residuals": empty, "weight_residuals": empty,
+                "failures": pd.DataFrame(), "weight_failures": pd.DataFrame()}
+
+    children = children[np.argsort(parent_of[children], kind="stable")]
+    starts = np.flatnonzero(np.r_[True, np.diff(parent_of[children]) != 0])
+    parents = parent_of[children][starts]
+
+    children_sum = np.add.reduceat(contributions[:, children, :], starts, axis=1)
+    residuals = contributions[:, parents, :] - children_sum
+    weight_children = np.add.reduceat(panel["weights"][:, children, :], starts, axis=1)
+    weight_residuals = panel["weights"][:, parents, :] - weight_children
+
+    c, p, t = np.nonzero(np.abs(np.nan_to_num(residuals)) > tol)
+    failures = pd.DataFrame({
+        "country": np.array(panel["countries"])[c],
+        "item": np.array(items)[parents[p]],
+        "date": pd.PeriodIndex.from_ordinals(panel["months"][t], freq="M").to_timestamp(how="end").normalize(),
+        "contribution": contributions[c, parents[p], t],
+        "children": children_sum[c, p, t],
+        "residual": residuals[c, p, t],
+    })
+    c, p, y = np.nonzero(np.abs(np.nan_to_num(weight_residuals)) > weight_tol)
+    weight_failures = pd.DataFrame({
+        "country": np.array(panel["countries"])[c],
+        "item": np.array(items)[parents[p]],
+        "year": panel["years"][y],
+        "weight": panel["weights"][c, parents[p], y],
+        "children": weight_children[c, p, y],
+        "residual": weight_residuals[c, p, y],
+    })
+    return {"parents": [items[i] for i in parents], "residuals": residuals, "weight_residuals": weight_residuals,
+            "failures": failures, "weight_failures": weight_failures}
+
+
+def synthetic_panel(countries=EU27, divisions=12, groups=4, classes=6, years=25, seed=0):
+    """
+    Random panel with a consistent COICOP hierarchy (parents are the weighted means of their
+    children), for benchmarks: 27 countries x 349 items x 300 months by default.
+    """
+    rng = np.random.default_rng(seed)
+    leaves = [f"{d:02d}{g}{k}00" for d in range(1, divisions + 1) for g in range(1, groups + 1) for k in range(1, classes + 1)]
+    items = [HEADLINE] + [f"{d:02d}0000" for d in range(1, divisions + 1)] \
+        + [f"{d:02d}{g}000" for d in range(1, divisions + 1) for g in range(1, groups + 1)] + leaves
+    n_months, n_items = years * 12, len(items)
+    position = {item: i for i, item in enumerate(items)}
+
+    rates = np.full((len(countries), n_items, n_months), np.nan)
+    weights = np.full((len(countries), n_items, years), np.nan)
+    leaf_index = np.array([position[leaf] for leaf in leaves])
+    leaf_weights = rng.uniform(0.5, 1.5, (len(countries), len(leaves), years))
+    weights[:, leaf_index, :] = leaf_weights / leaf_weights.sum(axis=1, keepdims=True) * WEIGHT_SCALE
+    rates[:, leaf_index, :] = rng.normal(3, 4, (len(countries), len(leaves), n_months))
+
+    # aggregate bottom-up (children come after their parent in items): an item's children are
+    # all summed in by the time it is reached, so it is normalised and then added to its parent
+    month_year = np.arange(n_months) // 12
+    leaf_set = set(leaves)
+    for item in reversed(items):
+        i = position[item]
+        if item not in leaf_set:
+            rates[:, i, :] /= weights[:, i, month_year]
+        parent = coicop_parent(item)
+        if parent is None:
+            continue
+        p = position[parent]
+        w = weights[:, i, :]
+        weights[:, p, :] = np.nan_to_num(weights[:, p, :]) + w
+        rates[:, p, :] = np.nan_to_num(rates[:, p, :]) + rates[:, i, :] * w[:, month_year]
+
+    return {"countries": list(countries), "items": items, "months": np.arange(n_months) + (2000 - 1970) * 12,
+            "years": np.arange(2000, 2000 + years), "rates": rates, "weights": weights}
+
+
+if __name__ == "__main__":
+    import time
+
+    panel = synthetic_panel()
+    shape = panel["rates"].shape
+    start = time.perf_counter()
+    contributions, missing = decompose(panel)
+    decompose_s = time.perf_counter() - start
+    start = time.perf_counter()
+    report = check_hierarchy(panel, contributions)
+    check_s = time.perf_counter() - start
+    print(f"{shape[0]} countries x {shape[1]} items x {shape[2]} months: decompose {decompose_s:.2f}s, "
+          f"hierarchy check of {len(report['parents'])} parents {check_s:.2f}s, "
+          f"max residual {np.nanmax(np.abs(report['residuals'])):.2e} pp, {len(report['failures'])} failures")
+
+    # a headline that does not match its divisions, and a weight that does not match its parent's
+    panel["rates"][3, panel["items"].index(HEADLINE), 100] += 0.5
+    panel["weights"][0, panel["items"].index("011100"), 5] *= 2
+    contributions, _ = decompose(panel)
+    report = check_hierarchy(panel, contributions)
+    print(f"corrupted panel:\n{report['failures']}\n{report['weight_failures']}")
@@ -1,41 +1,38 @@
-import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
 import numpy as np
 import sys
-from theme import apply_plot_theme
-
+from theme import TEMPLATES, profile_layout
+from figure_builder import figure, add_trace, update_layout, update_axes, add_vline, add_annotation
+from periods import parse_periods
+from memo import memoize
+from perf import timed
+from series_catalog import read_csv
+
+@timed("parse", detail="file")
+@memoize("s1.fig1.get_data", maxsize=8)
 def get_data(file):
-    df = pd.read_csv(file)
+    df = read_csv(file)
     df.rename(columns = {df.columns[0]: "Date", df.columns[2]: "Value", 
                          df.columns[1]: "Time Period"}, inplace = True)
     df = df[["Date", "Time Period", "Value"]]
-    df["Date"] = pd.to_datetime(df["Date"])
+    df["Date"] = parse_periods(df["Date"])
     df = df[df["Date"] >= "2019-January"]
     return df
 
-def create_figure(title):
-    fig = go.Figure().update_layout(
-        template ="plotly_white", 
-        title = f"<b>{title}</b>", 
-        title_x = 0.5, 
-        title_y = 0.925, 
-        title_font_weight = 600,
-        font=dict(color="#2A3F5F", family="Georgia"),
-        title_font=dict(color="#2A3F5F", family="Georgia", size=24)
-    )
-    fig.update_layout(width = 750, height = 450)
-    fig.update_xaxes(
-        range=[pd.Timestamp("2019-January"), pd.Timestamp("2026-January")],
-        tickfont=dict(color="#2A3F5F"),
-        title_font=dict(color="#2A3F5F")
+def create_figure(title, profile = "full"):
+    fig = figure(
+        TEMPLATES[profile], 
+        title = dict(text = f"<b>{title}</b>", y = 0.925)
     )
+    update_layout(fig, width = 750, height = 450)
+    update_axes(fig, "x", range=[pd.Timestamp("2019-January"), pd.Timestamp("2026-January")])
     return fig
 
 def plot(df, fig, color, name):
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["Value"], 
-                             line = dict(width = 3, color = color),
-                             name = name))
+    add_trace(fig, "scatter", x=df["Date"], y=df["Value"], 
+              line = dict(width = 3, color = color),
+              name = f"<b>{name}</b>")
 
 def log_transform(df):
     return df.apply(np.log)
@@ -50,12 +47,14 @@ def z_score_conversion(df):
         df[col] = (df[col] - df[col].mean())/ df[col].std()
     return df
 
+@timed("transform")
 def rebase(df, base_date):
     baser = df.loc[df["Time Period"] == "2022Jan"]["Value"]
     ser = df["Value"].apply(lambda x: (x/baser)*100)
     df["Value"] = ser
     return df
 
+@timed("transform")
 def get_unit_value(Value_df, Volume_df):
     ser_div = Value_df["Value"].div(Volume_df["Value"])
     ser_div = ser_div.apply(lambda x: x*100)
@@ -65,7 +64,7 @@ def get_unit_value(Value_df, Volume_df):
     return df
 
 def legend_setting(fig):
-    fig.update_layout(legend = dict(orientation = "h", x=0.5, xanchor="center"))
+    update_layout(fig, legend = dict(orientation = "h", x=0.5, xanchor="center"))
 
 
 def find_min_max(lst:list, fig):
@@ -76,12 +75,13 @@ def find_min_max(lst:list, fig):
         if df["Value"].max() > maxy:
             maxy = df["Value"].max()
     
-    fig.update_yaxes(range = [miny, maxy])
+    update_axes(fig, "y", range = [miny, maxy])
 
 
 
 
-def plot_price_stability(vol_file="data/Gas_Vol.csv", val_file="data/Gas_Val.csv", theme=None, overview_mode=False):
+@timed("figure")
+def plot_price_stability(vol_file="data/Gas_Vol.csv", val_file="data/Gas_Val.csv", theme=None, profile="full"):
 
     try:
         df_Val = get_data(val_file)
@@ -89,11 +89,12 @@ def plot_price_stability(vol_file="data/Gas_Vol.csv", val_file="data/Gas_Val.csv
     except FileNotFoundError:
         return None
 
+    overview = profile == "overview"
     title = "Petroleum Imports: EA with Extra EA - Value vs Volume"
-    if overview_mode:
+    if overview:
         title = "" 
         
-    fig = create_figure(title)
+    fig = create_figure(title, profile)
 
     df_Val = rebase(df_Val, "2022-January")
     df_Vol = rebase(df_Vol, "2022-January")
@@ -104,69 +105,43 @@ def plot_price_stability(vol_file="data/Gas_Vol.csv", val_file="data/Gas_Val.csv
     plot(df_unit, fig, "#FFCC00", "Unit price")
 
     legend_setting(fig)
-    fig.add_vline(x=pd.Timestamp("2022-February"), line_width = 3, line_dash = "dash", line_color = "#2A3F5F")
+    add_vline(fig, pd.Timestamp("2022-February"), width = 3, dash = "dash", color = "#2A3F5F")
     
-    fig.update_layout(margin=dict(t=70, b=20, l=80, r=60))
-    fig.update_layout(
-        font=dict(family="Georgia", size=16, color="#2A3F5F"),
-        legend=dict(
-            font=dict(family="Georgia", size=16, color="#2A3F5F"),
-        )
-    )
-    fig.for_each_trace(lambda t: t.update(name = f"<b>{t.name}</b>"))
-
-    if overview_mode:
-        fig.update_xaxes(
-            tickfont=dict(color="#2A3F5F", family="Georgia", size=10),
-            title_font=dict(color="#2A3F5F", family="Georgia", size=10)
-        )
-        fig.update_yaxes(
-            title="Index (Jan-2022 = 100)",
-            tickfont=dict(color="#2A3F5F", family="Georgia", size=10),
-            title_font=dict(color="#2A3F5F", family="Georgia", size=10)
-        )
+    update_layout(fig, margin=dict(t=70, b=20, l=80, r=60))
+    update_layout(fig, font=dict(size=16))
+
+    if overview:
+        update_axes(fig, "y", title=dict(text="Index (Jan-2022 = 100)"))
     else:
-        fig.update_xaxes(
-            tickfont=dict(color="#2A3F5F", family="Georgia", size=16),
-            title_font=dict(color="#2A3F5F", family="Georgia", size=18),
-            tickprefix="<b>", ticksuffix="</b>"
-        )
-        fig.update_yaxes(
-            title="<b>Index (Jan-2022 = 100)</b>",
-            tickfont=dict(color="#2A3F5F", family="Georgia", size=16),
-            title_font=dict(color="#2A3F5F", family="Georgia", size=18),
-            tickprefix="<b>", ticksuffix="</b>"
-        )
+        update_axes(fig, "y", title=dict(text="<b>Index (Jan-2022 = 100)</b>"))
     
-    fig.update_layout(margin = dict(autoexpand = False))
-    fig.update_layout(margin_b = 70)
-    
-
-    fig = apply_plot_theme(fig)
-
-    if not overview_mode:
-        fig.add_annotation(xref = "x1", yref = "y1", x="2022-08-01", y = 168, 
-                                            text = "A", 
-                                            showarrow=True, 
-                                            arrowhead=1,
-                                            arrowcolor="#2A3F5F",
-                                            arrowwidth=2.5,
-                                            font = dict(color = "#2A3F5F", size = 16, weight = 1000),
-                                            ay = -10, ax = 100)
+    update_layout(fig, margin = dict(autoexpand = False))
+    update_layout(fig, margin = dict(b = 70))
+
+    if not overview:
+        add_annotation(fig, xref = "x", yref = "y", x="2022-08-01", y = 168, 
+                            text = "A", 
+                            showarrow=True, 
+                            arrowhead=1,
+                            arrowcolor="#2A3F5F",
+                            arrowwidth=2.5,
+                            font = dict(color = "#2A3F5F", size = 16, weight = 1000),
+                            ay = -10, ax = 100)
         
-        fig.add_annotation(xref = "x1", yref = "y1", x="2023-02-01", y = 85, 
-                                            text = "B", 
-                                            showarrow=True, 
-                                            arrowhead=1,
-                                            arrowcolor="#2A3F5F",
-                                            arrowwidth=2.5,
-                                            font = dict(color = "#2A3F5F", size = 16, weight = 1000),
-                                            ay = 100, ax = -40)
-
+        add_annotation(fig, xref = "x", yref = "y", x="2023-02-01", y = 85, 
+                            text = "B", 
+                            showarrow=True, 
+                            arrowhead=1,
+                            arrowcolor="#2A3F5F",
+                            arrowwidth=2.5,
+                            font = dict(color = "#2A3F5F", size = 16, weight = 1000),
+                            ay = 100, ax = -40)
+
+    update_layout(fig, **profile_layout(profile))
     return fig
 
 if __name__ == "__main__":
-
+    import plotly.io as pio
     fig = plot_price_stability()
     if fig:
-        fig.write_image("Euro_Area_Value_V_Volume2_light_2.png", width = 750, height = 450, scale = 6)
\ No newline at end of file
+        pio.write_image(fig, "Euro_Area_Value_V_Volume2_light_2.png", width = 750, height = 450, scale = 6)
\ No newline at end of file
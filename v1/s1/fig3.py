@@ -1,41 +1,37 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
-import os
-from theme import apply_plot_theme
+from theme import TEMPLATES, profile_layout
+from figure_builder import subplots, add_trace, update_layout, update_axes, add_vline
+from periods import parse_periods
+from memo import memoize
+from perf import timed
+from series_catalog import read_locals
 
+@timed("parse")
+@memoize("s1.fig3.get_data", maxsize=8)
 def get_data():
-    base_dir = "data/s1fig3"
-    
-    files = {
-        "energy_poland": os.path.join(base_dir, "Data/HICP - Energy, Poland, Monthly.csv"),
-        "neer_ea": os.path.join(base_dir, "Data/Nominal effective exchange rate, Euro area_Broad basket.csv"),
-        "neer_poland": os.path.join(base_dir, "Data/Nominal effective exchange rate, Poland_Broad basket.csv")
-    }
-
-    def load_safe(path):
-        if os.path.exists(path):
-            return pd.read_csv(path)
-        return pd.DataFrame()
+    def load_safe(series_id):
+        frames = read_locals([series_id])
+        return frames[0] if frames else pd.DataFrame()
 
-    df_energy_poland = load_safe(files["energy_poland"])
-    df_ex_ea = load_safe(files["neer_ea"])
-    df_ex_poland = load_safe(files["neer_poland"])
+    df_energy_poland = load_safe("hicp_pl_energy_long")
+    df_ex_ea = load_safe("neer_ea")
+    df_ex_poland = load_safe("neer_pl")
     
     def filter_dates(df):
         if not df.empty and "DATE" in df.columns:
-            df["DATE"] = pd.to_datetime(df["DATE"])
+            df["DATE"] = parse_periods(df["DATE"])
             df = df[df["DATE"] >= "2019-January"]
         return df
 
     return filter_dates(df_energy_poland), filter_dates(df_ex_ea), filter_dates(df_ex_poland)
 
-def create_figure(title):
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.update_layout(template ="plotly_white", title = title, title_x = 0.5, title_y = 0.925, title_font_weight = 600)
-    fig.update_layout(width = 800, height = 450)
-    return fig
+def create_figure(title, profile = "full"):
+    fig, axes = subplots(template = TEMPLATES[profile], specs=[[{"secondary_y": True}]])
+    update_layout(fig, title = dict(text = title, y = 0.925))
+    update_layout(fig, width = 800, height = 450)
+    return fig, axes
 
+@timed("transform")
 def rebase(df, base_date):
     if df.empty: return df
     try:
@@ -50,52 +46,48 @@ def rebase(df, base_date):
         print(f"Rebase error: {e}")
     return df
 
-def plot(df, fig, color, name, col, sec_y, x = "DATE"):
+def plot(df, fig, axes, color, name, col, sec_y, x = "DATE"):
     if df.empty: return
     if col not in df.columns:
         print(f"Column '{col}' not found in dataframe for {name}")
         return
 
-    fig.add_trace(go.Scatter(x=df[x], y=df[col], 
-                             line = dict(width = 3, color = color),
-                             name = name),
-                             secondary_y = sec_y)
+    add_trace(fig, "scatter", axes[1, 1, True] if sec_y else axes[1, 1],
+              x=df[x], y=df[col], 
+              line = dict(width = 3, color = color),
+              name = name)
 
 
-def touch_up(fig):
-    fig.update_layout(margin=dict(t=70, b=100, l=80, r=25))
-    fig.update_layout(font_family = "Georgia", font_weight = 600, font_size = 18)
-    fig.add_vline(x=pd.Timestamp("2022-February"), line_width = 3, line_dash = "dash",
-                                 line_color = "#2A3F5F")
-    fig.update_yaxes(title = "NEER Index (Jan-2022 = 100)", secondary_y = False)
-    fig.update_yaxes(title = "HICP Energy Inflation (YoY. %)", secondary_y = True)
-    fig.update_layout(margin = dict(autoexpand = False))
+def touch_up(fig, axes, profile = "full"):
+    update_layout(fig, margin=dict(t=70, b=100, l=80, r=25))
+    update_layout(fig, font = dict(size = 18))
+    add_vline(fig, pd.Timestamp("2022-February"), width = 3, dash = "dash",
+              color = "#2A3F5F")
+    update_axes(fig, "y", [axes[1, 1]["yaxis"]], title = dict(text = "NEER Index (Jan-2022 = 100)"))
+    update_axes(fig, "y", [axes[1, 1, True]["yaxis"]], title = dict(text = "HICP Energy Inflation (YoY. %)"))
+    update_layout(fig, margin = dict(autoexpand = False))
 
-    fig.update_layout(paper_bgcolor = "#F3F4F6")
-    fig.update_layout(plot_bgcolor = "#F3F4F6")
-    fig.update_layout(legend = dict(orientation = "h", x=0.5, y=-0.18, xanchor="center"))
-    fig.update_yaxes(tickprefix = " ", secondary_y=True)
-    fig.update_yaxes(ticksuffix = " ", secondary_y=False)
+    update_layout(fig, legend = dict(orientation = "h", x=0.5, y=-0.18, xanchor="center"))
+    update_layout(fig, **profile_layout(profile))
 
-def plot_exchange_rate_inflation():
+@timed("figure")
+def plot_exchange_rate_inflation(profile = "full"):
     try:
         df_energy_poland, df_ex_ea, df_ex_poland = get_data()
         
         if df_energy_poland.empty and df_ex_ea.empty and df_ex_poland.empty:
             return None
 
-        fig = create_figure("Exchange Rate and Energy Inflation")
+        fig, axes = create_figure("Exchange Rate and Energy Inflation", profile)
         
         df_ex_ea = rebase(df_ex_ea, "2022-January")
         df_ex_poland = rebase(df_ex_poland, "2022-January")
         
-        plot(df_energy_poland, fig, "#FFCC00", "Poland Energy HICP", "HICP - Energy (ICP.M.PL.N.NRGY00.4.ANR)", True)
-        plot(df_ex_ea, fig, "#2E6BFF", "Poland NEER", "OBS_VALUE:Value", False)
-        plot(df_ex_poland, fig, "#4CC9F0", "EA NEER", "OBS_VALUE:Value", False)
-        
-        touch_up(fig)
+        plot(df_energy_poland, fig, axes, "#FFCC00", "Poland Energy HICP", "HICP - Energy (ICP.M.PL.N.NRGY00.4.ANR)", True)
+        plot(df_ex_ea, fig, axes, "#2E6BFF", "Poland NEER", "OBS_VALUE:Value", False)
+        plot(df_ex_poland, fig, axes, "#4CC9F0", "EA NEER", "OBS_VALUE:Value", False)
         
-        fig = apply_plot_theme(fig)
+        touch_up(fig, axes, profile)
         
         return fig
     except Exception as e:
@@ -103,6 +95,7 @@ def plot_exchange_rate_inflation():
         return None
 
 if __name__ == "__main__":
+    import plotly.io as pio
     fig = plot_exchange_rate_inflation()
     if fig:
-        fig.show(renderer = "browser")
\ No newline at end of file
+        pio.show(fig, renderer = "browser")
\ No newline at end of file
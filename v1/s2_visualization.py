@@ -1,15 +1,17 @@
-import plotly.graph_objects as go
 import pandas as pd
-import math
 
 COLOR_PL = '#2e6bff'
 COLOR_EA = '#4cc9f0' 
 
 
 
-from theme import apply_plot_theme
+from distribution import summarize, bin_index
+from theme import TEMPLATES, profile_layout
+from figure_builder import figure, trace, add_trace, update_layout, add_annotation, add_vline
+from perf import timed
 
-def plot_fig1_growth_divergence(df, date_range, theme=None):
+@timed("figure")
+def plot_fig1_growth_divergence(df, date_range, theme=None, profile="full"):
     if theme is None: theme = {"bg": "#1F1F1F", "paper": "#1F1F1F", "text": "#FAFAFA", "grid": "#374151", "annotation": "#FAFAFA"}
     
     plot_df = df.copy()
@@ -19,9 +21,6 @@ def plot_fig1_growth_divergence(df, date_range, theme=None):
     color_hist = COLOR_PL
     color_shock = COLOR_PL
     
-    fig = go.Figure()
-    
-    
     shock_dates = [pd.Timestamp("2022-06-30"), pd.Timestamp("2022-09-30"), pd.Timestamp("2022-12-31")]
     shock_avg = plot_df[plot_df['Date'].isin(shock_dates)]['PL_Growth_QoQ'].mean()
 
@@ -30,134 +29,86 @@ def plot_fig1_growth_divergence(df, date_range, theme=None):
     pre_val = pre_val_series.values[0] if not pre_val_series.empty else None
 
     bin_size = 0.4 
-    x_min = math.floor(plot_df['PL_Growth_QoQ'].min())
-    x_max = math.ceil(plot_df['PL_Growth_QoQ'].max())
-    
-    bins = []
-    curr = x_min
-    while curr <= x_max + bin_size:
-        bins.append(curr)
-        curr += bin_size
-        
-    bin_centers = []
-    counts = []
-    total_points = len(plot_df)
-    
-    for i in range(len(bins) - 1):
-        left = bins[i]
-        right = bins[i+1]
-        center = (left + right) / 2
-        bin_centers.append(center)
-        
-        if i == len(bins) - 2: 
-             c = plot_df[(plot_df['PL_Growth_QoQ'] >= left) & (plot_df['PL_Growth_QoQ'] <= right)].shape[0]
-        else:
-             c = plot_df[(plot_df['PL_Growth_QoQ'] >= left) & (plot_df['PL_Growth_QoQ'] < right)].shape[0]
-        
-        density = c / (total_points * bin_size)
-        counts.append(density)
-    
-    colors = [color_hist] * len(counts)
-    
-    def get_bin_idx(val, edges):
-        for i in range(len(edges) - 1):
-             if edges[i] <= val < edges[i+1]:
-                 return i
-        return -1
+    dist = summarize(plot_df['PL_Growth_QoQ'], bin_size)
+    bins = dist['edges']
+    colors = [color_hist] * len(dist['density'])
 
     if not pd.isna(shock_avg):
-        idx = get_bin_idx(shock_avg, bins)
+        idx = bin_index(bins, shock_avg)
         if 0 <= idx < len(colors):
             colors[idx] = "#FFCC00"
             
     if pre_val is not None:
-        idx = get_bin_idx(pre_val, bins)
+        idx = bin_index(bins, pre_val)
         if 0 <= idx < len(colors):
             colors[idx] = "#4CC9F0"
 
-    fig.add_trace(go.Bar(
-        x=bin_centers,
-        y=counts,
+    fig = figure(TEMPLATES[profile])
+
+    add_trace(fig, "bar",
+        x=dist['centers'],
+        y=dist['density'],
         name='Distribution',
-        marker_color=colors,
-        marker_line=dict(color=theme['text'], width=1),
+        marker=dict(color=colors, line=dict(color=theme['text'], width=1)),
         opacity=1,
         width=bin_size 
-    ))
+    )
 
-    fig.add_trace(go.Box(
+    add_trace(fig, "box",
         x=plot_df['PL_Growth_QoQ'],
         boxpoints='outliers',
         jitter=0,
         pointpos=0,
         orientation='h',
         name='Distribution',
-        marker_color='#4B5563',
         line=dict(color=theme['text'], width=1),
-        marker=dict(opacity=1, size=5, line=dict(color=theme['text'], width=1), symbol='circle'), 
+        marker=dict(color='#4B5563', opacity=1, size=5, line=dict(color=theme['text'], width=1), symbol='circle'), 
         xaxis='x',
         yaxis='y2',
         showlegend=False
-    ))
+    )
 
     
     band_width = 0.04
 
     if not pd.isna(shock_avg):
-        fig.add_trace(go.Scatter(
+        add_trace(fig, "scatter",
             x=[None], y=[None],
             mode='markers',
             marker=dict(symbol='square', size=10, color="#FFCC00", opacity=1),
             name=f"Shock-period mean ({shock_avg:.1f}%)"
-        ))
+        )
 
     if pre_val is not None:
-        fig.add_trace(go.Scatter(
+        add_trace(fig, "scatter",
             x=[None], y=[None],
             mode='markers',
             marker=dict(symbol='square', size=10, color="#4CC9F0", opacity=1),
             name=f"Pre-invasion benchmark ({pre_val:.1f}%)"
-        ))
+        )
 
     start_year = plot_df['Date'].min().year
     end_year = plot_df['Date'].max().year
 
-    fig.update_layout(
+    update_layout(fig,
         title=dict(
             text=f"<b>GDP Growth Distribution</b>",
-            x=0.5,
-            xanchor='center',
-            yanchor='top',
-            font=dict(color="#2A3F5F", family="Georgia", size=24, weight=600)
+            yanchor='top'
         ),
-        font=dict(color="#2A3F5F", family="Georgia", weight=600),
-        template="plotly_white",
-        plot_bgcolor="#F3F4F6",
-        paper_bgcolor="#F3F4F6",
         hovermode="x unified",
         margin=dict(l=40, r=40, t=70, b=100),
         xaxis=dict(
-            title="Real GDP Growth (QoQ %)", 
-            showgrid=False, 
+            title=dict(text="Real GDP Growth (QoQ %)", standoff=25), 
             color="#2A3F5F",
-            zeroline=True, zerolinewidth=1,
-            tickfont=dict(size=16, family="Georgia", color="#2A3F5F"),
-            title_font=dict(size=18, family="Georgia", color="#2A3F5F"),
-            tickprefix="<b>", ticksuffix="</b>",
-            title_standoff=25
+            zeroline=True, zerolinewidth=1
         ),
         yaxis=dict(
-            title="Density", 
+            title=dict(text="Density"), 
             color="#2A3F5F",
-            domain=[0, 0.75], 
-            showgrid=False,
-            tickfont=dict(size=16, family="Georgia", color="#2A3F5F"),
-            title_font=dict(size=18, family="Georgia", color="#2A3F5F"),
-            tickprefix="<b>", ticksuffix="</b>"
+            domain=[0, 0.75]
         ),
         yaxis2=dict(
             domain=[0.77, 1],
-            showgrid=False,
             visible=False
         ),
         barmode='overlay',
@@ -170,21 +121,22 @@ def plot_fig1_growth_divergence(df, date_range, theme=None):
             y=-0.15,
             xanchor="center",
             x=0.5,
-            bgcolor='rgba(0,0,0,0)',
-            font=dict(size=16, color="#2A3F5F", family="Georgia")
+            bgcolor='rgba(0,0,0,0)'
         )
     )
+    update_layout(fig, **profile_layout(profile))
     
-    return apply_plot_theme(fig)
+    return fig
 
 
-def plot_fig2_decomposition(df, theme=None):
+@timed("figure")
+def plot_fig2_decomposition(df, theme=None, profile="full"):
     if theme is None: theme = {"bg": "#1F1F1F", "paper": "#1F1F1F", "text": "#FAFAFA", "grid": "#374151", "annotation": "#FAFAFA"}
     chart_df = df.copy()
     req_cols = ['Consumption', 'Investment', 'Gov_Spending', 'Exports', 'Imports']
     available = [c for c in req_cols if c in chart_df.columns]
 
-    if not available: return go.Figure()
+    if not available: return figure(TEMPLATES[profile], **profile_layout(profile))
 
     p1 = chart_df[(chart_df['Date'] >= '2019-01-01') & (chart_df['Date'] <= '2021-12-31')][available].mean()
     p2 = chart_df[(chart_df['Date'] >= '2022-01-01') & (chart_df['Date'] <= '2024-12-31')][available].mean()
@@ -194,7 +146,8 @@ def plot_fig2_decomposition(df, theme=None):
         deltas['Net_Exports'] = (p2['Exports'] - p2['Imports']) - (p1['Exports'] - p1['Imports'])
     total = sum(deltas.values())
 
-    fig = go.Figure(go.Waterfall(
+    fig = figure(TEMPLATES[profile])
+    add_trace(fig, "waterfall",
         measure=["relative"] * len(deltas) + ["total"],
         x=[k.replace('_', ' ') for k in deltas.keys()] + ["TOTAL SHIFT"],
         y=list(deltas.values()) + [total],
@@ -203,27 +156,17 @@ def plot_fig2_decomposition(df, theme=None):
         increasing={"marker": {"color": COLOR_PL, "line": {"color": theme['text'], "width": 1}}},
         decreasing={"marker": {"color": COLOR_EA, "line": {"color": theme['text'], "width": 1}}},
         totals={"marker": {"color": "#4B5563"}}
-    ))
-    fig.update_layout(
+    )
+    update_layout(fig,
         title=dict(
             text="<b>Drivers of GDP Change (Volume)</b>",
-            x=0.5,
-            xanchor='center',
-            yanchor='top',
-            font=dict(color="#2A3F5F", family="Georgia", size=24, weight=600)
+            yanchor='top'
         ),
-        font=dict(color="#2A3F5F", family="Georgia", weight=600),
-        template="plotly_white",
-        paper_bgcolor="#F3F4F6",
-        plot_bgcolor="#F3F4F6",
         margin=dict(l=40, r=40, t=70, b=80),
-        yaxis=dict(title="EUR Billions (Volume Change)", color="#2A3F5F", tickfont=dict(size=16, family="Georgia", color="#2A3F5F"), title_font=dict(size=18, family="Georgia", color="#2A3F5F"), tickprefix="<b>", ticksuffix="</b>"),
+        yaxis=dict(title=dict(text="EUR Billions (Volume Change)"), color="#2A3F5F"),
         xaxis=dict(
             color="#2A3F5F", 
-            tickfont=dict(size=16, family="Georgia", color="#2A3F5F"), 
-            title_font=dict(size=18, family="Georgia", color="#2A3F5F"), 
-            tickprefix="<b>", ticksuffix="</b>",
-            title_standoff=50
+            title=dict(standoff=50)
         ),
         autosize=True,
         height=750,
@@ -232,14 +175,46 @@ def plot_fig2_decomposition(df, theme=None):
             yanchor="top",
             y=-0.15,
             xanchor="center",
-            x=0.5,
-            font=dict(size=16, color="#2A3F5F", family="Georgia")
+            x=0.5
         )
     )
-    return apply_plot_theme(fig)
+    update_layout(fig, **profile_layout(profile))
+    return fig
+
+
+@timed("figure")
+def animation_frames(plot_df, animation="range", frame_step=1):
+    """
+    Frames revealing the EA and PL index paths quarter by quarter, every frame_step-th quarter
+    (the last one always included). "range" frames only move the x-axis end over the series
+    already in the figure, so each is a few bytes; "prefix" frames re-embed both series up to
+    their quarter, which grows quadratically with the sample.
+    """
+    steps = list(range(1, len(plot_df), frame_step))
+    if steps and steps[-1] != len(plot_df) - 1:
+        steps.append(len(plot_df) - 1)
+    if animation == "prefix":
+        return [
+            dict(
+                data=[
+                    trace("scatter", x=plot_df['Date'][:k + 1], y=plot_df['EA_Index'][:k + 1]),
+                    trace("scatter", x=plot_df['Date'][:k + 1], y=plot_df['PL_Index'][:k + 1])
+                ]
+            )
+            for k in steps
+        ]
+    if animation == "range":
+        start = plot_df['Date'].iloc[0]
+        return [dict(layout=dict(xaxis=dict(range=[start, plot_df['Date'].iloc[k]]))) for k in steps]
+    raise ValueError(f"Unknown animation {animation!r}, expected 'range' or 'prefix'")
 
 
-def plot_fig3_animated(df, date_range, theme=None, static_view=False):
+@timed("figure")
+def plot_fig3_animated(df, date_range, theme=None, animation="range", frame_step=1, profile="full"):
+    """
+    animation picks the frames behind PLAY SEQUENCE (see animation_frames); None builds the
+    figure without frames or the button. The overview profile is a static 2020-2024 view.
+    """
     if theme is None: theme = {"bg": "#1F1F1F", "paper": "#1F1F1F", "text": "#FAFAFA", "grid": "#374151", "annotation": "#FAFAFA"}
     mask = (df['Date'] >= pd.Timestamp(date_range[0])) & (df['Date'] <= pd.Timestamp(date_range[1]))
     plot_df = df.loc[mask].copy()
@@ -252,89 +227,91 @@ def plot_fig3_animated(df, date_range, theme=None, static_view=False):
     plot_df['EA_Index'] = (plot_df['EA_GDP'] / ea_base) * 100
     plot_df['PL_Index'] = (plot_df['PL_GDP'] / pl_base) * 100
 
-    title_text = "<b>Cumulative Real GDP Index (Q4 2021 = 100)</b>" if static_view else "<b>Poland vs Euro Area: Cumulative GDP Growth</b>"
+    overview = profile == "overview"
+    title_text = "<b>Cumulative Real GDP Index (Q4 2021 = 100)</b>" if overview else "<b>Poland vs Euro Area: Cumulative GDP Growth</b>"
 
     layout_args = dict(
         title=dict(text=title_text,
-                   x=0.5,
-                   xanchor='center',
-                   yanchor='top',
-                   font=dict(color="#2A3F5F", family="Georgia", size=24 if not static_view else 12, weight=600)),
-        font=dict(color="#2A3F5F", family="Georgia", weight=600),
-        template="plotly_white",
-        plot_bgcolor="#F3F4F6",
-        paper_bgcolor="#F3F4F6",
-        xaxis=dict(range=[pd.Timestamp("2020-01-01"), pd.Timestamp("2024-12-31")] if static_view else [plot_df['Date'].min(), plot_df['Date'].max()], 
-                   showgrid=False, color="#2A3F5F", 
-                   tickfont=dict(size=16 if not static_view else 10, family="Georgia", color="#2A3F5F"),
-                   tickprefix="<b>", ticksuffix="</b>"),
-        yaxis=dict(title="Index (Jan-2022 = 100)", range=[85, 115], color="#2A3F5F", 
-                   tickfont=dict(size=16 if not static_view else 10, family="Georgia", color="#2A3F5F"),
-                   tickprefix="<b>", ticksuffix="</b>"),
-        margin=dict(l=40, r=40, t=70, b=100) if not static_view else dict(l=10, r=10, t=25, b=10),
+                   yanchor='top'),
+        xaxis=dict(range=[pd.Timestamp("2020-01-01"), pd.Timestamp("2024-12-31")] if overview else [plot_df['Date'].min(), plot_df['Date'].max()], 
+                   color="#2A3F5F"),
+        yaxis=dict(title=dict(text="Index (Jan-2022 = 100)"), range=[85, 115], color="#2A3F5F"),
+        margin=dict(l=40, r=40, t=70, b=100),
         autosize=True,
-        height=600 if not static_view else 220,
+        height=600,
         legend=dict(
             orientation="h",
             yanchor="top",
-            # y=-0.2 if not static_view else 1.1,
+            # y=-0.2,
             xanchor="center",
-            x=0.5,
-            font=dict(size=16, color="#2A3F5F", family="Georgia")
+            x=0.5
         )
     )
 
-    if static_view:
-        fig = go.Figure(layout=go.Layout(**layout_args))
-        # Static Traces
-        fig.add_trace(go.Scatter(x=plot_df['Date'], y=plot_df['EA_Index'],
-                                 mode="lines", line=dict(color=COLOR_EA, width=2), name="Euro Area"))
-        fig.add_trace(go.Scatter(x=plot_df['Date'], y=plot_df['PL_Index'],
-                                 mode="lines", line=dict(color=COLOR_PL, width=4), name="Poland"))
-        
-    else:
-        fig = go.Figure(
-            data=[
-                go.Scatter(x=plot_df['Date'], y=plot_df['EA_Index'],
-                           mode="lines", line=dict(color=COLOR_EA, width=2), name="Euro Area"),
-                go.Scatter(x=plot_df['Date'], y=plot_df['PL_Index'],
-                           mode="lines", line=dict(color=COLOR_PL, width=4), name="Poland")
-            ],
-            layout=go.Layout(
-                **layout_args,
-                updatemenus=[dict(
-                    type="buttons",
-                    bgcolor=theme['paper'],
-                    bordercolor=theme['text'],
-                    font=dict(color=theme['text']),
-                    buttons=[dict(label="▶ PLAY SEQUENCE",
-                                  method="animate",
-                                  args=[None, dict(frame=dict(duration=100, redraw=False), fromcurrent=True)])],
-                    x=1,
-                    y=1.15,
-                    xanchor="right",
-                    yanchor="top",
-                    showactive=False
-                )]
-            ),
-            frames=[
-                go.Frame(
-                    data=[
-                        go.Scatter(x=plot_df['Date'][:k + 1], y=plot_df['EA_Index'][:k + 1]),
-                        go.Scatter(x=plot_df['Date'][:k + 1], y=plot_df['PL_Index'][:k + 1])
-                    ]
-                )
-                for k in range(1, len(plot_df))
-            ]
-        )
-        fig.add_annotation(x=base_date, y=100, text="START", 
-                           showarrow=True, arrowhead=1, 
-                           ax=-40, ay=-10, 
-                           arrowcolor="#000000",
-                           font=dict(color=theme['annotation']))
+    fig = figure(TEMPLATES[profile], **layout_args)
+    add_trace(fig, "scatter", x=plot_df['Date'], y=plot_df['EA_Index'],
+              mode="lines", line=dict(color=COLOR_EA, width=2), name="Euro Area")
+    add_trace(fig, "scatter", x=plot_df['Date'], y=plot_df['PL_Index'],
+              mode="lines", line=dict(color=COLOR_PL, width=4), name="Poland")
+
+    if not overview:
+        if animation is not None:
+            if animation == "range":
+                # the axis pans linearly between decimated frames, so playback takes as long as with every quarter
+                duration = 100 * frame_step
+                play = dict(frame=dict(duration=duration, redraw=False),
+                            transition=dict(duration=duration, easing="linear"), fromcurrent=True)
+            else:
+                play = dict(frame=dict(duration=100, redraw=False), fromcurrent=True)
+            update_layout(fig, updatemenus=[dict(
+                type="buttons",
+                bgcolor=theme['paper'],
+                bordercolor=theme['text'],
+                font=dict(color=theme['text']),
+                buttons=[dict(label="▶ PLAY SEQUENCE",
+                              method="animate",
+                              args=[None, play])],
+                x=1,
+                y=1.15,
+                xanchor="right",
+                yanchor="top",
+                showactive=False
+            )])
+            fig["frames"] = animation_frames(plot_df, animation, frame_step)
+        add_annotation(fig, x=base_date, y=100, text="START", 
+                       showarrow=True, arrowhead=1, 
+                       ax=-40, ay=-10, 
+                       arrowcolor="#000000",
+                       font=dict(color=theme['annotation']))
 
     invasion_date = pd.Timestamp("2021-12-31")
-    fig.add_vline(x=invasion_date, line_width=2, line_dash="solid", line_color="#2A3F5F")
+    if overview:
+        add_vline(fig, invasion_date, width=3, dash="dash", color="#2A3F5F")
+    else:
+        add_vline(fig, invasion_date, width=2, dash="solid", color="#2A3F5F")
+    update_layout(fig, **profile_layout(profile))
+
+    return fig
+
 
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    import plotly.io as pio
 
-    return apply_plot_theme(fig)
+    # payload of the cumulative GDP figure per animation mode, on a synthetic quarterly sample
+    dates = pd.date_range("1995-03-31", periods=124, freq="QE")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Date": dates,
+                       "EA_GDP": 100 * np.cumprod(1 + rng.normal(0.004, 0.006, len(dates))),
+                       "PL_GDP": 100 * np.cumprod(1 + rng.normal(0.009, 0.008, len(dates)))})
+    date_range = (dates[0], dates[-1])
+    for label, kwargs in (("prefix (previous)", dict(animation="prefix")),
+                          ("range", dict(animation="range")),
+                          ("range, every 4th quarter", dict(animation="range", frame_step=4)),
+                          ("no frames", dict(animation=None))):
+        start = time.perf_counter()
+        fig = plot_fig3_animated(df, date_range, **kwargs)
+        payload = pio.to_json(fig, validate=False)
+        elapsed = time.perf_counter() - start
+        print(f"{label:26s} {len(fig.get('frames', [])):4d} frames {len(payload.encode()):9d} bytes {elapsed * 1000:7.1f} ms")
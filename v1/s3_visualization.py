@@ -1,14 +1,17 @@
-import plotly.graph_objects as go
 import pandas as pd
-from plotly.subplots import make_subplots
 import numpy as np
-from theme import apply_plot_theme
+from series_store import SeriesStore
+from distribution import summarize
+from theme import TEMPLATES, profile_layout
+from figure_builder import figure, subplots, add_trace, update_layout, update_axes, add_annotation, add_vline
+from perf import timed
 
 COLOR_PL = '#2e6bff'     
 COLOR_EA = '#4cc9f0'      
 
 
-def plot_fig1_ca_headline(data_dict, date_range, theme=None):
+@timed("figure")
+def plot_fig1_ca_headline(data_dict, date_range, theme=None, profile="full"):
     """
     Figure 1: Structural Break Analysis (Distributions & Divergence).
     Panel A: Distributions of Indexed Current Account (Pre vs Post Feb 2022).
@@ -56,11 +59,10 @@ def plot_fig1_ca_headline(data_dict, date_range, theme=None):
 
     start_date, end_date = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
         
-    df_merged = pd.merge(
-        pl_full[['Date', 'Indexed']].rename(columns={'Indexed': 'PL'}),
-        ea_full[['Date', 'Indexed']].rename(columns={'Indexed': 'EA'}),
-        on='Date', how='inner'
-    )
+    store = SeriesStore()
+    store.add('PL', pl_full, 'M', value_col='Indexed')
+    store.add('EA', ea_full, 'M', value_col='Indexed')
+    df_merged = store.frame(['PL', 'EA'], how='inner')
     
     mask = (df_merged['Date'] >= start_date) & (df_merged['Date'] <= end_date)
     plot_df = df_merged.loc[mask].copy()
@@ -69,84 +71,56 @@ def plot_fig1_ca_headline(data_dict, date_range, theme=None):
         return None
 
     break_date = pd.Timestamp("2022-02-24")
-    plot_df['Period'] = plot_df['Date'].apply(lambda x: 'Post-Feb 2022' if x >= break_date else 'Pre-Feb 2022')
-    plot_df['Period'] = pd.Categorical(plot_df['Period'], categories=period_order, ordered=True)
-
-    plot_df['Divergence'] = plot_df['PL'] - plot_df['EA']
+    period_order = ['Pre-Feb 2022', 'Post-Feb 2022']
+    post = (plot_df['Date'] >= break_date).to_numpy()
+    periods = {'Pre-Feb 2022': plot_df.loc[~post], 'Post-Feb 2022': plot_df.loc[post]}
+    divergence = {period: (rows['PL'] - rows['EA']).to_numpy() for period, rows in periods.items()}
 
-    fig = make_subplots(
+    fig, axes = subplots(
+        template=TEMPLATES[profile],
         rows=1, cols=2,
         subplot_titles=("<b>Panel A: Distribution Shift</b>", "<b>Panel B: Mean Divergence (PL - EA)</b>"),
         horizontal_spacing=0.15
     )
 
-    # poland
-    fig.add_trace(go.Box(
-        y=plot_df[plot_df['Period'] == 'Pre-Feb 2022']['PL'],
-        x=['Pre-Feb 2022'] * len(plot_df[plot_df['Period'] == 'Pre-Feb 2022']),
-        name="Poland",
-        marker_color=COLOR_PL,
-        boxpoints=False, # Clean look
-        showlegend=True,
-        legendgroup="PL"
-    ), row=1, col=1)
-    
-    fig.add_trace(go.Box(
-        y=plot_df[plot_df['Period'] == 'Post-Feb 2022']['PL'],
-        x=['Post-Feb 2022'] * len(plot_df[plot_df['Period'] == 'Post-Feb 2022']),
-        name="Poland",
-        marker_color=COLOR_PL,
-        boxpoints=False,
-        showlegend=False,
-        legendgroup="PL"
-    ), row=1, col=1)
-
-    # euro area
-    fig.add_trace(go.Box(
-        y=plot_df[plot_df['Period'] == 'Pre-Feb 2022']['EA'],
-        x=['Pre-Feb 2022'] * len(plot_df[plot_df['Period'] == 'Pre-Feb 2022']),
-        name="Euro Area",
-        marker_color=COLOR_EA,
-        boxpoints=False,
-        showlegend=True,
-        legendgroup="EA"
-    ), row=1, col=1)
-
-    fig.add_trace(go.Box(
-        y=plot_df[plot_df['Period'] == 'Post-Feb 2022']['EA'],
-        x=['Post-Feb 2022'] * len(plot_df[plot_df['Period'] == 'Post-Feb 2022']),
-        name="Euro Area",
-        marker_color=COLOR_EA,
-        boxpoints=False,
-        showlegend=False,
-        legendgroup="EA"
-    ), row=1, col=1)
-
-    stats = plot_df.groupby('Period', observed=True)['Divergence'].agg(['mean', 'sem']).reset_index()
+    # boxes from precomputed quartiles and fences, so the figure carries five numbers per box instead of the series
+    for col, name, color, group in (('PL', "Poland", COLOR_PL, "PL"), ('EA', "Euro Area", COLOR_EA, "EA")):
+        for i, period in enumerate(period_order):
+            box = summarize(periods[period][col])['box']
+            if box is None:
+                continue
+            add_trace(fig, "box", axes[1, 1],
+                x=[period],
+                q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+                lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+                name=name,
+                marker=dict(color=color),
+                boxpoints=False, # Clean look
+                showlegend=i == 0,
+                legendgroup=group
+            )
+
+    summaries = {period: summarize(divergence[period]) for period in period_order if len(divergence[period])}
+    stats = pd.DataFrame({'Period': list(summaries),
+                          'mean': [dist['mean'] for dist in summaries.values()],
+                          'sem': [dist['sem'] for dist in summaries.values()]})
     
     bar_color = '#9CA3AF'
 
-    fig.add_trace(go.Bar(
+    add_trace(fig, "bar", axes[1, 2],
         x=stats['Period'],
         y=stats['mean'],
         error_y=dict(type='data', array=stats['sem'], visible=True, color=theme['text']),
         name="Divergence (PL - EA)",
-        marker_color=bar_color,
+        marker=dict(color=bar_color),
         showlegend=False
-    ), row=1, col=2)
+    )
 
-    fig.update_layout(
+    update_layout(fig,
         title=dict(
             text="<b>Structural Break Test: Current Account Dynamics</b>",
-            x=0.5,
-            xanchor='center',
-            yanchor='top',
-            font=dict(color="#2A3F5F", family="Georgia", size=24, weight=600)
+            yanchor='top'
         ),
-        font=dict(color="#2A3F5F", family="Georgia", weight=600),
-        template="plotly_white",
-        plot_bgcolor="#F3F4F6",
-        paper_bgcolor="#F3F4F6",
         margin=dict(l=40, r=40, t=70, b=100),
 
         boxmode='group', 
@@ -157,34 +131,21 @@ def plot_fig1_ca_headline(data_dict, date_range, theme=None):
             yanchor="top",
             # y=-0.2,
             xanchor="center",
-            x=0.5,
-            font=dict(size=16, color="#2A3F5F", family="Georgia")
+            x=0.5
         )
     )
 
-    fig.update_yaxes(
-        title_font=dict(color="#2A3F5F", family="Georgia", size=18),
-        tickfont=dict(color="#2A3F5F", family="Georgia", size=16),
-        zeroline=True, zerolinewidth=1,
-        tickprefix="<b>", ticksuffix="</b>",
-        row=1, col=1
-    )
-    fig.update_yaxes(
-        title_font=dict(color="#2A3F5F", family="Georgia", size=18),
-        tickfont=dict(color="#2A3F5F", family="Georgia", size=16),
-        zeroline=True, zerolinewidth=1, 
-        tickprefix="<b>", ticksuffix="</b>",
-        row=1, col=2
-    )
-    fig.update_xaxes(showgrid=False, color="#2A3F5F", tickfont=dict(size=16, family="Georgia", color="#2A3F5F"), tickprefix="<b>", ticksuffix="</b>", row=1, col=1)
-    fig.update_xaxes(showgrid=False, color="#2A3F5F", tickfont=dict(size=16, family="Georgia", color="#2A3F5F"), tickprefix="<b>", ticksuffix="</b>", row=1, col=2)
+    update_axes(fig, "y", [axes[1, 1]["yaxis"], axes[1, 2]["yaxis"]], zeroline=True, zerolinewidth=1)
+    update_axes(fig, "x", [axes[1, 1]["xaxis"], axes[1, 2]["xaxis"]], color="#2A3F5F")
+    update_layout(fig, **profile_layout(profile))
 
-    return apply_plot_theme(fig)
+    return fig
 
 
-def plot_fig2_goods_balance(data_dict, date_range, theme=None, overview_mode=False):
+@timed("figure")
+def plot_fig2_goods_balance(data_dict, date_range, theme=None, profile="full"):
     """
-    Figure 2: Goods Balance (Poland with Russia and ex-Russia).
+    Figure 2: Goods Balance (Poland with Russia and ex-Russia). The overview profile shows 2020-2024.
     """
     if theme is None: theme = {"bg": "#1F1F1F", "paper": "#1F1F1F", "text": "#FAFAFA", "grid": "#374151", "annotation": "#FAFAFA", "line_total": "#FAFAFA", "shading": "rgba(255, 255, 255, 0.05)"}
     if not data_dict:
@@ -196,13 +157,11 @@ def plot_fig2_goods_balance(data_dict, date_range, theme=None, overview_mode=Fal
     if df_total.empty or df_russia.empty:
         return None
 
-    df = pd.merge(
-        df_total[['Date', 'Value']].rename(columns={'Value': 'Total'}),
-        df_russia[['Date', 'Value']].rename(columns={'Value': 'Russia'}),
-        on='Date', how='inner'
-    )
+    store = SeriesStore().add_frames({'Total': df_total, 'Russia': df_russia}, {'Total': 'Q', 'Russia': 'Q'})
+    df = store.frame(['Total', 'Russia'], how='inner')
 
-    if overview_mode:
+    overview = profile == "overview"
+    if overview:
         start_date, end_date = pd.Timestamp("2020-01-01"), pd.Timestamp("2024-12-31")
     else:
         start_date, end_date = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
@@ -211,71 +170,61 @@ def plot_fig2_goods_balance(data_dict, date_range, theme=None, overview_mode=Fal
     plot_df = df.loc[mask].copy()
     plot_df['Ex_Russia'] = plot_df['Total'] - plot_df['Russia']
 
-    fig = go.Figure()
+    fig = figure(TEMPLATES[profile])
 
-    fig.add_trace(go.Bar(
+    add_trace(fig, "bar",
         x=plot_df['Date'], y=plot_df['Ex_Russia'],
         name="Ex-Russia",
-        marker_color='#4B5563', 
-    ))
+        marker=dict(color='#4B5563'), 
+    )
 
-    fig.add_trace(go.Bar(
+    add_trace(fig, "bar",
         x=plot_df['Date'], y=plot_df['Russia'],
         name="Russia",
-        marker_color='#2e6bff', 
-    ))
+        marker=dict(color='#2e6bff'), 
+    )
 
 
 
-    fig.add_vline(x=pd.Timestamp("2022-02-24"), line_width=3, line_dash="dash", line_color="#2A3F5F")
+    add_vline(fig, pd.Timestamp("2022-02-24"), width=3, dash="dash", color="#2A3F5F")
     
-    title_text = "<b>Goods Balance Decomposition</b>" if overview_mode else "<b>Goods Balance Decomposition (Russia vs Ex-Russia)</b>"
+    title_text = "<b>Goods Balance Decomposition</b>" if overview else "<b>Goods Balance Decomposition (Russia vs Ex-Russia)</b>"
 
-    fig.update_layout(
+    update_layout(fig,
         title=dict(
             text=title_text,
-            x=0.5,
-            xanchor='center',
-            yanchor='top',
-            font=dict(color="#2A3F5F", family="Georgia", size=12 if overview_mode else 24, weight=600)
+            yanchor='top'
         ),
-        font=dict(color="#2A3F5F", family="Georgia", weight=600),
-        template="plotly_white",
-        plot_bgcolor="#F3F4F6",
-        paper_bgcolor="#F3F4F6",
         hovermode="x unified",
-        margin=dict(l=10, r=10, t=25, b=10) if overview_mode else dict(l=40, r=40, t=70, b=100),
+        margin=dict(l=40, r=40, t=70, b=100),
 
-        xaxis=dict(showgrid=False, color="#2A3F5F", tickfont=dict(size=10 if overview_mode else 16, family="Georgia", color="#2A3F5F"), tickprefix="<b>", ticksuffix="</b>"),
+        xaxis=dict(color="#2A3F5F"),
         yaxis=dict(
-            title="EUR Millions" if not overview_mode else None,
+            title=dict(text="EUR Millions"),
             color="#2A3F5F",
-            zeroline=True, zerolinewidth=2,
-            tickfont=dict(size=10 if overview_mode else 16, family="Georgia", color="#2A3F5F"),
-            title_font=dict(size=14 if overview_mode else 18, family="Georgia", color="#2A3F5F"),
-            tickprefix="<b>", ticksuffix="</b>"
+            zeroline=True, zerolinewidth=2
         ),
         barmode='relative',
         bargap=0.2, 
         autosize=True,
-        height=220 if overview_mode else 600,
+        height=600,
         legend=dict(
             orientation="h",
             yanchor="top",
-            y=1.1 if overview_mode else None, 
             xanchor="center",
-            x=0.5,
-            font=dict(size=12 if overview_mode else 16, color="#2A3F5F", family="Georgia")
+            x=0.5
         )
     )
+    update_layout(fig, **profile_layout(profile))
     
-    if overview_mode:
-        fig.add_vline(x=pd.Timestamp("2022-02-24"), line_width=1, line_dash="solid", line_color="#6B7280")
+    if overview:
+        update_layout(fig, margin=dict(l=35), yaxis=dict(nticks=6))
 
-    return apply_plot_theme(fig)
+    return fig
 
 
-def plot_fig3_impact_bridge(data_dict, date_range, theme=None):
+@timed("figure")
+def plot_fig3_impact_bridge(data_dict, date_range, theme=None, profile="full"):
     """
     Figure 3: Bridge the Impact (CA vs Goods Balance).
     """
@@ -289,12 +238,9 @@ def plot_fig3_impact_bridge(data_dict, date_range, theme=None):
     if df_ca_monthly.empty or df_goods.empty:
         return None
 
-    df_ca_monthly['Date'] = pd.to_datetime(df_ca_monthly['Date'])
-    df_ca_q = df_ca_monthly.set_index('Date').resample('QE').sum().reset_index()
-    df_ca_q = df_ca_q.rename(columns={'Value': 'CA'})
-    df_goods = df_goods.rename(columns={'Value': 'Goods'})
-
-    df = pd.merge(df_ca_q, df_goods, on='Date', how='inner')
+    # monthly current account summed to quarters, on the goods balance's quarter-end dates
+    store = SeriesStore().add_frames({'CA': df_ca_monthly, 'Goods': df_goods}, {'CA': 'M', 'Goods': 'Q'})
+    df = store.frame(['CA', 'Goods'], freq='Q', agg='sum', how='inner')
 
     start_date, end_date = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
     mask = (df['Date'] >= start_date) & (df['Date'] <= end_date)
@@ -311,33 +257,26 @@ def plot_fig3_impact_bridge(data_dict, date_range, theme=None):
     y_min, y_max = all_vals.min(), all_vals.max()
     y_range = [y_min * 1.1, y_max * 1.1]
 
-    fig = go.Figure()
+    fig = figure(TEMPLATES[profile])
 
-    fig.add_trace(go.Scatter(
+    add_trace(fig, "scatter",
         x=plot_df['Date'], y=plot_df['CA'],
         name="Current Account",
         line=dict(color=COLOR_PL, width=3)
-    ))
+    )
 
-    fig.add_trace(go.Scatter(
+    add_trace(fig, "scatter",
         x=plot_df['Date'], y=plot_df['Goods'],
         name="Goods Balance",
         line=dict(color=COLOR_EA, width=3)
-    ))
+    )
     
 
-    fig.update_layout(
+    update_layout(fig,
         title=dict(
             text="<b>Current Account vs Goods Balance</b>",
-            x=0.5,
-            xanchor='center',
-            yanchor='top',
-            font=dict(color="#2A3F5F", family="Georgia", size=24, weight=600)
+            yanchor='top'
         ),
-        font=dict(color="#2A3F5F", family="Georgia", weight=600),
-        template="plotly_white",
-        plot_bgcolor="#F3F4F6",
-        paper_bgcolor="#F3F4F6",
         hovermode="x unified",
         margin=dict(l=40, r=40, t=70, b=130),
 
@@ -348,30 +287,24 @@ def plot_fig3_impact_bridge(data_dict, date_range, theme=None):
             yanchor="top",
             # y=-0.2,
             xanchor="center",
-            x=0.5,
-            font=dict(size=16, color="#2A3F5F", family="Georgia")
+            x=0.5
         )
     )
     
-    fig.add_vline(x=pd.Timestamp("2022-02-24"), line_width=3, line_dash="dash", line_color="#2A3F5F")
-
-    fig.update_yaxes(
-        title_text="EUR Millions", 
-        title_font=dict(color="#2A3F5F", family="Georgia", size=18),
-        tickfont=dict(color="#2A3F5F", family="Georgia", size=16),
-        range=y_range,
-        tickprefix="<b>", ticksuffix="</b>"
-    )
-    fig.update_xaxes(showgrid=False, color="#2A3F5F", tickfont=dict(size=16, family="Georgia", color="#2A3F5F"), tickprefix="<b>", ticksuffix="</b>")
+    add_vline(fig, pd.Timestamp("2022-02-24"), width=3, dash="dash", color="#2A3F5F")
+
+    update_axes(fig, "y", title=dict(text="EUR Millions"), range=y_range)
+    update_axes(fig, "x", color="#2A3F5F")
 
-    fig.add_annotation(
+    add_annotation(fig,
         text=f"Correlation coefficient: {r:.2f}",
         xref="paper", yref="paper",
         x=0.5, y=-0.25,
         showarrow=False,
         font=dict(family="Georgia", size=10, color="#2A3F5F")
     )
+    update_layout(fig, **profile_layout(profile))
 
-    return apply_plot_theme(fig)
+    return fig
 
 
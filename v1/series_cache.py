@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# bump when the on-disk layout changes; files with another version are treated as a miss
+CACHE_VERSION = 1
+SCHEMA = {"Date": "datetime64[ns]", "Value": "float64"}
+
+
+def series_digest(df):
+    """
+    Content hash of a series' dates and values; its metadata (fetched_at, validators) is not part of it.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(df["Date"].to_numpy(dtype="datetime64[ns]").tobytes())
+    h.update(df["Value"].to_numpy(dtype="float64").tobytes())
+    return h.hexdigest()
+
+
+class NpzCache:
+    """
+    Binary cache: one uncompressed .npz per series holding typed Date/Value arrays
+    plus a JSON header (version, schema, key, row count, free-form metadata).
+    """
+    ext = ".npz"
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}{self.ext}")
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(f[:-len(self.ext)] for f in os.listdir(self.root) if f.endswith(self.ext))
+
+    def load(self, key):
+        """
+        Returns (df, meta) or None if the series is not cached or the header does not match.
+        """
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as npz:
+            header = json.loads(str(npz["header"]))
+            if header.get("version") != CACHE_VERSION or header.get("schema") != SCHEMA:
+                return None
+            df = pd.DataFrame({"Date": npz["Date"], "Value": npz["Value"]})
+        return df, header.get("meta", {})
+
+    def digest(self, key):
+        """
+        series_digest of a cached series, read from its header (computed for files written
+        without one), or None if it is not cached.
+        """
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as npz:
+            header = json.loads(str(npz["header"]))
+            if header.get("version") != CACHE_VERSION or header.get("schema") != SCHEMA:
+                return None
+            if "digest" in header:
+                return header["digest"]
+            return series_digest(pd.DataFrame({"Date": npz["Date"], "Value": npz["Value"]}))
+
+    def save(self, key, df, meta=None):
+        os.makedirs(self.root, exist_ok=True)
+        header = {
+            "version": CACHE_VERSION,
+            "schema": SCHEMA,
+            "key": key,
+            "rows": len(df),
+            "digest": series_digest(df),
+            "meta": meta or {},
+        }
+        # write to a temp file of this writer's own first, so a concurrent reader never sees a
+        # half-written series and concurrent writers of the same key never share a file
+        with tempfile.NamedTemporaryFile(dir=self.root, prefix=key + ".", suffix=".tmp", delete=False) as fh:
+            try:
+                np.savez(
+                    fh,
+                    header=np.array(json.dumps(header)),
+                    Date=df["Date"].to_numpy(dtype="datetime64[ns]"),
+                    Value=df["Value"].to_numpy(dtype="float64"),
+                )
+            except BaseException:
+                fh.close()
+                os.remove(fh.name)
+                raise
+        os.replace(fh.name, self.path(key))
+
+
+class CsvCache:
+    """
+    Plain Date,Value CSV files, as written by earlier versions of data_fetcher.
+    Kept for exports and for reading the CSV files shipped in data/.
+    """
+    ext = ".csv"
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}{self.ext}")
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(f[:-len(self.ext)] for f in os.listdir(self.root) if f.endswith(self.ext))
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        df = pd.read_csv(path)
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+        return df, {}
+
+    def digest(self, key):
+        hit = self.load(key)
+        return None if hit is None else series_digest(hit[0])
+
+    def save(self, key, df, meta=None):
+        os.makedirs(self.root, exist_ok=True)
+        df[['Date', 'Value']].to_csv(self.path(key), index=False)
+
+
+BACKENDS = {
+    "npz": NpzCache,
+    "csv": CsvCache,
+}
+
+
+def get_backend(name, root):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cache backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](root)
+
+
+def benchmark(csv_dir, repeat=20):
+    """
+    Compares cache-hit load time and disk footprint of the CSV files in csv_dir
+    against the same series stored with NpzCache.
+    """
+    import tempfile
+
+    csv_cache = CsvCache(csv_dir)
+    keys = csv_cache.keys()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npz_cache = NpzCache(tmp)
+        for key in keys:
+            npz_cache.save(key, csv_cache.load(key)[0])
+
+        results = {}
+        for name, cache in (("csv", csv_cache), ("npz", npz_cache)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for key in keys:
+                    cache.load(key)
+            elapsed = (time.perf_counter() - start) / repeat
+            size = sum(os.path.getsize(cache.path(key)) for key in keys)
+            results[name] = {"load_ms": elapsed * 1000, "bytes": size}
+
+    return {"series": len(keys), **results}
+
+
+if __name__ == "__main__":
+    from data_fetcher import DATA_DIR
+    print(json.dumps(benchmark(DATA_DIR), indent=2))
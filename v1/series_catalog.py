@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from memo import memoize
+from perf import timed
+
+# Every input series of the dashboard by ID: where it comes from ("ecb": a key of an ECB Data
+# Portal flow, fetched through data_fetcher; "csv": an export shipped in data/), its frequency and units.
+# ECB series carry one download window ("start") wide enough for every figure that uses them,
+# so a series shared by several getters is fetched and memoized once.
+SERIES = {
+    # national accounts (MNA), quarterly
+    "ea_gdp": {"source": "ecb", "flow": "MNA", "key": "Q.Y.I9.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N",
+               "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_gdp": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.N",
+               "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_consumption": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W0.S1M.S1.D.P31._Z._Z._T.EUR.LR.N",
+                       "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_investment": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W0.S1.S1.D.P51G.N11G._T._Z.EUR.LR.N",
+                      "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_gov_spending": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W0.S13.S1.D.P3._Z._Z._T.EUR.LR.N",
+                        "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_exports": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W1.S1.S1.D.P6._Z._Z._Z.EUR.LR.N",
+                   "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_imports": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W1.S1.S1.C.P7._Z._Z._Z.EUR.LR.N",
+                   "freq": "Q", "units": "EUR millions, chain-linked volumes", "start": "1996"},
+    "pl_exports_value": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W1.S1.S1.D.P6._Z._Z._Z.EUR.V.N",
+                         "freq": "Q", "units": "EUR millions, current prices", "start": "2021"},
+    "pl_imports_value": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W1.S1.S1.C.P7._Z._Z._Z.EUR.V.N",
+                         "freq": "Q", "units": "EUR millions, current prices", "start": "2021"},
+    "pl_external_balance": {"source": "ecb", "flow": "MNA", "key": "Q.Y.PL.W1.S1.S1.B.B11._Z._Z._Z.EUR.V.N",
+                            "freq": "Q", "units": "EUR millions, current prices", "start": "2015"},
+    "ea_external_balance": {"source": "ecb", "flow": "MNA", "key": "Q.Y.I9.W1.S1.S1.B.B11._Z._Z._Z.EUR.V.N",
+                            "freq": "Q", "units": "EUR millions, current prices", "start": "2015"},
+
+    # balance of payments (BPS); charts start in 2018, 12-month rolling sums need the year before
+    "pl_current_account": {"source": "ecb", "flow": "BPS", "key": "M.N.PL.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL",
+                           "freq": "M", "units": "EUR millions", "start": "2016"},
+    "ea_current_account": {"source": "ecb", "flow": "BPS", "key": "M.N.I9.W1.S1.S1.T.B.CA._Z._Z._Z.EUR._T._X.N.ALL",
+                           "freq": "M", "units": "EUR millions", "start": "2016"},
+    "pl_goods_balance": {"source": "ecb", "flow": "BPS", "key": "Q.N.PL.W1.S1.S1.T.B.G._Z._Z._Z.EUR._T._X.N.ALL",
+                         "freq": "Q", "units": "EUR millions", "start": "2016"},
+    "pl_goods_balance_russia": {"source": "ecb", "flow": "BPS", "key": "Q.N.PL.RU.S1.S1.T.B.G._Z._Z._Z.EUR._T._X.N.ALL",
+                                "freq": "Q", "units": "EUR millions", "start": "2016"},
+
+    # extra-EA petroleum imports (TRD)
+    "oil_imports_value": {"source": "csv", "path": "data/s1fig1/Gas_Val.csv", "freq": "M", "units": "EUR"},
+    "oil_imports_volume": {"source": "csv", "path": "data/s1fig1/Gas_Vol.csv", "freq": "M", "units": "volume index"},
+
+    # HICP components (ICP): annual rates of change and annual item weights
+    "hicp_pl_core": {"source": "csv", "path": "data/s1fig2/poland_data/HICP - All-items excluding energy and food, Poland, Monthly .csv",
+                     "freq": "M", "units": "annual rate of change, %"},
+    "hicp_pl_energy": {"source": "csv", "path": "data/s1fig2/poland_data/HICP - Energy, Poland, Monthly.csv",
+                       "freq": "M", "units": "annual rate of change, %"},
+    "hicp_pl_food": {"source": "csv", "path": "data/s1fig2/poland_data/HICP - Food incl. alcohol and tobacco, Poland, Monthly.csv",
+                     "freq": "M", "units": "annual rate of change, %"},
+    "hicp_pl_headline": {"source": "csv", "path": "data/s1fig2_5/HICP - Overall index, Poland, Monthly.csv",
+                         "freq": "M", "units": "annual rate of change, %"},
+    "hicp_ea_core": {"source": "csv", "path": "data/s1fig2/ea_data/HICP - All-items excluding energy and food, Euro area, Monthly.csv",
+                     "freq": "M", "units": "annual rate of change, %"},
+    "hicp_ea_energy": {"source": "csv", "path": "data/s1fig2/ea_data/HICP - Energy, Euro area, Monthly.csv",
+                       "freq": "M", "units": "annual rate of change, %"},
+    "hicp_ea_food": {"source": "csv", "path": "data/s1fig2/ea_data/HICP - Food incl. alcohol and tobacco, Euro area, Monthly.csv",
+                     "freq": "M", "units": "annual rate of change, %"},
+    "hicp_weight_pl_core": {"source": "csv", "path": "data/s1fig2/poland_weights/HICP - All-items excluding energy and food, Poland, Annual.csv",
+                            "freq": "A", "units": "per mille of the basket"},
+    "hicp_weight_pl_energy": {"source": "csv", "path": "data/s1fig2/poland_weights/HICP - Energy, Poland, Annual.csv",
+                              "freq": "A", "units": "per mille of the basket"},
+    "hicp_weight_pl_food": {"source": "csv", "path": "data/s1fig2/poland_weights/HICP - Food incl. alcohol and tobacco, Poland, Annual.csv",
+                            "freq": "A", "units": "per mille of the basket"},
+    "hicp_weight_ea_core": {"source": "csv", "path": "data/s1fig2/ea_weights/HICP - All-items excluding energy and food, Euro area, Annual.csv",
+                            "freq": "A", "units": "per mille of the basket"},
+    "hicp_weight_ea_energy": {"source": "csv", "path": "data/s1fig2/ea_weights/HICP - Energy, Euro area, Annual.csv",
+                              "freq": "A", "units": "per mille of the basket"},
+    "hicp_weight_ea_food": {"source": "csv", "path": "data/s1fig2/ea_weights/HICP - Food incl. alcohol and tobacco, Euro area, Annual.csv",
+                            "freq": "A", "units": "per mille of the basket"},
+
+    # energy prices and nominal effective exchange rates (BIS broad basket)
+    "hicp_pl_energy_long": {"source": "csv", "path": "data/s1fig3/Data/HICP - Energy, Poland, Monthly.csv",
+                            "freq": "M", "units": "annual rate of change, %"},
+    "neer_ea": {"source": "csv", "path": "data/s1fig3/Data/Nominal effective exchange rate, Euro area_Broad basket.csv",
+                "freq": "M", "units": "index, 2020 = 100"},
+    "neer_pl": {"source": "csv", "path": "data/s1fig3/Data/Nominal effective exchange rate, Poland_Broad basket.csv",
+                "freq": "M", "units": "index, 2020 = 100"},
+}
+
+# HICP components in the column order the contribution charts expect
+HICP_COMPONENTS = ("core", "energy", "food")
+
+# series behind each dataset of figure_registry.DATASETS, in the order its loader unpacks them
+DATASETS = {
+    "energy": ["oil_imports_value", "oil_imports_volume"],
+    "inflation": [f"hicp_{area}_{c}" for area in ("pl", "ea") for c in HICP_COMPONENTS]
+                 + [f"hicp_weight_{area}_{c}" for area in ("pl", "ea") for c in HICP_COMPONENTS],
+    "hicp": [f"hicp_pl_{c}" for c in HICP_COMPONENTS] + ["hicp_pl_headline"]
+            + [f"hicp_weight_pl_{c}" for c in HICP_COMPONENTS],
+    "exchange_rate": ["hicp_pl_energy_long", "neer_ea", "neer_pl"],
+    "growth": ["ea_gdp", "pl_gdp", "pl_consumption", "pl_investment", "pl_gov_spending", "pl_exports", "pl_imports"],
+    "current_account": ["pl_external_balance", "ea_external_balance"],
+    "terms_of_trade": ["pl_exports_value", "pl_imports_value", "pl_exports", "pl_imports"],
+    "s3": ["pl_current_account", "ea_current_account", "pl_goods_balance", "pl_goods_balance_russia"],
+}
+
+# local files are small; a few threads are enough to overlap them with the ECB requests
+LOCAL_WORKERS = 4
+
+
+def ecb_jobs(series_ids):
+    """
+    fetch_ecb_many jobs (flow_ref, key, window params) for ECB series.
+    """
+    return [(SERIES[i]["flow"], SERIES[i]["key"], {'startPeriod': SERIES[i]["start"]}) for i in series_ids]
+
+
+def local_path(series_id):
+    return SERIES[series_id]["path"]
+
+
+@timed("parse", detail="path")
+@memoize("local_csv", maxsize=64)
+def read_csv(path):
+    """
+    A local CSV export as read by pandas, read once per process; raises FileNotFoundError.
+    """
+    return pd.read_csv(path)
+
+
+def read_local(series_id):
+    return read_csv(local_path(series_id))
+
+
+def read_locals(series_ids):
+    """
+    Frames of the local series whose file exists, in order (missing files are skipped).
+    """
+    return [read_local(i) for i in series_ids if os.path.exists(local_path(i))]
+
+
+def load_plan(datasets):
+    """
+    Series needed by datasets, each once: (ECB jobs, local series IDs).
+    """
+    series_ids = list(dict.fromkeys(i for name in datasets for i in DATASETS[name]))
+    jobs = ecb_jobs([i for i in series_ids if SERIES[i]["source"] == "ecb"])
+    local = [i for i in series_ids if SERIES[i]["source"] == "csv"]
+    return jobs, local
+
+
+@timed("load")
+def prefetch(datasets):
+    """
+    Loads every series of datasets once, ECB series through one fetch_ecb_many call
+    (coalesced, MAX_IN_FLIGHT requests) while the local files are read alongside.
+    The dataset loaders then find everything memoized. Returns {series key or path: error}.
+    """
+    from data_fetcher import fetch_ecb_many
+
+    jobs, local = load_plan(datasets)
+    errors = {}
+    with ThreadPoolExecutor(max_workers=LOCAL_WORKERS) as pool:
+        futures = [(pool.submit(read_local, i), local_path(i)) for i in local]
+        if jobs:
+            errors.update(fetch_ecb_many(jobs)[1])
+        for future, path in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors[path] = str(e)
+    return errors
+
+
+if __name__ == "__main__":
+    import time
+    # local paths are relative to the repository root, like `streamlit run v1/dashboard.py`
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for name in DATASETS:
+        jobs, local = load_plan([name])
+        print(f"{name:>16}: {len(jobs)} ECB series, {len(local)} local files")
+    jobs, local = load_plan(list(DATASETS))
+    print(f"{'all':>16}: {len(jobs)} ECB series, {len(local)} local files")
+    start = time.perf_counter()
+    errors = prefetch(list(DATASETS))
+    print(f"Prefetched in {time.perf_counter() - start:.2f}s, {len(errors)} errors")